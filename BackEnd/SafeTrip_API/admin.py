@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import UserProfile, customUser
+from .models import NotificationJob, UserProfile, customUser
 
 @admin.register(customUser)
 class CustomUserAdmin(UserAdmin):
@@ -12,3 +12,9 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "blood_group", "relative_mobile_no", "updated_at")
     search_fields = ("user__username", "user__email", "relative_mobile_no")
 
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "channel", "status", "alert", "attempts", "provider_status", "created_at", "sent_at")
+    list_filter = ("channel", "status")
+    search_fields = ("provider_id", "subject")
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class SafetripApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'SafeTrip_API'
+
+    def ready(self):
+        from . import auth_cache  # noqa: F401  (connects cache invalidation receivers)
+        from . import dispatch  # noqa: F401  (drops deleted responders from the grid)
+        from . import stats  # noqa: F401  (uncounts deleted alerts)
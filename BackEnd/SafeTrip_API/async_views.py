@@ -0,0 +1,191 @@
+"""
+Async versions of the SOS, OTP and alert-stream views for ASGI deployments.
+
+Under ASGI, Django runs sync views one at a time on a single shared thread,
+so a burst of SOS requests queues behind each other and every open alert
+stream pins that thread. config/asgi.py sets SAFETRIP_ASGI and urls.py then
+routes these views instead; WSGI deployments keep the sync views in
+views.py. Both share the same helpers, so behaviour and responses match.
+
+Plain lookups use the async ORM. Blocks that need transaction.atomic() (or
+the cache, which may be a network round trip) run through sync_to_async, as
+do the SOS plan steps, whose first reverse-geocode maps (or builds) the
+gazetteer index from disk.
+Emails and SMS are already delivered by the notification worker, so no
+provider call happens on the request path.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from . import dispatch, trail
+from .emails import otp_email
+from .events import astream_alert_events, latest_event_id
+from .notifications import enqueue_email
+from .otp import OTPError, issue_otp, otp_ttl_seconds, redeem_otp
+from .tokens import issue_tokens
+from .views import (
+    _event_stream_response,
+    _json_body,
+    _normalize_email,
+    _otp_verified_response,
+    _plan_emergency_alert,
+    _plan_emergency_alert_batch,
+    _queue_emergency_alert,
+    _queue_emergency_alert_batch,
+    _requested_event_id,
+    _stream_auth_error,
+    _trail_appended_response,
+    _trail_fixes,
+    _users_with_email,
+    alert_trail as _sync_alert_trail,
+)
+
+User = get_user_model()
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def send_otp(request):
+    data, err = _json_body(request)
+    if err:
+        return err
+
+    email_lower = _normalize_email(data.get("email"))
+    if not email_lower:
+        return JsonResponse({"error": "email is required"}, status=400)
+
+    try:
+        user = await _users_with_email(email_lower).aget()
+    except User.DoesNotExist:
+        return JsonResponse({"error": "No user found with this email"}, status=404)
+
+    try:
+        otp = await sync_to_async(issue_otp)(email_lower)
+    except OTPError as exc:
+        return JsonResponse({"success": False, "message": str(exc)}, status=400)
+
+    subject, template, context = otp_email(otp, otp_ttl_seconds() // 60)
+    job = await sync_to_async(enqueue_email)(subject, [email_lower], template=template, context=context)
+
+    return JsonResponse(
+        {"success": True, "message": "OTP sent successfully", "email": email_lower, "user_id": user.id, "job_id": job.id}
+    )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def request_otp(request):
+    # Backwards-compatible alias
+    return await send_otp(request)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def verify_otp(request):
+    data, err = _json_body(request)
+    if err:
+        return err
+
+    email_lower = _normalize_email(data.get("email"))
+    otp = (data.get("otp") or "").strip()
+
+    if not email_lower or not otp:
+        return JsonResponse({"success": False, "message": "Email and OTP are required"}, status=400)
+
+    try:
+        await sync_to_async(redeem_otp)(email_lower, otp)
+    except OTPError as exc:
+        return JsonResponse({"success": False, "message": str(exc)}, status=400)
+
+    try:
+        user = await _users_with_email(email_lower).aget()
+    except User.DoesNotExist:
+        return JsonResponse({"success": False, "message": "No user found with this email"}, status=404)
+
+    return _otp_verified_response(user, await sync_to_async(issue_tokens)(user))
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def send_emergency_alert(request):
+    data, err = _json_body(request)
+    if err:
+        return err
+
+    user, err = await _alert_user(data)
+    if err:
+        return err
+
+    await sync_to_async(dispatch.refresh)()
+    plan, err = await sync_to_async(_plan_emergency_alert)(data, user)
+    if err:
+        return err
+    return JsonResponse(await sync_to_async(_queue_emergency_alert)(user, plan))
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def send_emergency_alert_batch(request):
+    data, err = _json_body(request)
+    if err:
+        return err
+
+    user, err = await _alert_user(data)
+    if err:
+        return err
+
+    await sync_to_async(dispatch.refresh)()
+    plan, err = await sync_to_async(_plan_emergency_alert_batch)(data, user)
+    if err:
+        return err
+    return JsonResponse(await sync_to_async(_queue_emergency_alert_batch)(user, plan))
+
+
+async def _alert_user(data):
+    user_id = data.get("user_id")
+    email = _normalize_email(data.get("email"))
+    users = User.objects.select_related("profile")
+    try:
+        if user_id:
+            return await users.aget(id=user_id), None
+        if email:
+            return await _users_with_email(email, users).aget(), None
+    except User.DoesNotExist:
+        return None, JsonResponse({"success": False, "message": "User not found"}, status=404)
+    return None, JsonResponse({"success": False, "message": "user_id or email is required"}, status=400)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+async def alert_trail(request, alert_id):
+    if request.method != "POST":
+        return await sync_to_async(_sync_alert_trail)(request, alert_id)
+
+    data, err = _json_body(request)
+    if err:
+        return err
+    fixes, err = _trail_fixes(data)
+    if err:
+        return err
+    try:
+        result = await sync_to_async(trail.append_fixes)(alert_id, fixes)
+    except trail.TrailError as exc:
+        return JsonResponse({"success": False, "message": str(exc)}, status=exc.status)
+    return _trail_appended_response(alert_id, result)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def alert_event_stream(request):
+    err = _stream_auth_error(request)
+    if err:
+        return err
+    last_id, err = _requested_event_id(request)
+    if err:
+        return err
+    if last_id is None:
+        last_id = await sync_to_async(latest_event_id)()
+    return _event_stream_response(astream_alert_events(last_id))
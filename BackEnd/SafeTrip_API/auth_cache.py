@@ -0,0 +1,199 @@
+"""
+Per-process cache of token-authenticated users and their profiles.
+
+_auth_user_from_request and the "who am I" / profile views resolve the user
+on every request. Column snapshots are kept here in a small LRU with a TTL
+(AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL_SECONDS); each lookup hands out
+fresh model instances, so callers may modify and save them.
+
+Every snapshot is tagged with a per-user version number held in the shared
+Django cache. post_save / post_delete on the user and profile models bump
+it once the transaction commits, which invalidates the snapshot in every
+worker process that shares that cache. QuerySet.update() does not send
+signals; such writes are picked up when the TTL runs out.
+
+The same entries hold serialized response bodies (store_response /
+get_response), so the profile GET endpoints can answer a repeat request
+from bytes without loading or serializing anything. They share the
+snapshot's version and TTL.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import UserProfile
+
+User = get_user_model()
+
+_VERSION_KEY = "safetrip:auth-user-version:{}"
+
+_entries = OrderedDict()  # user_id -> [version, expires_at, user_values, profile_values, responses]
+# Bodies kept per user, one per key (e.g. per host the profile was requested on)
+_MAX_RESPONSES = 4
+_lock = threading.Lock()
+
+
+def _attnames(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _load_values(model, **lookup):
+    return model.objects.filter(**lookup).values_list(*_attnames(model)).first()
+
+
+def _instance(model, values):
+    # Fresh instance per caller; JSON columns are copied so edits stay private.
+    values = [copy.deepcopy(value) if isinstance(value, (list, dict)) else value for value in values]
+    return model.from_db(DEFAULT_DB_ALIAS, _attnames(model), values)
+
+
+def user_version(user_id):
+    key = _VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock so a version evicted from the shared cache
+        # never comes back with a value an old snapshot still carries.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _lookup(user_id, version):
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] != version or entry[1] < time.monotonic():
+            del _entries[user_id]
+            return None
+        _entries.move_to_end(user_id)
+        return entry
+
+
+def _store(user_id, version, user_values):
+    ttl = float(getattr(settings, "AUTH_USER_CACHE_TTL_SECONDS", 60))
+    size = int(getattr(settings, "AUTH_USER_CACHE_SIZE", 1024))
+    with _lock:
+        _entries[user_id] = [version, time.monotonic() + ttl, user_values, None, OrderedDict()]
+        _entries.move_to_end(user_id)
+        while len(_entries) > size:
+            _entries.popitem(last=False)
+
+
+def _store_profile(user_id, version, profile_values):
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is not None and entry[0] == version:
+            entry[3] = profile_values
+
+
+def get_response(user_id, key):
+    """
+    Return (version, value) for a body stored under key by store_response();
+    value is None on a miss. Hand version back to store_response() so a
+    body built from rows read after a concurrent change is not kept.
+    """
+    version = user_version(user_id)
+    entry = _lookup(user_id, version)
+    if entry is None:
+        return version, None
+    with _lock:
+        return version, entry[4].get(key)
+
+
+def store_response(user_id, version, key, value):
+    """
+    Keep value under key while user_id's snapshot is at version. Only
+    stored when get_user() has cached that snapshot.
+    """
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is None or entry[0] != version:
+            return
+        responses = entry[4]
+        responses[key] = value
+        responses.move_to_end(key)
+        while len(responses) > _MAX_RESPONSES:
+            responses.popitem(last=False)
+
+
+def get_user(user_id):
+    """
+    Return the user with this id, or None if there is no such user.
+    """
+    version = user_version(user_id)
+    entry = _lookup(user_id, version)
+    if entry is not None:
+        return _instance(User, entry[2])
+
+    values = _load_values(User, pk=user_id)
+    if values is None:
+        return None
+    _store(user_id, version, values)
+    return _instance(User, values)
+
+
+def get_profile(user):
+    """
+    Return user's UserProfile, creating it if missing.
+    """
+    version = user_version(user.pk)
+    entry = _lookup(user.pk, version)
+    if entry is not None and entry[3] is not None:
+        profile = _instance(UserProfile, entry[3])
+        profile.user = user
+        return profile
+
+    profile, _ = UserProfile.objects.get_or_create(user=user)
+    if entry is not None:
+        values = _load_values(UserProfile, pk=profile.pk)
+        if values is not None:
+            _store_profile(user.pk, version, values)
+    return profile
+
+
+def invalidate_user(user_id):
+    """
+    Drop the local snapshot and bump the shared version for user_id.
+    """
+    with _lock:
+        _entries.pop(user_id, None)
+    key = _VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def _invalidate_on_commit(user_id):
+    with _lock:
+        _entries.pop(user_id, None)
+    # Bumping after commit keeps a concurrent reader from caching the
+    # pre-commit row under the new version.
+    transaction.on_commit(partial(invalidate_user, user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _user_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def _profile_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.user_id)
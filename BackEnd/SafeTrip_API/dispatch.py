@@ -0,0 +1,241 @@
+"""
+Nearest-available-responder dispatch.
+
+AUTHORITY users report their position and availability (ResponderStatus).
+Each process keeps the available ones in a ResponderGrid: a dict of
+DISPATCH_GRID_CELL_DEGREES square cells, searched ring by ring outward from
+the alert until the k nearest are known, so a lookup touches a handful of
+cells however many responders are on duty.
+
+The grid is maintained incrementally. Position updates made in this
+process are applied as soon as they commit; refresh() (at most every
+DISPATCH_SYNC_SECONDS) reads only the ResponderStatus rows whose updated_at
+moved since the last sync, which picks up updates made by other processes.
+nearest_responders() itself never touches the database, so callers run
+refresh() first (the SOS views do).
+"""
+import heapq
+import math
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .geo import EARTH_RADIUS_KM, haversine_km
+from .models import ResponderStatus
+
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+Responder = namedtuple("Responder", "user_id latitude longitude email phone seen_at")
+Match = namedtuple("Match", "responder distance_km")
+
+
+class ResponderGrid:
+    """
+    Available responders bucketed into square lat/lng cells.
+    """
+
+    def __init__(self, cell_degrees):
+        self.cell_degrees = cell_degrees
+        self._cells = {}  # (row, col) -> {user_id: Responder}
+        self._where = {}  # user_id -> (row, col)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._where)
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def upsert(self, responder):
+        key = self._cell(responder.latitude, responder.longitude)
+        with self._lock:
+            old = self._where.get(responder.user_id)
+            if old is not None and old != key:
+                self._drop(responder.user_id, old)
+            self._cells.setdefault(key, {})[responder.user_id] = responder
+            self._where[responder.user_id] = key
+
+    def remove(self, user_id):
+        with self._lock:
+            key = self._where.pop(user_id, None)
+            if key is not None:
+                self._drop(user_id, key)
+
+    def _drop(self, user_id, key):
+        bucket = self._cells.get(key)
+        if bucket is not None:
+            bucket.pop(user_id, None)
+            if not bucket:
+                del self._cells[key]
+
+    def _ring(self, row, col, radius):
+        if radius == 0:
+            yield row, col
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield row - radius, c
+            yield row + radius, c
+        for r in range(row - radius + 1, row + radius):
+            yield r, col - radius
+            yield r, col + radius
+
+    def nearest(self, latitude, longitude, k, max_km, fresh_after=None, exclude=()):
+        """
+        Up to k Matches within max_km, nearest first. Responders last seen
+        before fresh_after (a timestamp) are skipped.
+        """
+        if k <= 0 or not self._where:
+            return []
+        row, col = self._cell(latitude, longitude)
+        cos_lat = max(0.01, math.cos(math.radians(latitude)))
+        # One cell step, in the approximate-km metric used for ranking below.
+        step_km = self.cell_degrees * _KM_PER_DEGREE * cos_lat
+        best = []  # max-heap of (-approx_km, user_id, responder)
+        visited = 0
+
+        with self._lock:
+            for radius in range(math.ceil(max_km / step_km) + 2):
+                # Everything in this ring or beyond is at least this far away.
+                ring_floor_km = (radius - 1) * step_km
+                if ring_floor_km > max_km or (len(best) == k and ring_floor_km > -best[0][0]):
+                    break
+                ring_cells = 8 * radius or 1
+                visited += ring_cells
+                if visited > len(self._cells):
+                    # Sparse grid: ring lookups have already cost as much as
+                    # visiting every occupied cell, so finish with those.
+                    keys = [key for key in self._cells if max(abs(key[0] - row), abs(key[1] - col)) >= radius]
+                    last_pass = True
+                else:
+                    keys = self._ring(row, col, radius)
+                    last_pass = False
+                for key in keys:
+                    bucket = self._cells.get(key)
+                    if not bucket:
+                        continue
+                    for user_id, responder in bucket.items():
+                        if user_id in exclude or (fresh_after is not None and responder.seen_at < fresh_after):
+                            continue
+                        # Equirectangular distance: exact enough to rank within a few cells.
+                        dx = (responder.longitude - longitude) * cos_lat
+                        dy = responder.latitude - latitude
+                        approx_km = math.hypot(dx, dy) * _KM_PER_DEGREE
+                        if approx_km > max_km:
+                            continue
+                        if len(best) < k:
+                            heapq.heappush(best, (-approx_km, user_id, responder))
+                        elif approx_km < -best[0][0]:
+                            heapq.heapreplace(best, (-approx_km, user_id, responder))
+                if last_pass:
+                    break
+
+        matches = [
+            Match(responder, haversine_km(latitude, longitude, responder.latitude, responder.longitude))
+            for _, _, responder in best
+        ]
+        return sorted((m for m in matches if m.distance_km <= max_km), key=lambda m: (m.distance_km, m.responder.user_id))
+
+
+def _cell_degrees():
+    return float(getattr(settings, "DISPATCH_GRID_CELL_DEGREES", 0.01))
+
+
+_state_lock = threading.Lock()
+_grid = None
+_synced_through = None  # latest ResponderStatus.updated_at applied to _grid
+_next_sync = 0.0
+
+
+def grid() -> ResponderGrid:
+    global _grid, _synced_through, _next_sync
+    with _state_lock:
+        if _grid is None or _grid.cell_degrees != _cell_degrees():
+            _grid = ResponderGrid(_cell_degrees())
+            _synced_through = None
+            _next_sync = 0.0
+        return _grid
+
+
+def _responder_from_row(user_id, latitude, longitude, email, phone, updated_at):
+    return Responder(user_id, float(latitude), float(longitude), email or "", phone or "", updated_at.timestamp())
+
+
+def refresh(force=False):
+    """
+    Apply ResponderStatus rows changed since the last sync to this process's grid.
+    """
+    global _synced_through, _next_sync
+    index = grid()
+    now = time.monotonic()
+    with _state_lock:
+        if not force and now < _next_sync:
+            return
+        _next_sync = now + float(getattr(settings, "DISPATCH_SYNC_SECONDS", 2))
+        since = _synced_through
+
+    rows = ResponderStatus.objects.order_by("updated_at")
+    if since is None:
+        # Cold start: only responders that are on duty and recently seen.
+        rows = rows.filter(available=True, updated_at__gte=timezone.now() - _stale_after())
+    else:
+        # Re-read a short overlap so rows committed slightly out of order are not missed.
+        rows = rows.filter(updated_at__gte=since - timedelta(seconds=float(getattr(settings, "DISPATCH_SYNC_OVERLAP_SECONDS", 5))))
+
+    latest = since
+    for user_id, latitude, longitude, available, email, phone, updated_at in rows.values_list(
+        "user_id", "latitude", "longitude", "available", "user__email", "user__contact_no", "updated_at"
+    ).iterator(chunk_size=2000):
+        if available:
+            index.upsert(_responder_from_row(user_id, latitude, longitude, email, phone, updated_at))
+        else:
+            index.remove(user_id)
+        latest = updated_at if latest is None else max(latest, updated_at)
+
+    with _state_lock:
+        if index is _grid and (latest is not None or _synced_through is None):
+            _synced_through = latest or timezone.now()
+
+
+def _stale_after():
+    return timedelta(seconds=int(getattr(settings, "DISPATCH_STALE_SECONDS", 900)))
+
+
+def nearest_responders(latitude, longitude, k=None, exclude=()):
+    """
+    The k (DISPATCH_RESPONDERS_PER_ALERT) nearest available responders within
+    DISPATCH_MAX_DISTANCE_KM, nearest first. Memory only; see refresh().
+    """
+    if k is None:
+        k = int(getattr(settings, "DISPATCH_RESPONDERS_PER_ALERT", 3))
+    max_km = float(getattr(settings, "DISPATCH_MAX_DISTANCE_KM", 50))
+    fresh_after = (timezone.now() - _stale_after()).timestamp()
+    return grid().nearest(float(latitude), float(longitude), k, max_km, fresh_after=fresh_after, exclude=exclude)
+
+
+def report_position(user, latitude, longitude, available=True) -> ResponderStatus:
+    """
+    Save a responder's position and availability; the local grid follows on commit.
+    """
+    status, _ = ResponderStatus.objects.update_or_create(
+        user=user, defaults={"latitude": latitude, "longitude": longitude, "available": available}
+    )
+    if available:
+        responder = _responder_from_row(user.id, latitude, longitude, user.email, user.contact_no, status.updated_at)
+        transaction.on_commit(lambda: grid().upsert(responder))
+    else:
+        transaction.on_commit(lambda: grid().remove(user.id))
+    return status
+
+
+@receiver(post_delete, sender=ResponderStatus)
+def _status_deleted(sender, instance, **kwargs):
+    # Other processes stop offering the responder once DISPATCH_STALE_SECONDS pass.
+    user_id = instance.user_id
+    transaction.on_commit(lambda: grid().remove(user_id))
@@ -0,0 +1,68 @@
+"""
+OTP and SOS email rendering.
+
+Bodies live in templates/SafeTrip_API/emails/ and are compiled once by the
+cached template loader. Views only build a small JSON-safe context and queue
+it with the template name; the notification worker renders a plain-text part
+plus an HTML alternative at delivery time, so no request pays for rendering.
+User-supplied values are autoescaped in the HTML part.
+"""
+from django.template.loader import get_template
+from django.utils import timezone
+
+OTP_TEMPLATE = "otp"
+SOS_TEMPLATE = "sos_alert"
+
+
+def otp_email(otp, valid_minutes):
+    """
+    Return (subject, template, context) for an OTP email.
+    """
+    return "SafeTrip - Your OTP Code", OTP_TEMPLATE, {"otp": otp, "valid_minutes": valid_minutes}
+
+
+def sos_email(
+    *,
+    full_name,
+    username,
+    email,
+    contact_no,
+    emergency_contact,
+    blood_group,
+    height_cm,
+    weight_kg,
+    message,
+    latitude,
+    longitude,
+    address,
+    maps_link,
+):
+    """
+    Return (subject, template, context) for an emergency alert email.
+    """
+    context = {
+        "full_name": full_name,
+        "username": username,
+        "email": email,
+        "contact_no": contact_no,
+        "emergency_contact": emergency_contact,
+        "blood_group": blood_group,
+        "height_cm": str(height_cm),
+        "weight_kg": str(weight_kg),
+        "message": message,
+        "latitude": None if latitude is None else str(latitude),
+        "longitude": None if longitude is None else str(longitude),
+        "address": address,
+        "maps_link": maps_link,
+    }
+    return f"🚨 SafeTrip EMERGENCY ALERT - {full_name}", SOS_TEMPLATE, context
+
+
+def render_email(template, context, sent_at=None):
+    """
+    Render a queued email template. Returns (text_body, html_body).
+    """
+    context = {**context, "sent_at": sent_at or timezone.now()}
+    text = get_template(f"SafeTrip_API/emails/{template}.txt").render(context).strip() + "\n"
+    html = get_template(f"SafeTrip_API/emails/{template}.html").render(context)
+    return text, html
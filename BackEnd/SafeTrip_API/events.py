@@ -0,0 +1,194 @@
+"""
+Alert event stream for authority dashboards.
+
+send_emergency_alert, update_alert_status and trail appends call
+publish_alert_event; the stream view tails the AlertEvent table with Server-Sent Events. Waiters in
+the same process are woken as soon as the publishing transaction commits;
+events written by other processes are picked up by a cheap primary-key
+range query every ALERT_STREAM_POLL_SECONDS.
+
+A sync (WSGI) stream holds a worker thread for up to
+ALERT_STREAM_MAX_SECONDS, so at most ALERT_STREAM_MAX_SYNC_STREAMS of them
+run per process (open_sync_stream); ASGI streams hold no thread and are
+not capped.
+
+AlertEvent is only read forward from a recent cursor, so rows older than
+ALERT_EVENT_RETENTION_HOURS are deleted by the purge_alert_events command.
+"""
+import asyncio
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import AlertEvent
+
+_new_event = threading.Condition()
+# Bumped on every commit that published events; lets a stream notice a
+# publish that landed between its query and its wait.
+_generation = 0
+# (loop, asyncio.Event) for each async stream waiting in this process
+_async_waiters = set()
+
+
+def _wake_streams():
+    global _generation
+    with _new_event:
+        _generation += 1
+        _new_event.notify_all()
+        waiters = list(_async_waiters)
+    for loop, event in waiters:
+        loop.call_soon_threadsafe(event.set)
+
+
+_slots_lock = threading.Lock()
+_slots = None  # (limit, semaphore)
+
+
+def _sync_stream_slots():
+    global _slots
+    limit = int(getattr(settings, "ALERT_STREAM_MAX_SYNC_STREAMS", 8))
+    with _slots_lock:
+        if _slots is None or _slots[0] != limit:
+            _slots = (limit, threading.BoundedSemaphore(limit))
+        return _slots[1]
+
+
+def publish_alert_event(alert, kind, payload) -> AlertEvent:
+    event = AlertEvent.objects.create(alert=alert, kind=kind, payload=payload)
+    transaction.on_commit(_wake_streams)
+    return event
+
+
+def publish_alert_events(events) -> list:
+    """
+    publish_alert_event for many (alert, kind, payload) at once, in one INSERT.
+    """
+    rows = AlertEvent.objects.bulk_create(
+        [AlertEvent(alert=alert, kind=kind, payload=payload) for alert, kind, payload in events]
+    )
+    transaction.on_commit(_wake_streams)
+    return rows
+
+
+def latest_event_id() -> int:
+    return AlertEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def format_sse(event_id, kind, data) -> str:
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def stream_alert_events(last_event_id: int):
+    """
+    Yield SSE frames for every AlertEvent after last_event_id.
+
+    The stream ends after ALERT_STREAM_MAX_SECONDS so a sync worker is not
+    held forever; EventSource reconnects and resumes from Last-Event-ID.
+    """
+    poll_seconds = float(getattr(settings, "ALERT_STREAM_POLL_SECONDS", 2))
+    heartbeat_seconds = float(getattr(settings, "ALERT_STREAM_HEARTBEAT_SECONDS", 15))
+    max_seconds = float(getattr(settings, "ALERT_STREAM_MAX_SECONDS", 300))
+
+    started = last_sent = time.monotonic()
+    yield f"retry: {int(poll_seconds * 1000)}\n\n"
+
+    while time.monotonic() - started < max_seconds:
+        seen_generation = _generation
+        events = list(
+            AlertEvent.objects.filter(id__gt=last_event_id).order_by("id").values_list("id", "kind", "payload")[:100]
+        )
+        for event_id, kind, payload in events:
+            last_event_id = event_id
+            yield format_sse(event_id, kind, payload)
+        if events:
+            last_sent = time.monotonic()
+            continue
+
+        if time.monotonic() - last_sent >= heartbeat_seconds:
+            # Comment frame keeps proxies from closing an idle connection.
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+
+        with _new_event:
+            if _generation == seen_generation:
+                _new_event.wait(timeout=poll_seconds)
+
+
+class _SlotStream:
+    """
+    Iterator over stream frames that frees its sync stream slot when the
+    response is closed, whether or not iteration ever started.
+    """
+
+    def __init__(self, frames, slots):
+        self._frames = frames
+        self._slots = slots
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._frames)
+
+    def close(self):
+        self._frames.close()
+        if self._slots is not None:
+            self._slots.release()
+            self._slots = None
+
+
+def open_sync_stream(last_event_id: int):
+    """
+    stream_alert_events holding one of this process's sync stream slots,
+    or None when all ALERT_STREAM_MAX_SYNC_STREAMS are taken.
+    """
+    slots = _sync_stream_slots()
+    if not slots.acquire(blocking=False):
+        return None
+    return _SlotStream(stream_alert_events(last_event_id), slots)
+
+
+async def astream_alert_events(last_event_id: int):
+    """
+    Async twin of stream_alert_events for ASGI: waiting streams hold no thread.
+    """
+    poll_seconds = float(getattr(settings, "ALERT_STREAM_POLL_SECONDS", 2))
+    heartbeat_seconds = float(getattr(settings, "ALERT_STREAM_HEARTBEAT_SECONDS", 15))
+    max_seconds = float(getattr(settings, "ALERT_STREAM_MAX_SECONDS", 300))
+
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    with _new_event:
+        _async_waiters.add(waiter)
+    try:
+        started = last_sent = time.monotonic()
+        yield f"retry: {int(poll_seconds * 1000)}\n\n"
+
+        while time.monotonic() - started < max_seconds:
+            waiter[1].clear()
+            events = [
+                row
+                async for row in AlertEvent.objects.filter(id__gt=last_event_id)
+                .order_by("id")
+                .values_list("id", "kind", "payload")[:100]
+            ]
+            for event_id, kind, payload in events:
+                last_event_id = event_id
+                yield format_sse(event_id, kind, payload)
+            if events:
+                last_sent = time.monotonic()
+                continue
+
+            if time.monotonic() - last_sent >= heartbeat_seconds:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+            try:
+                await asyncio.wait_for(waiter[1].wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        with _new_event:
+            _async_waiters.discard(waiter)
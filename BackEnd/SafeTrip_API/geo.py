@@ -0,0 +1,192 @@
+"""
+Geohash cells for "alerts near a point".
+
+Every EmergencyAlert with a location stores its 12-character geohash, and
+(status, geohash) is indexed. All points inside a geohash cell share its
+prefix, so a cell is one index range: geohash >= cell AND geohash < cell + "{"
+("{" sorts after every geohash character). nearby_filter() covers the
+circle's bounding box with cells of the finest precision that still needs
+at most GEOHASH_MAX_COVER_CELLS of them, drops cells that lie entirely
+outside the circle, and merges neighbouring cells into single ranges.
+Candidates are then refined with haversine_km().
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Q
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_LENGTH = 12
+EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude, longitude, precision=GEOHASH_LENGTH) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                value = value * 2 + 1
+                lon_lo = mid
+            else:
+                value *= 2
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = value * 2 + 1
+                lat_lo = mid
+            else:
+                value *= 2
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def bounds(cell):
+    """
+    (south, west, north, east) of a geohash cell.
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for char in cell:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision):
+    """
+    (height, width) of a cell in degrees.
+    """
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _bounding_box(latitude, longitude, radius_km):
+    dlat = radius_km / _KM_PER_DEGREE
+    south, north = max(-90.0, latitude - dlat), min(90.0, latitude + dlat)
+    # Longitude degrees shrink towards the poles; near a pole take the full circle.
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    dlon = 180.0 if cos_lat < 1e-9 else min(180.0, radius_km / (_KM_PER_DEGREE * cos_lat))
+    return south, longitude - dlon, north, longitude + dlon
+
+
+def _wrap_longitude(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def covering_cells(latitude, longitude, radius_km, max_cells=None):
+    """
+    Sorted geohash cells that together contain every point within radius_km.
+    """
+    if max_cells is None:
+        max_cells = int(getattr(settings, "GEOHASH_MAX_COVER_CELLS", 32))
+    latitude, longitude = float(latitude), float(longitude)
+    south, west, north, east = _bounding_box(latitude, longitude, radius_km)
+
+    precision = 1
+    for candidate in range(GEOHASH_LENGTH, 0, -1):
+        height, width = cell_size(candidate)
+        rows = math.floor(north / height) - math.floor(south / height) + 1
+        cols = math.floor(east / width) - math.floor(west / width) + 1
+        if rows * cols <= max_cells:
+            precision = candidate
+            break
+
+    height, width = cell_size(precision)
+    cells = set()
+    row = math.floor(south / height)
+    while row * height <= north:
+        col = math.floor(west / width)
+        while col * width <= east:
+            center_lat = min(89.999999, (row + 0.5) * height)
+            cell = encode(center_lat, _wrap_longitude((col + 0.5) * width), precision)
+            if _cell_distance_km(cell, latitude, longitude) <= radius_km:
+                cells.add(cell)
+            col += 1
+        row += 1
+    return sorted(cells)
+
+
+def _cell_distance_km(cell, latitude, longitude):
+    """
+    Distance from the point to the nearest point of the cell (0 inside it).
+    """
+    south, west, north, east = bounds(cell)
+    nearest_lat = min(max(latitude, south), north)
+    # Compare longitudes on the side of the antimeridian closest to the cell.
+    lon = longitude
+    if lon < west - 180:
+        lon += 360
+    elif lon > east + 180:
+        lon -= 360
+    nearest_lon = min(max(lon, west), east)
+    return haversine_km(latitude, lon, nearest_lat, nearest_lon)
+
+
+def cell_ranges(cells):
+    """
+    Merge sorted same-length cells into [lower, upper) geohash string ranges.
+    The "{" upper bound sorts after every base32 character only under
+    bytewise ordering, hence the geohash column's "C" collation.
+    """
+    ranges = []
+    previous = None
+    for cell in cells:
+        if previous is not None and _next_cell(previous) == cell:
+            ranges[-1][1] = cell + "{"
+        else:
+            ranges.append([cell, cell + "{"])
+        previous = cell
+    return [tuple(r) for r in ranges]
+
+
+def _next_cell(cell):
+    digits = list(cell)
+    for i in range(len(digits) - 1, -1, -1):
+        position = BASE32.index(digits[i])
+        if position < len(BASE32) - 1:
+            digits[i] = BASE32[position + 1]
+            return "".join(digits)
+        digits[i] = BASE32[0]
+    return None
+
+
+def nearby_filter(latitude, longitude, radius_km, statuses):
+    """
+    Q matching alerts with one of statuses whose geohash lies in a cell
+    covering the circle. One (status, geohash) index range per disjunct.
+    """
+    ranges = cell_ranges(covering_cells(latitude, longitude, radius_km))
+    q = Q(pk__in=[])
+    for status in statuses:
+        for lower, upper in ranges:
+            q |= Q(status=status, geohash__gte=lower, geohash__lt=upper)
+    return q
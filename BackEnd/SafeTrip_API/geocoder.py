@@ -0,0 +1,270 @@
+"""
+Offline reverse geocoder: coordinates -> nearest named place.
+
+GEOCODER_GAZETTEER is a text gazetteer, either the bundled
+data/gazetteer.tsv (name, region, country, latitude, longitude) or a
+GeoNames dump such as cities500.txt. build_index() turns it into a flat
+binary k-d tree at GEOCODER_INDEX_PATH:
+
+    header   b"SKDT", version, point count, names length   (4 x uint32)
+    x, y, z  float64 arrays: unit-sphere coordinates in tree order
+    offsets  uint32 array (count + 1) into names
+    names    UTF-8 "name|region|country" strings
+
+The tree is implicit: the node of a [lo, hi) slice is its middle element,
+split on axis depth % 3. The file is memory-mapped and read through typed
+memoryviews, so loading costs no parsing and processes share the pages.
+Searching on the unit sphere makes straight-line distance order match
+great-circle distance.
+
+The index lives in GEOCODER_CACHE_DIR (or at GEOCODER_INDEX_PATH), never
+next to the source. It is mapped on the first lookup. If it is missing or
+older than the gazetteer, that lookup builds it, unless
+GEOCODER_BUILD_ON_DEMAND is off. Read-only deployments run `manage.py
+build_geocoder` at build time instead. Builds write a uniquely named temp
+file and rename it into place, so workers racing to build never see a
+partial index.
+
+Lookups are cached (GEOCODER_CACHE_SIZE entries) on coordinates rounded
+to 4 decimals, about 11 m.
+"""
+import logging
+import math
+import mmap
+import os
+import hashlib
+import struct
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+from .geo import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SKDT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+
+Place = namedtuple("Place", "name region country latitude longitude distance_km")
+
+
+def _unit_vector(latitude, longitude):
+    lat, lng = math.radians(latitude), math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lng), cos_lat * math.sin(lng), math.sin(lat)
+
+
+def read_gazetteer(path):
+    """
+    Yield (name, region, country, latitude, longitude) from a bundled-format
+    TSV or a GeoNames dump.
+    """
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip() or line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            try:
+                if len(cols) >= 19:  # GeoNames: name, ..., lat, lng, ..., country code, ..., admin1 code
+                    yield cols[1], cols[10], cols[8], float(cols[4]), float(cols[5])
+                else:
+                    yield cols[0], cols[1], cols[2], float(cols[3]), float(cols[4])
+            except (IndexError, ValueError):
+                logger.warning("Skipping malformed gazetteer line: %r", line[:80])
+
+
+def build_index(gazetteer_path, index_path):
+    """
+    Write the binary k-d tree for a gazetteer. Returns the number of places.
+    """
+    points = []
+    for name, region, country, latitude, longitude in read_gazetteer(gazetteer_path):
+        label = "|".join(part.replace("|", "/") for part in (name, region, country))
+        points.append((_unit_vector(latitude, longitude), label))
+
+    ordered = [None] * len(points)
+    stack = [(0, len(points), 0, points)]
+    while stack:
+        lo, hi, axis, items = stack.pop()
+        if lo >= hi:
+            continue
+        items.sort(key=lambda item: item[0][axis])
+        mid = (lo + hi) // 2
+        split = mid - lo
+        ordered[mid] = items[split]
+        stack.append((lo, mid, (axis + 1) % 3, items[:split]))
+        stack.append((mid + 1, hi, (axis + 1) % 3, items[split + 1 :]))
+
+    names = bytearray()
+    offsets = [0]
+    for _, label in ordered:
+        names += label.encode("utf-8")
+        offsets.append(len(names))
+
+    directory = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(index_path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(_HEADER.pack(_MAGIC, _VERSION, len(ordered), len(names)))
+            for axis in range(3):
+                out.write(struct.pack(f"<{len(ordered)}d", *(vector[axis] for vector, _ in ordered)))
+            out.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            out.write(names)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(ordered)
+
+
+class KDTreeIndex:
+    """
+    Nearest-point search over a memory-mapped index file.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, names_length = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a SafeTrip geocoder index")
+        view = memoryview(self._map)
+        start = _HEADER.size
+        width = 8 * count
+        self.count = count
+        self._axes = [view[start + width * axis : start + width * (axis + 1)].cast("d") for axis in range(3)]
+        start += 3 * width
+        self._offsets = view[start : start + 4 * (count + 1)].cast("I")
+        self._names = view[start + 4 * (count + 1) : start + 4 * (count + 1) + names_length]
+
+    def label(self, index):
+        return bytes(self._names[self._offsets[index] : self._offsets[index + 1]]).decode("utf-8")
+
+    def nearest(self, x, y, z):
+        """
+        (index, squared chord distance) of the point nearest the unit vector.
+        """
+        xs, ys, zs = self._axes
+        query = (x, y, z)
+        best_index, best = -1, math.inf
+        stack = [(0, self.count, 0, 0.0)]
+        while stack:
+            lo, hi, axis, bound = stack.pop()
+            if lo >= hi or bound >= best:
+                continue
+            mid = (lo + hi) >> 1
+            dx, dy, dz = xs[mid] - x, ys[mid] - y, zs[mid] - z
+            distance = dx * dx + dy * dy + dz * dz
+            if distance < best:
+                best_index, best = mid, distance
+            diff = query[axis] - self._axes[axis][mid]
+            next_axis = axis + 1 if axis < 2 else 0
+            if diff < 0:
+                stack.append((mid + 1, hi, next_axis, diff * diff))
+                stack.append((lo, mid, next_axis, 0.0))
+            else:
+                stack.append((lo, mid, next_axis, diff * diff))
+                stack.append((mid + 1, hi, next_axis, 0.0))
+        return best_index, best
+
+    def point(self, index):
+        x, y, z = (axis[index] for axis in self._axes)
+        return math.degrees(math.asin(max(-1.0, min(1.0, z)))), math.degrees(math.atan2(y, x))
+
+
+_lock = threading.Lock()
+_index = None
+_index_source = None
+_cache = OrderedDict()
+
+
+def _paths():
+    gazetteer = str(getattr(settings, "GEOCODER_GAZETTEER", ""))
+    index = str(getattr(settings, "GEOCODER_INDEX_PATH", ""))
+    if not index and gazetteer:
+        # One file per gazetteer, so differently configured projects can share a cache dir.
+        stem = os.path.splitext(os.path.basename(gazetteer))[0]
+        digest = hashlib.sha1(os.path.abspath(gazetteer).encode()).hexdigest()[:8]
+        cache_dir = str(getattr(settings, "GEOCODER_CACHE_DIR", "") or os.path.join(tempfile.gettempdir(), "safetrip-geocoder"))
+        index = os.path.join(cache_dir, f"{stem}-{digest}.kdt")
+    return gazetteer, index
+
+
+def load():
+    """
+    Map the index, first building it if it is missing or stale and
+    GEOCODER_BUILD_ON_DEMAND is on. Returns None (and logs) when no
+    gazetteer is configured or no usable index can be had.
+    """
+    global _index, _index_source
+    gazetteer, index_path = _paths()
+    with _lock:
+        if _index_source == (gazetteer, index_path):
+            return _index
+        _index, _index_source = None, (gazetteer, index_path)
+        _cache.clear()
+        if not gazetteer:
+            return None
+        try:
+            if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(gazetteer):
+                if not getattr(settings, "GEOCODER_BUILD_ON_DEMAND", True):
+                    logger.warning("Geocoder index %s is missing or stale; run `manage.py build_geocoder`", index_path)
+                    return None
+                count = build_index(gazetteer, index_path)
+                logger.info("Built geocoder index %s (%d places)", index_path, count)
+            _index = KDTreeIndex(index_path)
+        except (OSError, ValueError, struct.error):
+            logger.exception("Reverse geocoder unavailable")
+        return _index
+
+
+def reverse(latitude, longitude):
+    """
+    The nearest gazetteer Place within GEOCODER_MAX_DISTANCE_KM, or None.
+    """
+    try:
+        key = (round(float(latitude), 4), round(float(longitude), 4))
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= key[0] <= 90 and -180 <= key[1] <= 180):
+        return None
+
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    index = _index if _index_source == _paths() else load()
+    if index is None or index.count == 0:
+        return None
+    position, chord_sq = index.nearest(*_unit_vector(*key))
+    distance_km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+    place = None
+    if distance_km <= float(getattr(settings, "GEOCODER_MAX_DISTANCE_KM", 50)):
+        name, region, country = (index.label(position).split("|") + ["", ""])[:3]
+        place_lat, place_lng = index.point(position)
+        place = Place(name, region, country, round(place_lat, 6), round(place_lng, 6), round(distance_km, 3))
+
+    with _lock:
+        _cache[key] = place
+        _cache.move_to_end(key)
+        while len(_cache) > int(getattr(settings, "GEOCODER_CACHE_SIZE", 4096)):
+            _cache.popitem(last=False)
+    return place
+
+
+def describe(latitude, longitude) -> str:
+    """
+    A short address for an alert, e.g. "Near Pune, Maharashtra (2.4 km)"; "" if unknown.
+    """
+    place = reverse(latitude, longitude)
+    if place is None:
+        return ""
+    label = ", ".join(part for part in (place.name, place.region) if part)
+    return f"Near {label} ({place.distance_km:.1f} km)"
@@ -0,0 +1,198 @@
+"""
+Profile image uploads and their resized variants.
+
+me_profile rejects a body whose Content-Length is already too big, then
+puts an UploadLimit in front of Django's upload handlers before it touches
+request.FILES. Django streams multipart bodies through the handlers in
+chunks (to a temporary file past FILE_UPLOAD_MAX_MEMORY_SIZE); UploadLimit
+stops storing as soon as a file passes PROFILE_IMAGE_MAX_BYTES, so an
+oversized photo costs one chunk of memory, not the whole file. The rest of
+the body is read and discarded rather than the connection reset, so the
+client still gets the JSON 413.
+
+The original is stored as uploaded. Once the profile save commits,
+schedule_variants() hands the resize to a small thread pool
+(PROFILE_IMAGE_WORKERS; Pillow releases the GIL while it decodes, resamples
+and encodes) that writes a "thumb" and a "medium" JPEG and records them on
+the profile. At most PROFILE_IMAGE_WORKERS + PROFILE_IMAGE_QUEUE_DEPTH
+images are processing or waiting; beyond that, and for anything lost in a
+restart, `manage.py process_profile_images` fills in the missing variants.
+"""
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FIELDS = {"thumb": "image_thumb", "medium": "image_medium"}
+
+
+def _max_bytes():
+    return int(getattr(settings, "PROFILE_IMAGE_MAX_BYTES", 5 * 1024 * 1024))
+
+
+class UploadLimit(FileUploadHandler):
+    """
+    Pass-through upload handler that stops the upload once any file
+    exceeds max_bytes; too_large tells the view why the file is missing.
+    """
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = _max_bytes() if max_bytes is None else max_bytes
+        self.too_large = False
+        self._received = 0
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self._received += len(raw_data)
+        if self._received > self.max_bytes:
+            self.too_large = True
+            # Don't buffer the rest; Django drains it so the 413 reaches the client.
+            raise StopUpload(connection_reset=False)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def limit_uploads(request) -> UploadLimit:
+    """
+    Install an UploadLimit on request; call before reading request.POST / FILES.
+    """
+    limit = UploadLimit(request)
+    request.upload_handlers.insert(0, limit)
+    return limit
+
+
+def _sizes():
+    return {
+        "thumb": int(getattr(settings, "PROFILE_IMAGE_THUMB_PX", 128)),
+        "medium": int(getattr(settings, "PROFILE_IMAGE_MEDIUM_PX", 512)),
+    }
+
+
+def render_variants(source) -> dict:
+    """
+    {variant: JPEG bytes} for an image file object, each fitting in a
+    square of its PROFILE_IMAGE_*_PX, EXIF orientation applied.
+    """
+    sizes = _sizes()
+    quality = int(getattr(settings, "PROFILE_IMAGE_QUALITY", 80))
+    max_pixels = int(getattr(settings, "PROFILE_IMAGE_MAX_PIXELS", 40_000_000))
+    with Image.open(source) as image:
+        if image.width * image.height > max_pixels:
+            raise ValueError(f"image is {image.width}x{image.height}, over PROFILE_IMAGE_MAX_PIXELS")
+        largest = max(sizes.values())
+        # JPEG only: decode at the smallest 1/2, 1/4 or 1/8 scale still >= the largest variant.
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            flat = Image.new("RGB", image.size, (255, 255, 255))
+            flat.paste(image, mask=image.getchannel("A"))
+            image = flat
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        rendered = {}
+        # Largest first; each smaller variant is resampled from the previous one.
+        for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+            rendered[name] = out.getvalue()
+        return rendered
+
+
+def _variant_name(profile_id, source_name, variant):
+    # Derived from the original's name, so each upload gets new URLs and
+    # reprocessing the same upload overwrites its own files.
+    digest = hashlib.sha1(source_name.encode()).hexdigest()[:12]
+    return f"profile_images/variants/{profile_id}-{digest}-{variant}.jpg"
+
+
+def process_variants(profile_id, source_name) -> bool:
+    """
+    Render and store the variants of a profile's image and record them on
+    the profile. Returns False (and stores nothing) when the profile is
+    gone or its image has been replaced since.
+    """
+    with default_storage.open(source_name, "rb") as source:
+        rendered = render_variants(source)
+
+    names = {}
+    for variant, data in rendered.items():
+        name = _variant_name(profile_id, source_name, variant)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        names[variant] = default_storage.save(name, ContentFile(data))
+
+    with transaction.atomic():
+        profile = UserProfile.objects.select_for_update().filter(pk=profile_id).first()
+        if profile is None or profile.image.name != source_name:
+            for name in names.values():
+                default_storage.delete(name)
+            return False
+        for variant, field in VARIANT_FIELDS.items():
+            getattr(profile, field).name = names[variant]
+        # save(), not update(): post_save invalidates the cached profile and updated_at moves its ETag.
+        profile.save(update_fields=[*VARIANT_FIELDS.values(), "updated_at"])
+    return True
+
+
+_state_lock = threading.Lock()
+_state = None  # (workers, queue_depth, executor, semaphore)
+
+
+def _pool():
+    global _state
+    workers = int(getattr(settings, "PROFILE_IMAGE_WORKERS", 2))
+    queue_depth = int(getattr(settings, "PROFILE_IMAGE_QUEUE_DEPTH", 16))
+    with _state_lock:
+        if _state is None or _state[:2] != (workers, queue_depth):
+            if _state is not None:
+                _state[2].shutdown(wait=False)
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="safetrip-images")
+            _state = (workers, queue_depth, executor, threading.BoundedSemaphore(workers + queue_depth))
+        return _state[2], _state[3]
+
+
+def _run(profile_id, source_name, slots):
+    try:
+        process_variants(profile_id, source_name)
+    except Exception:
+        logger.exception("Could not process image %s of profile %s", source_name, profile_id)
+    finally:
+        slots.release()
+        close_old_connections()
+
+
+def schedule_variants(profile_id, source_name):
+    """
+    Queue process_variants on the image pool. When the pool is saturated
+    the image is left for `manage.py process_profile_images`.
+    """
+    executor, slots = _pool()
+    if not slots.acquire(blocking=False):
+        logger.warning("Image pool busy; variants of profile %s left for process_profile_images", profile_id)
+        return None
+    try:
+        return executor.submit(_run, profile_id, source_name, slots)
+    except RuntimeError:
+        slots.release()
+        raise
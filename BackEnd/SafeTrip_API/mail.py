@@ -0,0 +1,159 @@
+"""
+Pooled SMTP email backend.
+
+Django's SMTP backend opens, STARTTLS-negotiates, logs in and quits a
+connection for every EmailMessage.send(). PooledSMTPEmailBackend keeps a few
+authenticated connections per process and lends them out instead:
+
+    EMAIL_BACKEND = "SafeTrip_API.mail.PooledSMTPEmailBackend"
+
+Connections idle longer than EMAIL_POOL_HEALTHCHECK_SECONDS are checked
+with NOOP before reuse, connections idle longer than EMAIL_POOL_IDLE_SECONDS
+are dropped, and each one is retired after
+EMAIL_POOL_MAX_MESSAGES_PER_CONNECTION messages.
+"""
+import smtplib
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.mail.backends import smtp
+
+
+class _SMTPConnectionPool:
+    def __init__(self):
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Return a live idle connection, or None if a new one must be opened.
+        """
+        idle_limit = float(getattr(settings, "EMAIL_POOL_IDLE_SECONDS", 120))
+        healthcheck_after = float(getattr(settings, "EMAIL_POOL_HEALTHCHECK_SECONDS", 15))
+
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection = self._idle.pop()  # most recently used first
+
+            idle_for = time.monotonic() - connection._safetrip_idle_since
+            if idle_for > idle_limit:
+                _quit_quietly(connection)
+                continue
+            if idle_for > healthcheck_after and not _is_alive(connection):
+                _quit_quietly(connection)
+                continue
+            return connection
+
+    def release(self, connection) -> bool:
+        """
+        Park a connection for reuse. Returns False if the pool is full.
+        """
+        size = int(getattr(settings, "EMAIL_POOL_SIZE", 4))
+        connection._safetrip_idle_since = time.monotonic()
+        with self._lock:
+            if len(self._idle) >= size:
+                return False
+            self._idle.append(connection)
+        return True
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _is_alive(connection) -> bool:
+    try:
+        return connection.noop()[0] == 250
+    except (smtplib.SMTPException, OSError):
+        return False
+
+
+def _quit_quietly(connection):
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        try:
+            connection.close()
+        except OSError:
+            pass
+
+
+def get_pool(key) -> _SMTPConnectionPool:
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _SMTPConnectionPool()
+        return pool
+
+
+class PooledSMTPEmailBackend(smtp.EmailBackend):
+    """
+    Drop-in replacement for django.core.mail.backends.smtp.EmailBackend
+    that borrows connections from a process-wide pool.
+    """
+
+    def _pool(self) -> _SMTPConnectionPool:
+        return get_pool((self.host, self.port, self.username, self.use_tls, self.use_ssl))
+
+    def open(self):
+        if self.connection:
+            return False
+
+        connection = self._pool().acquire()
+        if connection is not None:
+            self.connection = connection
+            return True
+
+        opened = super().open()
+        if opened and self.connection is not None:
+            self.connection._safetrip_messages = 0
+            self.connection._safetrip_idle_since = time.monotonic()
+        return opened
+
+    def close(self):
+        if self.connection is None:
+            return
+
+        max_messages = int(getattr(settings, "EMAIL_POOL_MAX_MESSAGES_PER_CONNECTION", 50))
+        connection = self.connection
+        if connection._safetrip_messages < max_messages and self._pool().release(connection):
+            self.connection = None
+            return
+        super().close()
+
+    def _discard_connection(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            _quit_quietly(connection)
+
+    def _send(self, email_message):
+        try:
+            sent = super()._send(email_message)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError):
+            # A pooled connection the server dropped between health checks: reconnect once.
+            self._discard_connection()
+            if not self.open():
+                raise
+            sent = self._send_or_discard(email_message)
+        except Exception:
+            # Leave the server in an unknown state out of the pool.
+            self._discard_connection()
+            raise
+
+        if not sent:
+            # fail_silently swallowed an SMTP error; don't lend that connection out again.
+            self._discard_connection()
+        elif self.connection is not None:
+            self.connection._safetrip_messages += 1
+        return sent
+
+    def _send_or_discard(self, email_message):
+        try:
+            return super()._send(email_message)
+        except BaseException:
+            self._discard_connection()
+            raise
@@ -0,0 +1,151 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from SafeTrip_API import geo, stats
+from SafeTrip_API.models import AlertStatBucket, EmergencyAlert
+from SafeTrip_API.views import ALERT_LIST_FIELDS
+
+User = get_user_model()
+
+STATUSES = ["PENDING"] * 1 + ["IN_PROGRESS"] * 2 + ["RESOLVED"] * 17
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N alerts inside a transaction, then report query plans and timings for the "
+        "dashboard queries with and without the EmergencyAlert indexes. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alerts", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+        parser.add_argument("--no-plans", action="store_true", help="Skip EXPLAIN output.")
+
+    def _queries(self, sample_user_id):
+        now = timezone.now()
+        return {
+            "dashboard first page": lambda: EmergencyAlert.objects.order_by("-created_at", "-id").values(*ALERT_LIST_FIELDS)[:100],
+            "pending queue": lambda: EmergencyAlert.objects.filter(status="PENDING")
+            .order_by("-created_at", "-id")
+            .values(*ALERT_LIST_FIELDS)[:100],
+            "status + last 24h": lambda: EmergencyAlert.objects.filter(
+                status="IN_PROGRESS", created_at__gte=now - timedelta(days=1)
+            )
+            .order_by("-created_at", "-id")
+            .values(*ALERT_LIST_FIELDS)[:100],
+            "user history": lambda: EmergencyAlert.objects.filter(user_id=sample_user_id)
+            .order_by("-created_at")
+            .values(*ALERT_LIST_FIELDS)[:20],
+            "list etag stamp": lambda: EmergencyAlert.objects.order_by("-updated_at").values_list("updated_at")[:1],
+            "active within 5km": lambda: EmergencyAlert.objects.filter(
+                geo.nearby_filter(19.0760, 72.8777, 5, ["PENDING", "IN_PROGRESS"])
+            ).order_by().values_list("id", "latitude", "longitude"),
+            "active within 50km": lambda: EmergencyAlert.objects.filter(
+                geo.nearby_filter(19.0760, 72.8777, 50, ["PENDING", "IN_PROGRESS"])
+            ).order_by().values_list("id", "latitude", "longitude"),
+            "pending count": lambda: EmergencyAlert.objects.filter(status="PENDING").order_by(),
+            # The dashboard's 30-day series: aggregated from alerts vs read from AlertStatBucket
+            "30 days by status (aggregate)": lambda: EmergencyAlert.objects.filter(created_at__gte=now - timedelta(days=30))
+            .order_by()
+            .values("status", day=TruncDay("created_at"))
+            .annotate(n=Count("id")),
+            "30 days by status (summary)": lambda: AlertStatBucket.objects.filter(
+                period="day", region="", period_start__gte=stats.period_start(now - timedelta(days=30), "day")
+            ).order_by().values_list("period_start", "status", "count"),
+        }
+
+    def _seed(self, alerts, users):
+        rng = random.Random(42)
+        user_objs = User.objects.bulk_create(
+            [User(username=f"bench-user-{i}", email=f"bench{i}@example.com", password="!") for i in range(users)]
+        )
+        now = timezone.now()
+        created_at = EmergencyAlert._meta.get_field("created_at")
+        # Seeded rows need spread-out timestamps, which auto_now_add would overwrite.
+        created_at.auto_now_add = False
+        try:
+            batch = []
+            for i in range(alerts):
+                batch.append(
+                    EmergencyAlert(
+                        user=rng.choice(user_objs),
+                        name=f"Bench {i}",
+                        phone="9876543210",
+                        latitude=round(rng.uniform(8, 35), 6),
+                        longitude=round(rng.uniform(68, 97), 6),
+                        message="Emergency SOS Alert",
+                        status=rng.choice(STATUSES),
+                        created_at=now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+                    )
+                )
+                batch[-1].set_geohash()
+                if len(batch) >= 5000:
+                    EmergencyAlert.objects.bulk_create(batch)
+                    batch = []
+            EmergencyAlert.objects.bulk_create(batch)
+        finally:
+            created_at.auto_now_add = True
+        return user_objs[0].id
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _measure(self, label, queries, repeat, show_plans):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label} =="))
+        for name, build in queries.items():
+            if name.endswith("count"):
+                run = lambda: build().count()  # noqa: E731
+            else:
+                run = lambda: list(build())  # noqa: E731
+            run()
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                samples.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"{name:<30} median={statistics.median(samples):8.2f}ms  max={max(samples):8.2f}ms")
+            if show_plans:
+                for line in build().explain().splitlines():
+                    self.stdout.write(f"    {line}")
+
+    def handle(self, *args, **options):
+        index_names = [index.name for index in EmergencyAlert._meta.indexes]
+        self.stdout.write(f"Seeding {options['alerts']} alerts for {options['users']} users on {connection.vendor}...")
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                sample_user_id = self._seed(options["alerts"], options["users"])
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+                started = time.perf_counter()
+                stats.rebuild()
+                self.stdout.write(f"Rebuilt alert stats in {time.perf_counter() - started:.1f}s")
+                queries = self._queries(sample_user_id)
+
+                self._analyze()
+                self._measure("with indexes", queries, options["repeat"], not options["no_plans"])
+
+                with connection.cursor() as cursor:
+                    for name in index_names:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+                self._analyze()
+                self._measure(f"without {', '.join(index_names)}", queries, options["repeat"], not options["no_plans"])
+
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS("\nRolled back: seeded rows removed, indexes restored."))
@@ -0,0 +1,85 @@
+import heapq
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from SafeTrip_API.dispatch import Responder, ResponderGrid
+from SafeTrip_API.geo import haversine_km
+
+# (south, west, north, east): a metro area and a whole country
+REGIONS = {
+    "city": (18.85, 72.75, 19.30, 73.10),
+    "country": (8.0, 68.0, 35.0, 97.0),
+}
+
+
+def _brute_force(responders, latitude, longitude, k, max_km):
+    distances = ((haversine_km(latitude, longitude, r.latitude, r.longitude), r.user_id) for r in responders)
+    return heapq.nsmallest(k, (d for d in distances if d[0] <= max_km))
+
+
+class Command(BaseCommand):
+    help = (
+        "Time nearest-k responder lookups on the in-memory grid against a linear scan, over "
+        "synthetic responder fleets of several sizes. No database access."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fleets", default="100,1000,10000,100000", help="Comma-separated fleet sizes.")
+        parser.add_argument("--region", choices=sorted(REGIONS), default="city")
+        parser.add_argument("--queries", type=int, default=2000)
+        parser.add_argument("--k", type=int, default=3)
+        parser.add_argument("--max-km", type=float, default=50)
+        parser.add_argument("--cell-degrees", type=float, default=0.01)
+
+    def _time(self, func, args_list):
+        samples = []
+        for args in args_list:
+            started = time.perf_counter_ns()
+            func(*args)
+            samples.append((time.perf_counter_ns() - started) / 1000)
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        south, west, north, east = REGIONS[options["region"]]
+        k, max_km = options["k"], options["max_km"]
+
+        def point():
+            return rng.uniform(south, north), rng.uniform(west, east)
+
+        self.stdout.write(
+            f"region={options['region']} k={k} max_km={max_km:g} cell={options['cell_degrees']}deg "
+            f"queries={options['queries']}"
+        )
+        self.stdout.write(
+            f"{'fleet':>8} {'grid p50':>10} {'grid p99':>10} {'scan p50':>10} {'upsert p50':>11} {'exact top-k':>12}"
+        )
+        for size in [int(n) for n in options["fleets"].split(",")]:
+            fleet = [Responder(user_id, *point(), "", "", 0.0) for user_id in range(size)]
+            index = ResponderGrid(options["cell_degrees"])
+            for responder in fleet:
+                index.upsert(responder)
+            queries = [point() for _ in range(options["queries"])]
+
+            grid_p50, grid_p99 = self._time(lambda lat, lng: index.nearest(lat, lng, k, max_km), queries)
+            scan_queries = queries[: max(1, min(len(queries), 2_000_000 // size))]
+            scan_p50, _ = self._time(lambda lat, lng: _brute_force(fleet, lat, lng, k, max_km), scan_queries)
+
+            moves = [(fleet[rng.randrange(size)]._replace(latitude=lat, longitude=lng),) for lat, lng in queries]
+            upsert_p50, _ = self._time(index.upsert, moves)
+            fleet = [responder for bucket in index._cells.values() for responder in bucket.values()]
+
+            agree = sum(
+                [m.responder.user_id for m in index.nearest(lat, lng, k, max_km)]
+                == [user_id for _, user_id in _brute_force(fleet, lat, lng, k, max_km)]
+                for lat, lng in scan_queries[:200]
+            )
+            checked = len(scan_queries[:200])
+            self.stdout.write(
+                f"{size:>8} {grid_p50:>8.1f}us {grid_p99:>8.1f}us {scan_p50:>8.1f}us {upsert_p50:>9.1f}us "
+                f"{agree:>6}/{checked:<5}"
+            )
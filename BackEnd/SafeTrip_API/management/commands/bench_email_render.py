@@ -0,0 +1,202 @@
+import statistics
+import time
+import warnings
+from email import message_from_bytes
+from types import SimpleNamespace
+
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.html import format_html
+
+from SafeTrip_API.emails import otp_email, render_email, sos_email
+
+# ---------------------------------------------------------------------------
+# The pre-template implementation, kept verbatim for comparison.
+# ---------------------------------------------------------------------------
+
+
+def _legacy_otp(otp, lock_expiry_minutes):
+    return format_html(
+        f"""
+    <div style="
+        font-family: 'Helvetica Neue', Arial, sans-serif;
+        color: #333;
+        text-align: center;
+        border: 2px solid #0057ff;
+        padding: 25px;
+        margin: 20px auto;
+        border-radius: 12px;
+        max-width: 600px;
+        box-shadow: 0px 4px 12px rgba(0,0,0,0.2);
+    ">
+        <p style="font-size: 20px; font-weight: bold; color: #0057ff;">Secure Verification</p>
+        <p style="font-size: 16px;">Dear User,</p>
+        <p style="font-size: 16px;">Your One-Time Password (OTP) for verification is:</p>
+        <div style="
+            background-color: #0057ff;
+            color: white;
+            font-size: 32px;
+            padding: 18px 30px;
+            display: inline-block;
+            border-radius: 10px;
+            margin: 15px 0;
+            font-weight: bold;
+            letter-spacing: 4px;
+            text-align: center;
+            box-shadow: 0px 5px 10px rgba(0,0,0,0.3);
+        ">{otp}</div>
+        <p style="font-size: 16px; font-weight: bold; color: #d32f2f;">This OTP is valid for {lock_expiry_minutes} minutes. Do not share it with anyone.</p>
+        <p style="font-size: 14px; color: #555;">If you did not request this, please ignore this email.</p>
+        <div style="border-top: 2px solid #0057ff; margin: 20px auto; width: 60%;"></div>
+        <p style="font-size: 16px;">Best regards,</p>
+        <p style="font-size: 18px; font-weight: bold; color: #0057ff;">Team SafeTrip</p>
+    </div>
+        """
+    )
+
+
+def _legacy_sos(user, full_name, emergency_contact, blood_group, height_cm, weight_kg, message, latitude, longitude, address, maps_link):
+    subject = f"🚨 SafeTrip EMERGENCY ALERT - {full_name}"
+    html = format_html(
+        f"""
+    <div style="font-family: Arial, sans-serif; color: #222; max-width: 680px; margin: 0 auto;">
+      <div style="background:#b71c1c; color:#fff; padding:16px 18px; border-radius:10px;">
+        <h2 style="margin:0;">🚨 EMERGENCY ALERT</h2>
+        <p style="margin:6px 0 0;">A SafeTrip user triggered an emergency SOS alert and needs immediate assistance!</p>
+      </div>
+
+      <div style="padding:16px 6px;">
+        <h3 style="margin:14px 0 8px; color:#b71c1c;">👤 Person Details</h3>
+        <ul style="margin:0; padding-left:18px; line-height:1.8;">
+          <li><b>Name:</b> {full_name}</li>
+          <li><b>Username:</b> {user.username}</li>
+          <li><b>Email:</b> {user.email}</li>
+          <li><b>Contact:</b> {getattr(user, "contact_no", "") or "-"}</li>
+          <li><b>Emergency Contact:</b> {emergency_contact}</li>
+        </ul>
+
+        <h3 style="margin:16px 0 8px; color:#b71c1c;">🩺 Medical Information</h3>
+        <ul style="margin:0; padding-left:18px; line-height:1.8;">
+          <li><b>Blood Group:</b> <span style="color:#c62828; font-weight:bold;">{blood_group}</span></li>
+          <li><b>Height:</b> {height_cm} cm</li>
+          <li><b>Weight:</b> {weight_kg} kg</li>
+        </ul>
+
+        <h3 style="margin:16px 0 8px; color:#b71c1c;">💬 Alert Message</h3>
+        <div style="border:1px solid #ddd; border-radius:10px; padding:12px; background:#fff3e0;">
+          {message}
+        </div>
+
+        <h3 style="margin:16px 0 8px; color:#b71c1c;">📍 Current Location</h3>
+        <ul style="margin:0; padding-left:18px; line-height:1.8;">
+          <li><b>Latitude:</b> {latitude if latitude is not None else "-"}</li>
+          <li><b>Longitude:</b> {longitude if longitude is not None else "-"}</li>
+          <li><b>Address:</b> {address or "-"}</li>
+        </ul>
+
+        {format_html(f'<p style="margin-top:12px;"><a href="{maps_link}" target="_blank" rel="noreferrer" style="display:inline-block;background:#b71c1c;color:#fff;padding:12px 20px;border-radius:10px;text-decoration:none;font-weight:bold;">🗺️ Open Location in Google Maps</a></p>') if maps_link else ""}
+
+        <div style="margin-top:20px; padding:12px; background:#ffebee; border-left:4px solid #b71c1c; border-radius:4px;">
+          <p style="margin:0; font-weight:bold; color:#b71c1c;">⚠️ URGENT ACTION REQUIRED</p>
+          <p style="margin:4px 0 0; font-size:14px;">This person needs immediate assistance. Please respond as soon as possible.</p>
+        </div>
+
+        <p style="margin-top:18px; font-size:12px; color:#666;">
+          This email was generated by SafeTrip Emergency Alert System.<br>
+          Time: {timezone.now().strftime("%Y-%m-%d %H:%M:%S %Z")}
+        </p>
+      </div>
+    </div>
+        """
+    )
+    return subject, html
+
+
+SOS_CONTEXT = {
+    "full_name": "Asha Kulkarni",
+    "emergency_contact": "+919876543210",
+    "blood_group": "O+",
+    "height_cm": "162.00",
+    "weight_kg": "55.00",
+    "message": "I feel unsafe near the bus stand",
+    "latitude": 18.5204,
+    "longitude": 73.8567,
+    "address": "Swargate, Pune",
+    "maps_link": "https://www.google.com/maps?q=18.5204,73.8567",
+}
+USER = SimpleNamespace(username="asha", email="asha@example.com", contact_no="9876543210")
+
+
+def _legacy_html_message(subject, html):
+    message = EmailMessage(subject=subject, body=html, from_email="no-reply@safetrip.local", to=["police@example.com"])
+    message.content_subtype = "html"
+    return message
+
+
+def _template_message(subject, template, context):
+    text, html = render_email(template, context)
+    message = EmailMultiAlternatives(subject=subject, body=text, from_email="no-reply@safetrip.local", to=["police@example.com"])
+    message.attach_alternative(html, "text/html")
+    return message
+
+
+CASES = {
+    "OTP": {
+        "legacy_request": lambda: _legacy_otp("482913", 5),
+        "legacy_message": lambda: _legacy_html_message("SafeTrip - Your OTP Code", _legacy_otp("482913", 5)),
+        "new_request": lambda: otp_email("482913", 5),
+        "new_message": lambda: _template_message(*otp_email("482913", 5)),
+    },
+    "SOS": {
+        "legacy_request": lambda: _legacy_sos(USER, **SOS_CONTEXT),
+        "legacy_message": lambda: _legacy_html_message(*_legacy_sos(USER, **SOS_CONTEXT)),
+        "new_request": lambda: sos_email(username=USER.username, email=USER.email, contact_no=USER.contact_no, **SOS_CONTEXT),
+        "new_message": lambda: _template_message(
+            *sos_email(username=USER.username, email=USER.email, contact_no=USER.contact_no, **SOS_CONTEXT)
+        ),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = "Compare OTP / SOS email cost: legacy f-string + format_html vs queued templates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def _time(self, func, iterations):
+        func()  # warm the template cache
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1_000_000)
+        return statistics.mean(samples)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        # format_html() without arguments is deprecated; the legacy path relies on it.
+        warnings.simplefilter("ignore")
+        self.stdout.write(
+            f"{iterations} iterations. 'request' = work done inside the HTTP request, "
+            "'message' = render + MIME-encode the final email"
+        )
+        for label, case in CASES.items():
+            legacy_request = self._time(case["legacy_request"], iterations)
+            new_request = self._time(case["new_request"], iterations)
+            legacy_message = self._time(lambda: case["legacy_message"]().message(), iterations)
+            new_message = self._time(lambda: case["new_message"]().message(), iterations)
+
+            legacy_bytes = case["legacy_message"]().message().as_bytes()
+            new_bytes = case["new_message"]().message().as_bytes()
+            parts = [p.get_content_type() for p in message_from_bytes(new_bytes).walk() if not p.is_multipart()]
+
+            self.stdout.write(
+                f"{label} legacy:   request={legacy_request:7.1f}us  message={legacy_message:7.1f}us  "
+                f"size={len(legacy_bytes)}B  parts=text/html"
+            )
+            self.stdout.write(
+                f"{label} template: request={new_request:7.1f}us  message={new_message:7.1f}us  "
+                f"size={len(new_bytes)}B  parts={'+'.join(parts)}"
+            )
@@ -0,0 +1,88 @@
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from SafeTrip_API import geocoder
+
+
+def _brute_force(places, latitude, longitude):
+    x, y, z = geocoder._unit_vector(latitude, longitude)
+    return min(range(len(places)), key=lambda i: (places[i][0] - x) ** 2 + (places[i][1] - y) ** 2 + (places[i][2] - z) ** 2)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time reverse geocoding of random points in India: k-d tree lookups, cached lookups and "
+        "a linear scan, on GEOCODER_GAZETTEER or a synthetic gazetteer of --synthetic places."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--synthetic", type=int, default=0, help="Use N random places instead of the gazetteer.")
+        parser.add_argument("--queries", type=int, default=5000)
+
+    def _time(self, func, args_list):
+        samples = []
+        for args in args_list:
+            started = time.perf_counter_ns()
+            func(*args)
+            samples.append((time.perf_counter_ns() - started) / 1000)
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+    def handle(self, *args, **options):
+        rng = random.Random(11)
+
+        def point():
+            return rng.uniform(8.0, 35.0), rng.uniform(68.0, 97.0)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            gazetteer = settings.GEOCODER_GAZETTEER
+            if options["synthetic"]:
+                gazetteer = os.path.join(workdir, "synthetic.tsv")
+                with open(gazetteer, "w", encoding="utf-8") as out:
+                    for n in range(options["synthetic"]):
+                        out.write("Place %d\tRegion\tIN\t%.6f\t%.6f\n" % (n, *point()))
+            index_path = os.path.join(workdir, "bench.kdt")
+
+            started = time.perf_counter()
+            count = geocoder.build_index(gazetteer, index_path)
+            build_s = time.perf_counter() - started
+            started = time.perf_counter()
+            index = geocoder.KDTreeIndex(index_path)
+            open_ms = (time.perf_counter() - started) * 1000
+            self.stdout.write(
+                f"places={count} index={os.path.getsize(index_path) / 1024:.0f}KiB "
+                f"build={build_s:.2f}s open={open_ms:.2f}ms queries={options['queries']}"
+            )
+
+            queries = [point() for _ in range(options["queries"])]
+            vectors = [geocoder._unit_vector(lat, lng) for lat, lng in queries]
+            tree_p50, tree_p99 = self._time(index.nearest, vectors)
+
+            places = [tuple(axis[i] for axis in index._axes) for i in range(count)]
+            scan_queries = queries[: max(1, min(len(queries), 2_000_000 // max(1, count)))]
+            scan_p50, _ = self._time(lambda lat, lng: _brute_force(places, lat, lng), scan_queries)
+            agree = sum(
+                index.nearest(*geocoder._unit_vector(lat, lng))[0] == _brute_force(places, lat, lng)
+                for lat, lng in scan_queries[:500]
+            )
+
+            with override_settings(
+                GEOCODER_GAZETTEER=gazetteer, GEOCODER_INDEX_PATH=index_path, GEOCODER_MAX_DISTANCE_KM=math.inf
+            ):
+                geocoder.load()
+                cold_p50, _ = self._time(geocoder.describe, queries)
+                warm_p50, _ = self._time(geocoder.describe, queries[-settings.GEOCODER_CACHE_SIZE :])
+            geocoder._index_source = None  # the next caller maps the configured index again
+
+            self.stdout.write(f"k-d tree      p50={tree_p50:7.1f}us  p99={tree_p99:7.1f}us")
+            self.stdout.write(f"describe      p50={cold_p50:7.1f}us  (uncached)")
+            self.stdout.write(f"describe      p50={warm_p50:7.1f}us  (cached)")
+            self.stdout.write(f"linear scan   p50={scan_p50:7.1f}us  exact={agree}/{len(scan_queries[:500])}")
@@ -0,0 +1,77 @@
+import secrets
+import time
+from datetime import timedelta
+
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from SafeTrip_API.models import OTPStorage
+from SafeTrip_API.otp import issue_otp, redeem_otp
+
+
+def _table_cycle(email):
+    """
+    The OTPStorage path send_otp / verify_otp used before OTPs moved to the cache.
+    """
+    now = timezone.now()
+    last = OTPStorage.objects.filter(email=email).order_by("-created_at").first()
+    counter = int(last.counter or 0) if last and now - last.created_at <= timedelta(minutes=10) else 0
+    OTPStorage.objects.filter(email=email, is_expired=False).update(is_expired=True)
+    otp = str(secrets.randbelow(900000) + 100000)
+    OTPStorage.objects.create(email=email, otp=otp, counter=counter + 1, is_expired=False)
+
+    entry = OTPStorage.objects.filter(email=email, otp=otp).order_by("-created_at").first()
+    entry.is_expired = True
+    entry.save(update_fields=["is_expired"])
+
+
+def _cache_cycle(email):
+    redeem_otp(email, issue_otp(email))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure send+verify OTP cycles per second: the old OTPStorage table path vs the cache-backed "
+        "path. Runs against the configured database and cache; bench rows and keys are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cycles", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=200, help="Distinct emails the cycles rotate through.")
+        parser.add_argument("--history", type=int, default=50_000, help="Old OTPStorage rows to seed first.")
+
+    def _run(self, label, cycle, cycles, emails):
+        started = time.perf_counter()
+        for n in range(cycles):
+            cycle(emails[n % len(emails)])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<28} {cycles / elapsed:9.0f} cycles/s  {elapsed / cycles * 1000:7.3f}ms/cycle")
+
+    def handle(self, *args, **options):
+        cycles, users = options["cycles"], options["users"]
+        emails = [f"bench-otp-{n}@example.com" for n in range(users)]
+        self.stdout.write(f"{cycles} send+verify cycles over {users} emails on {connection.vendor}")
+
+        # Autocommit, like the views: every write in the old path is its own commit.
+        OTPStorage.objects.bulk_create(
+            [OTPStorage(email=emails[n % users], otp="000000", is_expired=True) for n in range(options["history"])],
+            batch_size=5000,
+        )
+        try:
+            self._run(f"OTPStorage table (+{options['history']} rows)", _table_cycle, cycles, emails)
+        finally:
+            OTPStorage.objects.filter(email__in=emails).delete()
+
+        # Rate limits would stop the loop after a few sends per email; the
+        # audit sink is off so only the request-path cost is measured.
+        limits = {
+            "OTP_RESEND_SECONDS": 0,
+            "OTP_MAX_SENDS_PER_WINDOW": cycles + 1,
+            "OTP_AUDIT_ENABLED": False,
+        }
+        with override_settings(**limits):
+            self._run(f"cache ({caches['default'].__class__.__name__})", _cache_cycle, cycles, emails)
+        cache.delete_many([f"safetrip:otp:{kind}:{email}" for email in emails for kind in ("code", "tries", "sends", "cooldown")])
@@ -0,0 +1,120 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from SafeTrip_API import passwords
+from SafeTrip_API.emails import sos_email
+
+PASSWORD = "correct horse battery staple"
+
+
+def _sos_request(io_seconds):
+    # Stand-in for send_emergency_alert: build the payloads, then wait on the database.
+    subject, template, context = sos_email(
+        full_name="Bench User",
+        username="bench",
+        email="bench@example.com",
+        contact_no="9876543210",
+        emergency_contact="9876543211",
+        blood_group="O+",
+        height_cm="170",
+        weight_kg="65",
+        message="Emergency SOS Alert",
+        latitude="19.076090",
+        longitude="72.877426",
+        address="Mumbai",
+        maps_link="https://maps.google.com/?q=19.076090,72.877426",
+    )
+    json.dumps({"subject": subject, "template": template, "context": context})
+    time.sleep(io_seconds)
+
+
+def _login_inline(encoded):
+    return hashers.check_password(PASSWORD, encoded)
+
+
+def _login_pooled(encoded):
+    try:
+        return passwords._run(passwords._check, PASSWORD, encoded)[0]  # (valid, needs_rehash)
+    except passwords.PasswordHasherBusy:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate an app server's request threads serving a steady SOS stream while login load "
+        "ramps, with PBKDF2 run inline on the request thread vs on the bounded hasher pool. "
+        "Reports SOS latency (queueing included) per step."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--request-threads", type=int, default=8, help="App server worker threads.")
+        parser.add_argument("--sos-rate", type=float, default=40.0, help="SOS requests per second.")
+        parser.add_argument("--login-rates", default="0,2,5,10,20", help="Comma-separated logins/second steps.")
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per step.")
+        parser.add_argument("--io-ms", type=float, default=3.0, help="Simulated DB time per SOS request.")
+        parser.add_argument("--hasher-workers", type=int, default=1)
+        parser.add_argument("--queue-depth", type=int, default=2)
+
+    def _step(self, login, encoded, login_rate, options):
+        server = ThreadPoolExecutor(max_workers=options["request_threads"])
+        sos_latencies, outcomes = [], []
+        lock = threading.Lock()
+
+        def sos(submitted):
+            _sos_request(options["io_ms"] / 1000)
+            with lock:
+                sos_latencies.append((time.perf_counter() - submitted) * 1000)
+
+        def do_login():
+            result = login(encoded)
+            with lock:
+                outcomes.append(result)
+
+        events = [(n / options["sos_rate"], "sos") for n in range(int(options["duration"] * options["sos_rate"]))]
+        if login_rate:
+            events += [(n / login_rate, "login") for n in range(int(options["duration"] * login_rate))]
+        events.sort()
+
+        started = time.perf_counter()
+        for at, kind in events:
+            delay = started + at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if kind == "sos":
+                server.submit(sos, time.perf_counter())
+            else:
+                server.submit(do_login)
+        server.shutdown(wait=True)
+
+        sos_latencies.sort()
+        p99 = sos_latencies[max(0, int(len(sos_latencies) * 0.99) - 1)]
+        return statistics.median(sos_latencies), p99, sum(1 for o in outcomes if o is True), sum(1 for o in outcomes if o is None)
+
+    def handle(self, *args, **options):
+        encoded = hashers.make_password(PASSWORD)
+        started = time.perf_counter()
+        hashers.check_password(PASSWORD, encoded)
+        self.stdout.write(
+            f"{encoded.split('$')[0]} check: {(time.perf_counter() - started) * 1000:.0f}ms; "
+            f"{options['request_threads']} request threads, {options['sos_rate']:.0f} SOS/s, "
+            f"hasher pool {options['hasher_workers']}+{options['queue_depth']}"
+        )
+        rates = [float(rate) for rate in options["login_rates"].split(",")]
+        pool_settings = {
+            "PASSWORD_HASHER_WORKERS": options["hasher_workers"],
+            "PASSWORD_HASHER_QUEUE_DEPTH": options["queue_depth"],
+        }
+
+        self.stdout.write(f"{'logins/s':>9} {'mode':<7} {'SOS p50':>9} {'SOS p99':>9} {'logins ok':>10} {'503s':>6}")
+        with override_settings(**pool_settings):
+            for rate in rates:
+                for mode, login in (("inline", _login_inline), ("pooled", _login_pooled)):
+                    p50, p99, ok, rejected = self._step(login, encoded, rate, options)
+                    self.stdout.write(f"{rate:>9.0f} {mode:<7} {p50:>7.1f}ms {p99:>7.1f}ms {ok:>10} {rejected:>6}")
@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from SafeTrip_API import trail
+from SafeTrip_API.models import AlertLocationChunk, EmergencyAlert
+
+
+class Command(BaseCommand):
+    help = (
+        "Append location pings to many active alert trails, then read one back with downsampling. "
+        "Reports per-ping cost and stored bytes per fix. Bench alerts are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--trails", type=int, default=2000, help="Concurrently active alerts.")
+        parser.add_argument("--pings", type=int, default=20, help="Pings per trail.")
+        parser.add_argument("--batch", type=int, default=1, help="Fixes per append request.")
+        parser.add_argument("--interval-ms", type=int, default=5000)
+        parser.add_argument("--long-trail", type=int, default=20_000, help="Fixes in the trail read back.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(11)
+        trails, pings, batch = options["trails"], options["pings"], options["batch"]
+        alerts = EmergencyAlert.objects.bulk_create(
+            [EmergencyAlert(name=f"bench-trail-{n}", message="bench") for n in range(trails + 1)]
+        )
+        try:
+            t0 = int(time.time() * 1000)
+            positions = {alert.id: [rng.randint(8_000_000, 35_000_000), rng.randint(68_000_000, 97_000_000)] for alert in alerts[:-1]}
+
+            def walk(alert_id, step):
+                position = positions[alert_id]
+                position[0] += rng.randint(-40, 60)
+                position[1] += rng.randint(-40, 60)
+                return trail.Fix(t0 + step * options["interval_ms"], position[0], position[1], rng.randint(3, 30))
+
+            started = time.perf_counter()
+            requests = 0
+            for step in range(0, pings, batch):
+                for alert_id in positions:
+                    trail.append_fixes(alert_id, [walk(alert_id, s) for s in range(step, min(step + batch, pings))])
+                    requests += 1
+            elapsed = time.perf_counter() - started
+
+            fixes = trails * pings
+            stored = sum(len(data) for data in AlertLocationChunk.objects.filter(alert__in=alerts).values_list("data", flat=True))
+            rows = AlertLocationChunk.objects.filter(alert__in=alerts).count()
+            self.stdout.write(
+                f"{trails} trails x {pings} pings ({batch} per request) on {connection.vendor}: "
+                f"{requests / elapsed:.0f} appends/s, {elapsed / requests * 1000:.2f}ms per append, "
+                f"{elapsed / fixes * 1000:.3f}ms per fix"
+            )
+            self.stdout.write(f"stored {stored / fixes:.2f} bytes/fix in {rows} chunk rows")
+
+            long_alert = alerts[-1].id
+            positions[long_alert] = [18_520_000, 73_850_000]
+            for step in range(0, options["long_trail"], 500):
+                trail.append_fixes(long_alert, [walk(long_alert, s) for s in range(step, min(step + 500, options["long_trail"]))])
+            for label, reduce in (
+                ("decode only", lambda fixes: fixes),
+                ("time buckets -> 500", lambda fixes: trail.bucket(fixes, 500)),
+                ("Douglas-Peucker 10m", lambda fixes: trail.simplify(fixes, 10)),
+                ("Douglas-Peucker 50m", lambda fixes: trail.simplify(fixes, 50)),
+            ):
+                started = time.perf_counter()
+                points = reduce(trail.read_fixes(long_alert))
+                self.stdout.write(
+                    f"read {options['long_trail']}-fix trail, {label:<20} {len(points):>6} points "
+                    f"in {(time.perf_counter() - started) * 1000:7.1f}ms"
+                )
+        finally:
+            EmergencyAlert.objects.filter(id__in=[alert.id for alert in alerts]).delete()
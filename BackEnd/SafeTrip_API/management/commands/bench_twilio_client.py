@@ -0,0 +1,105 @@
+import json
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+from SafeTrip_API.providers import build_twilio_client
+
+ACCOUNT_SID = "AC" + "0" * 32
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for POST /2010-04-01/Accounts/<sid>/Messages.json.
+    Each new TCP connection sleeps `setup_delay` seconds first to model
+    the TLS handshake a real api.twilio.com connection pays.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; don't let Nagle stall keep-alive responses.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections += 1
+        time.sleep(self.server.setup_delay)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.server.response_delay)
+        body = json.dumps({"sid": "SM" + "0" * 32, "status": "queued"}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Compare per-SOS Twilio connection cost: a fresh Client per send vs the shared keep-alive client."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alerts", type=int, default=50, help="Number of simulated SOS alerts.")
+        parser.add_argument("--contacts", type=int, default=3, help="SMS recipients per alert.")
+        parser.add_argument("--setup-ms", type=float, default=30.0, help="Simulated connection/TLS setup per new connection.")
+        parser.add_argument("--rtt-ms", type=float, default=5.0, help="Simulated provider response time.")
+
+    def _run(self, label, server, client_factory, alerts, contacts):
+        server.connections = 0
+        timings = []
+        for _ in range(alerts):
+            start = time.perf_counter()
+            for n in range(contacts):
+                client = client_factory()
+                client.messages.create(body="bench", from_="+15005550006", to=f"+9190000000{n:02d}")
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"{label:<22} mean={statistics.mean(timings):7.2f}ms  p50={statistics.median(timings):7.2f}ms  "
+            f"p95={p95:7.2f}ms  connections={server.connections}"
+        )
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        server.daemon_threads = True
+        server.setup_delay = options["setup_ms"] / 1000
+        server.response_delay = options["rtt_ms"] / 1000
+        server.connections = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        class _RedirectingHttpClient(TwilioHttpClient):
+            # The old code path: a new Client and session for every message.
+            def request(self, method, url, *args, **kwargs):
+                return super().request(method, url.replace("https://api.twilio.com", base_url, 1), *args, **kwargs)
+
+        alerts, contacts = options["alerts"], options["contacts"]
+        self.stdout.write(
+            f"{alerts} alerts x {contacts} SMS, stand-in at {base_url} "
+            f"(setup {options['setup_ms']}ms/connection, rtt {options['rtt_ms']}ms)"
+        )
+
+        self._run(
+            "fresh client per send",
+            server,
+            lambda: Client(ACCOUNT_SID, "token", http_client=_RedirectingHttpClient(timeout=10)),
+            alerts,
+            contacts,
+        )
+
+        shared = build_twilio_client(ACCOUNT_SID, "token", timeout=10, base_url=base_url)
+        self._run("shared pooled client", server, lambda: shared, alerts, contacts)
+
+        shared.http_client.close()
+        server.shutdown()
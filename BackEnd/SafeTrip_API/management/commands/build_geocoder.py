@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from SafeTrip_API import geocoder
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the reverse geocoder's k-d tree index from GEOCODER_GAZETTEER into "
+        "GEOCODER_CACHE_DIR / GEOCODER_INDEX_PATH. Run it at build or deploy time (required "
+        "with GEOCODER_BUILD_ON_DEMAND off) so no worker pays for the build."
+    )
+
+    def handle(self, *args, **options):
+        gazetteer, index_path = geocoder._paths()
+        if not gazetteer:
+            self.stdout.write("GEOCODER_GAZETTEER is empty; nothing to build.")
+            return
+        started = time.perf_counter()
+        count = geocoder.build_index(gazetteer, index_path)
+        self.stdout.write(f"Indexed {count} places into {index_path} in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,49 @@
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from SafeTrip_API import images
+from SafeTrip_API.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the thumb / medium variants of profile images that do not have them yet: uploads "
+        "from before variants existed, or ones the image pool dropped (busy, restart). Runs inline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-render every profile image.")
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.exclude(Q(image="") | Q(image__isnull=True))
+        if not options["all"]:
+            profiles = profiles.filter(
+                Q(image_thumb="") | Q(image_thumb__isnull=True) | Q(image_medium="") | Q(image_medium__isnull=True)
+            )
+
+        done = failed = 0
+        original_bytes = variant_bytes = 0
+        started = time.perf_counter()
+        for profile_id, name in profiles.order_by("pk").values_list("pk", "image").iterator():
+            try:
+                if not images.process_variants(profile_id, name):
+                    continue
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"profile {profile_id}: {name}: {exc}")
+                continue
+            done += 1
+            profile = UserProfile.objects.get(pk=profile_id)
+            original_bytes += default_storage.size(name)
+            variant_bytes += sum(getattr(profile, field).size for field in images.VARIANT_FIELDS.values())
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Processed {done} images ({failed} failed) in {elapsed:.1f}s")
+        if done:
+            self.stdout.write(
+                f"Average original {original_bytes / done / 1024:.0f} KiB -> "
+                f"thumb + medium {variant_bytes / done / 1024:.0f} KiB"
+            )
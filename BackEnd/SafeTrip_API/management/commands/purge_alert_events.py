@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from SafeTrip_API.models import AlertEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete AlertEvent rows older than the retention period in small batches. Dashboards only "
+        "replay events since their Last-Event-ID, so anything older than the longest reconnect gap "
+        "is never read again. Safe to run from cron as often as you like."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-hours",
+            type=float,
+            default=float(getattr(settings, "ALERT_EVENT_RETENTION_HOURS", 24)),
+            help="Keep events newer than this (never less than ALERT_STREAM_MAX_SECONDS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per transaction.")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would go.")
+
+    def handle(self, *args, **options):
+        retention = max(
+            timedelta(hours=options["retention_hours"]),
+            timedelta(seconds=float(getattr(settings, "ALERT_STREAM_MAX_SECONDS", 300))),
+        )
+        cutoff = timezone.now() - retention
+        # Ids grow with created_at, so everything below the first id inside the window is expired;
+        # batches then walk the primary key instead of needing an index on created_at.
+        boundary = (
+            AlertEvent.objects.filter(created_at__gte=cutoff).order_by("id").values_list("id", flat=True).first()
+        )
+        expired = AlertEvent.objects.order_by("id")
+        if boundary is not None:
+            expired = expired.filter(id__lt=boundary)
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{expired.count()} alert event(s) older than {cutoff:%Y-%m-%d %H:%M:%S} would be deleted"
+            )
+            return
+
+        started = time.monotonic()
+        batch_size = max(1, options["batch_size"])
+        total = 0
+        while True:
+            ids = list(expired.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, _ = AlertEvent.objects.filter(id__in=ids).delete()
+            total += deleted
+            self.stdout.write(f"Deleted {total} alert event(s)...")
+            if len(ids) < batch_size:
+                break
+            time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {total} alert event(s) older than {cutoff:%Y-%m-%d %H:%M:%S} in "
+                f"{time.monotonic() - started:.1f}s; {AlertEvent.objects.count()} left"
+            )
+        )
@@ -0,0 +1,71 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from SafeTrip_API.emails import OTP_TEMPLATE
+from SafeTrip_API.models import NotificationJob, OTPStorage
+from SafeTrip_API.otp import otp_ttl_seconds
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete OTPStorage rows, and OTP email jobs in the notification outbox, older than the "
+        "retention period in small batches. Each batch is its own short transaction, so writers "
+        "are never blocked for long. Safe to run from cron as often as you like."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-hours",
+            type=float,
+            default=float(getattr(settings, "OTP_RETENTION_HOURS", 24)),
+            help="Keep rows newer than this (never less than OTP_TTL_SECONDS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per transaction.")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would go.")
+
+    def handle(self, *args, **options):
+        retention = max(timedelta(hours=options["retention_hours"]), timedelta(seconds=otp_ttl_seconds()))
+        cutoff = timezone.now() - retention
+        # Oldest first via otp_created_idx; every row before the cutoff is past its TTL.
+        expired = OTPStorage.objects.filter(created_at__lt=cutoff).order_by("created_at")
+        # Delivered OTP jobs are scrubbed already; this also catches ones that never finished.
+        otp_jobs = NotificationJob.objects.filter(template=OTP_TEMPLATE, created_at__lt=cutoff).order_by("id")
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{expired.count()} OTP row(s) and {otp_jobs.count()} OTP email job(s) older than "
+                f"{cutoff:%Y-%m-%d %H:%M:%S} would be deleted"
+            )
+            return
+
+        started = time.monotonic()
+        total = self._purge(expired, OTPStorage, options)
+        jobs = self._purge(otp_jobs, NotificationJob, options)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {total} OTP row(s) and {jobs} OTP email job(s) older than "
+                f"{cutoff:%Y-%m-%d %H:%M:%S} in {time.monotonic() - started:.1f}s; "
+                f"{OTPStorage.objects.count()} left"
+            )
+        )
+
+    def _purge(self, queryset, model, options):
+        batch_size = max(1, options["batch_size"])
+        total = 0
+        while True:
+            ids = list(queryset.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, _ = model.objects.filter(id__in=ids).delete()
+            total += deleted
+            self.stdout.write(f"Deleted {total} {model._meta.verbose_name} row(s)...")
+            if len(ids) < batch_size:
+                break
+            time.sleep(options["pause"])
+        return total
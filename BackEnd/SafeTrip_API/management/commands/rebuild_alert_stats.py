@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from SafeTrip_API import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the AlertStatBucket summary behind /emergency/alerts/stats/ from EmergencyAlert. "
+        "Run once after migrating, after changing STATS_REGION_PRECISION, or after editing alerts "
+        "outside the API (admin, shell, SQL)."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = stats.rebuild()
+        self.stdout.write(f"Rebuilt {rows} stat rows in {time.perf_counter() - started:.2f}s")
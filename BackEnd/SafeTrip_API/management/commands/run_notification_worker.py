@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from SafeTrip_API.notifications import drain
+
+
+class Command(BaseCommand):
+    help = "Deliver queued SOS / OTP emails and SMS from the notification outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=int(getattr(settings, "NOTIFICATION_WORKER_CONCURRENCY", 8)),
+            help="Number of jobs delivered in parallel.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=int(getattr(settings, "NOTIFICATION_WORKER_BATCH_SIZE", 50)),
+            help="Maximum jobs claimed per poll.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=float(getattr(settings, "NOTIFICATION_WORKER_POLL_SECONDS", 1.0)),
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--deadline",
+            type=float,
+            default=float(getattr(settings, "NOTIFICATION_BATCH_DEADLINE_SECONDS", 30)),
+            help="Seconds a batch may take before unstarted jobs are released.",
+        )
+        parser.add_argument("--once", action="store_true", help="Drain what is due now and exit.")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        batch_size = max(1, options["batch_size"])
+        poll_interval = max(0.05, options["poll_interval"])
+
+        self.stdout.write(f"Notification worker started (concurrency={concurrency}, batch_size={batch_size})")
+        total = 0
+        try:
+            while True:
+                processed = drain(batch_size=batch_size, concurrency=concurrency, deadline=options["deadline"])
+                total += processed
+                if processed:
+                    self.stdout.write(f"Processed {processed} job(s)")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Notification worker stopped after {total} job(s)"))
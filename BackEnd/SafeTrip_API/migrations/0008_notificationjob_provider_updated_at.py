@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0007_notificationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationjob',
+            name='provider_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
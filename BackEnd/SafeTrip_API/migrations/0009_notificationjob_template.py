@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0008_notificationjob_provider_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationjob',
+            name='context',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='notificationjob',
+            name='template',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0009_notificationjob_template'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyalert',
+            index=models.Index(fields=['created_at', 'id'], name='alert_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyalert',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='alert_status_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0010_emergencyalert_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyalert',
+            index=models.Index(fields=['user', 'created_at'], name='alert_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyalert',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at', 'id'], name='alert_pending_created_idx'),
+        ),
+    ]
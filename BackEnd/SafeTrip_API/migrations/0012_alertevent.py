@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0011_emergencyalert_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('alert.created', 'Alert created'), ('alert.status_changed', 'Alert status changed')], max_length=32)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='SafeTrip_API.emergencyalert')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
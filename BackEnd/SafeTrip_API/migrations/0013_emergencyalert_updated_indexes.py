@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0012_alertevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyalert',
+            index=models.Index(fields=['updated_at'], name='alert_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyalert',
+            index=models.Index(fields=['status', 'updated_at'], name='alert_status_updated_idx'),
+        ),
+    ]
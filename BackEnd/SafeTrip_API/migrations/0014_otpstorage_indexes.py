@@ -0,0 +1,31 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0013_emergencyalert_updated_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpstorage',
+            index=models.Index(fields=['email', 'created_at'], name='otp_email_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpstorage',
+            index=models.Index(fields=['email', 'otp'], name='otp_email_otp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpstorage',
+            index=models.Index(fields=['created_at'], name='otp_created_idx'),
+        ),
+        # otp_email_created_idx covers email lookups; drop the old single-column index last.
+        migrations.AlterField(
+            model_name='otpstorage',
+            name='email',
+            field=models.EmailField(max_length=254),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+from SafeTrip_API import geo
+
+
+def backfill_geohash(apps, schema_editor):
+    EmergencyAlert = apps.get_model('SafeTrip_API', 'EmergencyAlert')
+    located = EmergencyAlert.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    batch = []
+    for alert in located.only('id', 'latitude', 'longitude').iterator(chunk_size=2000):
+        alert.geohash = geo.encode(alert.latitude, alert.longitude)
+        batch.append(alert)
+        if len(batch) >= 2000:
+            EmergencyAlert.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    EmergencyAlert.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0015_customuser_unique_email_contact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emergencyalert',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        # Before the index exists, so the backfill does not maintain it row by row.
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='emergencyalert',
+            index=models.Index(fields=['status', 'geohash'], name='alert_status_geohash_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0016_emergencyalert_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('distance_km', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='SafeTrip_API.emergencyalert')),
+                ('responder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_assignments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['alert', 'rank'],
+                'indexes': [models.Index(fields=['responder', 'created_at'], name='assignment_responder_idx')],
+                'constraints': [models.UniqueConstraint(fields=('alert', 'responder'), name='assignment_alert_responder_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResponderStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('longitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('available', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='responder_status', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['updated_at'], name='responder_updated_idx')],
+            },
+        ),
+    ]
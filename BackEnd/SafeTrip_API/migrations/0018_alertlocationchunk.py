@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0017_responderstatus_alertassignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertLocationChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('first_t', models.BigIntegerField()),
+                ('last_t', models.BigIntegerField()),
+                ('last_lat', models.IntegerField()),
+                ('last_lng', models.IntegerField()),
+                ('point_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_chunks', to='SafeTrip_API.emergencyalert')),
+            ],
+            options={
+                'ordering': ['alert', 'seq'],
+                'constraints': [models.UniqueConstraint(fields=('alert', 'seq'), name='trail_chunk_alert_seq_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0018_alertlocationchunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertStatBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('all', 'All time'), ('day', 'Day'), ('hour', 'Hour')], max_length=4)),
+                ('period_start', models.DateTimeField()),
+                ('region', models.CharField(blank=True, max_length=12)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('RESOLVED', 'Resolved')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['period', 'period_start', 'region', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('period', 'period_start', 'region', 'status'), name='alert_stat_bucket_unique')],
+            },
+        ),
+    ]
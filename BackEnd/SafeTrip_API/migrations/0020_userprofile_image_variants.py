@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0019_alertstatbucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='image_medium',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_images/variants/'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='image_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_images/variants/'),
+        ),
+    ]
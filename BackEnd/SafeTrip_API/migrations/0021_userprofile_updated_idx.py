@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0020_userprofile_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['updated_at'], name='profile_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0021_userprofile_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderStatusReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider_id', models.CharField(db_index=True, max_length=64)),
+                ('provider_status', models.CharField(max_length=20)),
+                ('error_code', models.CharField(blank=True, max_length=20)),
+                ('error_message', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
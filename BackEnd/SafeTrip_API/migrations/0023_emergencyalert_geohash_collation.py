@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:20
+
+from django.db import migrations
+
+
+def use_c_collation(apps, schema_editor):
+    # Nearby queries compare geohashes as [cell, cell + "{") ranges, which
+    # needs bytewise ordering. SQLite's default BINARY collation already is;
+    # PostgreSQL's database locale usually is not. Changing the column type
+    # rebuilds alert_status_geohash_idx under the new collation.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    EmergencyAlert = apps.get_model('SafeTrip_API', 'EmergencyAlert')
+    field = EmergencyAlert._meta.get_field('geohash')
+    schema_editor.execute(
+        'ALTER TABLE %s ALTER COLUMN %s TYPE varchar(%d) COLLATE "C"' % (
+            schema_editor.quote_name(EmergencyAlert._meta.db_table),
+            schema_editor.quote_name(field.column),
+            field.max_length,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0022_providerstatusreport'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_c_collation, migrations.RunPython.noop),
+    ]
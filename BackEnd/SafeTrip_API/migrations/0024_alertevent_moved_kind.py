@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0023_emergencyalert_geohash_collation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alertevent',
+            name='kind',
+            field=models.CharField(choices=[('alert.created', 'Alert created'), ('alert.status_changed', 'Alert status changed'), ('alert.moved', 'Alert moved')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:17
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SafeTrip_API', '0024_alertevent_moved_kind'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='profile_updated_idx',
+        ),
+    ]
@@ -1,8 +1,12 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+
+from . import geo
 
 
 class customUser(AbstractUser):
@@ -15,6 +19,14 @@ class customUser(AbstractUser):
     is_admin = models.BooleanField(default=False)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='USER')
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # One account per email regardless of case; accounts created without an email are exempt
+            models.UniqueConstraint(Lower("email"), condition=~models.Q(email=""), name="user_email_ci_unique"),
+            # One account per mobile number (NULLs never collide)
+            models.UniqueConstraint(fields=["contact_no"], name="user_contact_no_unique"),
+        ]
+
     def __str__(self):
         return self.username
 
@@ -37,6 +49,9 @@ class UserProfile(models.Model):
 
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="profile")
     image = models.ImageField(upload_to="profile_images/", null=True, blank=True)
+    # Resized JPEGs of image, written off the request path (SafeTrip_API.images)
+    image_thumb = models.ImageField(upload_to="profile_images/variants/", null=True, blank=True, editable=False)
+    image_medium = models.ImageField(upload_to="profile_images/variants/", null=True, blank=True, editable=False)
 
     # Primary relative contact number
     relative_mobile_no = models.CharField(max_length=15, blank=True, default="")
@@ -64,7 +79,11 @@ def _create_user_profile(sender, instance, created, **kwargs):
 
 
 class OTPStorage(models.Model):
-    email = models.EmailField(db_index=True)
+    """
+    Audit trail of issued OTPs (live OTP state is in the cache, see otp.py).
+    Rows past OTP_RETENTION_HOURS are removed by the purge_otps command.
+    """
+    email = models.EmailField()
     otp = models.CharField(max_length=10)
     counter = models.PositiveIntegerField(default=1)
     is_expired = models.BooleanField(default=False)
@@ -72,6 +91,14 @@ class OTPStorage(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # A user's latest OTP; also serves plain email lookups
+            models.Index(fields=["email", "created_at"], name="otp_email_created_idx"),
+            # Marking a redeemed code expired
+            models.Index(fields=["email", "otp"], name="otp_email_otp_idx"),
+            # purge_otps walks old rows oldest first
+            models.Index(fields=["created_at"], name="otp_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.email} ({'expired' if self.is_expired else 'active'})"
@@ -103,6 +130,10 @@ class EmergencyAlert(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     address = models.TextField(blank=True)
+    # Filled from latitude/longitude on save(); "" when there is no location.
+    # Range-queried (geo.cell_ranges), so it must sort bytewise: migration 0023
+    # gives it COLLATE "C" on PostgreSQL; keep that if the field is altered.
+    geohash = models.CharField(max_length=geo.GEOHASH_LENGTH, blank=True, editable=False)
     
     # Alert details
     message = models.TextField(default="Emergency SOS Alert")
@@ -118,6 +149,240 @@ class EmergencyAlert(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination for list_emergency_alerts, with and without a status filter
+            models.Index(fields=["created_at", "id"], name="alert_created_id_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="alert_status_created_id_idx"),
+            # A user's own alert history
+            models.Index(fields=["user", "created_at"], name="alert_user_created_idx"),
+            # The open-alert queue; skipped on backends without partial indexes
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status="PENDING"),
+                name="alert_pending_created_idx",
+            ),
+            # Latest updated_at for the alert list ETag, with and without a status filter
+            models.Index(fields=["updated_at"], name="alert_updated_idx"),
+            models.Index(fields=["status", "updated_at"], name="alert_status_updated_idx"),
+            # Alerts near a point (SafeTrip_API.geo.nearby_filter)
+            models.Index(fields=["status", "geohash"], name="alert_status_geohash_idx"),
+        ]
+
+    def __str__(self):
+        return f"Alert #{self.id} - {self.name} ({self.status})"
+
+    def set_geohash(self):
+        """
+        Recompute geohash from the location. save() calls this; bulk_create()
+        and queryset.update() callers must do it themselves.
+        """
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ""
+        else:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.set_geohash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
+
+class NotificationJob(models.Model):
+    """
+    Outbox row for one outgoing email or SMS.
+    Views enqueue jobs; the run_notification_worker command delivers them.
+    """
+    CHANNEL_CHOICES = [
+        ("EMAIL", "Email"),
+        ("SMS", "SMS"),
+    ]
+    STATUS_CHOICES = [
+        ("QUEUED", "Queued"),
+        ("SENDING", "Sending"),
+        ("SENT", "Sent"),
+        ("FAILED", "Failed"),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="QUEUED")
+
+    # Alert this job belongs to (empty for OTP emails)
+    alert = models.ForeignKey(EmergencyAlert, on_delete=models.CASCADE, related_name="notifications", null=True, blank=True)
+
+    # Email addresses for EMAIL jobs, a single E.164 number for SMS jobs
+    recipients = models.JSONField(default=list)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    # Email template + context rendered by the worker (see emails.render_email)
+    template = models.CharField(max_length=50, blank=True)
+    context = models.JSONField(default=dict, blank=True)
+
+    # Delivery bookkeeping
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    provider_id = models.CharField(max_length=64, blank=True, db_index=True)
+    provider_status = models.CharField(max_length=20, blank=True)
+    error_code = models.CharField(max_length=20, blank=True)
+    error_message = models.TextField(blank=True)
+    provider_updated_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="notif_status_available_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} job #{self.id} ({self.status})"
+
+
+class ProviderStatusReport(models.Model):
+    """
+    SMS status callback for a message id no NotificationJob has yet (Twilio
+    can call back before the worker has stored the id). Replayed onto the
+    job once it has; unmatched rows expire after
+    NOTIFICATION_STATUS_PARK_HOURS.
+    """
+    provider_id = models.CharField(max_length=64, db_index=True)
+    provider_status = models.CharField(max_length=20)
+    error_code = models.CharField(max_length=20, blank=True)
+    error_message = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.provider_id}: {self.provider_status}"
+
+
+class AlertEvent(models.Model):
+    """
+    Append-only log of alert changes streamed to authority dashboards.
+    The auto-increment id doubles as the SSE event id / Last-Event-ID cursor.
+    Rows past ALERT_EVENT_RETENTION_HOURS are removed by the purge_alert_events command.
+    """
+    KIND_CHOICES = [
+        ("alert.created", "Alert created"),
+        ("alert.status_changed", "Alert status changed"),
+        ("alert.moved", "Alert moved"),
+    ]
+
+    alert = models.ForeignKey(EmergencyAlert, on_delete=models.CASCADE, related_name="events")
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} (alert {self.alert_id})"
+
+
+class AlertLocationChunk(models.Model):
+    """
+    Up to TRAIL_CHUNK_POINTS location fixes of an alert's trail, delta
+    encoded (see SafeTrip_API.trail). Times are epoch milliseconds.
+    """
+
+    alert = models.ForeignKey(EmergencyAlert, on_delete=models.CASCADE, related_name="location_chunks")
+    seq = models.PositiveIntegerField()
+    first_t = models.BigIntegerField()
+    # Last fix, so appends can encode the next delta without decoding data
+    last_t = models.BigIntegerField()
+    last_lat = models.IntegerField()  # micro-degrees
+    last_lng = models.IntegerField()
+    point_count = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ["alert", "seq"]
+        constraints = [
+            models.UniqueConstraint(fields=["alert", "seq"], name="trail_chunk_alert_seq_unique"),
+        ]
+
+    def __str__(self):
+        return f"Alert #{self.alert_id} trail chunk {self.seq} ({self.point_count} fixes)"
+
+class ResponderStatus(models.Model):
+    """
+    Live position and availability an AUTHORITY user reports from the field.
+    SafeTrip_API.dispatch keeps the available ones in an in-memory grid.
+    """
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="responder_status")
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    available = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Incremental grid sync: rows changed since the last sync
+            models.Index(fields=["updated_at"], name="responder_updated_idx"),
+        ]
+
+    def __str__(self):
+        state = "available" if self.available else "busy"
+        return f"{self.user} ({state})"
+
+
+class AlertAssignment(models.Model):
+    """
+    A responder picked for an alert by nearest-available dispatch.
+    """
+
+    alert = models.ForeignKey(EmergencyAlert, on_delete=models.CASCADE, related_name="assignments")
+    responder = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="alert_assignments")
+    rank = models.PositiveSmallIntegerField()  # 1 = nearest
+    distance_km = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["alert", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["alert", "responder"], name="assignment_alert_responder_unique"),
+        ]
+        indexes = [
+            # A responder's assignments, newest first
+            models.Index(fields=["responder", "created_at"], name="assignment_responder_idx"),
+        ]
+
+    def __str__(self):
+        return f"Alert #{self.alert_id} -> {self.responder_id} (#{self.rank}, {self.distance_km:.1f} km)"
+
+
+class AlertStatBucket(models.Model):
+    """
+    Number of alerts created in a period that currently have a status,
+    maintained by SafeTrip_API.stats. region is "" for all alerts or a
+    geohash prefix (period "all" only).
+    """
+    PERIOD_CHOICES = [
+        ("all", "All time"),
+        ("day", "Day"),
+        ("hour", "Hour"),
+    ]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateTimeField()  # UTC; the epoch for "all"
+    region = models.CharField(max_length=geo.GEOHASH_LENGTH, blank=True)
+    status = models.CharField(max_length=20, choices=EmergencyAlert.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["period", "period_start", "region", "status"]
+        constraints = [
+            # Also the index for range reads of one period
+            models.UniqueConstraint(fields=["period", "period_start", "region", "status"], name="alert_stat_bucket_unique"),
+        ]
 
     def __str__(self):
-        return f"Alert #{self.id} - {self.name} ({self.status})"
\ No newline at end of file
+        return f"{self.period} {self.period_start:%Y-%m-%d %H:00} {self.region or '*'} {self.status}: {self.count}"
@@ -0,0 +1,324 @@
+"""
+Notification outbox.
+
+Views call enqueue_email / enqueue_sms inside their transaction and return
+immediately. The run_notification_worker management command claims queued
+rows and talks to SMTP / Twilio, so no HTTP request waits on a provider.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .emails import OTP_TEMPLATE, render_email
+from .models import NotificationJob, ProviderStatusReport
+from .providers import get_twilio_client, twilio_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _from_email() -> str:
+    return getattr(settings, "EMAIL_HOST_USER", None) or getattr(settings, "DEFAULT_FROM_EMAIL", None) or "no-reply@safetrip.local"
+
+
+def enqueue_email(subject, recipients, body="", html_body="", template="", context=None, alert=None) -> NotificationJob:
+    """
+    Queue an email. Pass either ready bodies or a template name from
+    SafeTrip_API/emails/ with its context, rendered at delivery time.
+    """
+    return NotificationJob.objects.create(
+        channel="EMAIL",
+        alert=alert,
+        recipients=list(recipients),
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        template=template,
+        context=context or {},
+    )
+
+
+def enqueue_sms(phone, body, alert=None) -> NotificationJob:
+    return NotificationJob.objects.create(
+        channel="SMS",
+        alert=alert,
+        recipients=[phone],
+        body=body,
+    )
+
+
+def claim_jobs(limit: int):
+    """
+    Move up to `limit` due jobs from QUEUED to SENDING and return them.
+
+    Each row is claimed with a conditional UPDATE, so several workers can
+    drain the same table without delivering a job twice. Rows stuck in
+    SENDING longer than NOTIFICATION_CLAIM_TIMEOUT_SECONDS (worker died
+    mid-delivery) are picked up again.
+    """
+    now = timezone.now()
+    claim_timeout = int(getattr(settings, "NOTIFICATION_CLAIM_TIMEOUT_SECONDS", 300))
+    stale_before = now - timedelta(seconds=claim_timeout)
+
+    due = Q(status="QUEUED", available_at__lte=now) | Q(status="SENDING", updated_at__lt=stale_before)
+    candidates = list(
+        NotificationJob.objects.filter(due).order_by("available_at", "id").values_list("id", "status")[:limit]
+    )
+
+    claimed = []
+    for job_id, status in candidates:
+        filters = {"pk": job_id, "status": status}
+        if status == "SENDING":
+            filters["updated_at__lt"] = stale_before
+        updated = NotificationJob.objects.filter(**filters).update(
+            status="SENDING",
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if updated:
+            claimed.append(job_id)
+
+    return list(NotificationJob.objects.filter(pk__in=claimed).select_related("alert"))
+
+
+def _send_email(job: NotificationJob):
+    body, html_body = job.body, job.html_body
+    if job.template:
+        body, html_body = render_email(job.template, job.context, sent_at=job.created_at)
+
+    if body and html_body:
+        message = EmailMultiAlternatives(subject=job.subject, body=body, from_email=_from_email(), to=job.recipients)
+        message.attach_alternative(html_body, "text/html")
+    else:
+        message = EmailMessage(subject=job.subject, body=html_body or body, from_email=_from_email(), to=job.recipients)
+        if html_body:
+            message.content_subtype = "html"
+    message.send(fail_silently=False)
+    return {}
+
+
+def _send_sms(job: NotificationJob):
+    _, _, from_phone, missing = twilio_settings()
+    if missing:
+        raise RuntimeError(f"Twilio credentials not configured. Missing: {', '.join(missing)}")
+
+    params = {"body": job.body, "from_": from_phone, "to": job.recipients[0]}
+    status_callback = getattr(settings, "TWILIO_STATUS_CALLBACK_URL", None)
+    if status_callback:
+        # Twilio posts delivered / undelivered updates to twilio_status_callback
+        params["status_callback"] = status_callback
+
+    message_obj = get_twilio_client().messages.create(**params)
+    return {
+        "provider_id": message_obj.sid or "",
+        "provider_status": message_obj.status or "",
+    }
+
+
+# Twilio message lifecycle; callbacks can arrive out of order, so never move backwards.
+_PROVIDER_STATUS_RANK = {
+    "accepted": 0,
+    "scheduled": 0,
+    "queued": 1,
+    "sending": 2,
+    "sent": 3,
+    "delivered": 4,
+    "undelivered": 4,
+    "failed": 4,
+    "canceled": 4,
+}
+
+
+def _apply_provider_status(job_id, current_status, provider_status, error_code="", error_message=""):
+    new_rank = _PROVIDER_STATUS_RANK.get(provider_status, -1)
+    if new_rank < _PROVIDER_STATUS_RANK.get(current_status, -1):
+        return current_status
+
+    now = timezone.now()
+    NotificationJob.objects.filter(pk=job_id).update(
+        provider_status=provider_status,
+        error_code=error_code or "",
+        error_message=error_message or "",
+        provider_updated_at=now,
+        updated_at=now,
+    )
+    return provider_status
+
+
+def record_provider_status(provider_id, provider_status, error_code="", error_message="") -> bool:
+    """
+    Store a delivery status reported by the SMS provider against its job.
+    Returns False when no job has this provider id yet; the report is then
+    parked and replayed once the worker records the id.
+    """
+    job = NotificationJob.objects.filter(provider_id=provider_id).only("id", "provider_status").first()
+    if job is None:
+        ProviderStatusReport.objects.create(
+            provider_id=provider_id,
+            provider_status=provider_status,
+            error_code=error_code or "",
+            error_message=error_message or "",
+        )
+        return False
+
+    _apply_provider_status(job.pk, job.provider_status, provider_status, error_code, error_message)
+    return True
+
+
+def replay_provider_statuses(provider_ids=None) -> int:
+    """
+    Apply parked status reports whose job now has the provider id (all
+    parked reports, or those for provider_ids) and drop reports older than
+    NOTIFICATION_STATUS_PARK_HOURS. Returns the number applied.
+    """
+    parked = ProviderStatusReport.objects.all()
+    if provider_ids is not None:
+        parked = parked.filter(provider_id__in=provider_ids)
+    else:
+        park_hours = float(getattr(settings, "NOTIFICATION_STATUS_PARK_HOURS", 24))
+        ProviderStatusReport.objects.filter(received_at__lt=timezone.now() - timedelta(hours=park_hours)).delete()
+
+    reports = list(parked.order_by("id")[:500])
+    if not reports:
+        return 0
+    jobs = {
+        provider_id: [job_id, status]
+        for provider_id, job_id, status in NotificationJob.objects.filter(
+            provider_id__in={report.provider_id for report in reports}
+        ).values_list("provider_id", "id", "provider_status")
+    }
+
+    applied = []
+    for report in reports:
+        job = jobs.get(report.provider_id)
+        if job is None:
+            continue
+        job[1] = _apply_provider_status(
+            job[0], job[1], report.provider_status, report.error_code, report.error_message
+        )
+        applied.append(report.pk)
+    ProviderStatusReport.objects.filter(pk__in=applied).delete()
+    return len(applied)
+
+
+def _scrubbed(job: NotificationJob) -> dict:
+    # OTP codes are only stored as an HMAC (otp.py); once a job is finished
+    # its readable copy is dropped too.
+    if job.template == OTP_TEMPLATE:
+        return {"context": {}, "body": "", "html_body": ""}
+    return {}
+
+
+def _is_permanent_failure(exc: Exception) -> bool:
+    # Twilio rejects invalid / unverified numbers with a 4xx; retrying won't help.
+    status = getattr(exc, "status", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+def deliver_job(job: NotificationJob) -> bool:
+    """
+    Deliver one claimed job and record the outcome on its row.
+    Returns True when the provider accepted the message.
+    """
+    try:
+        if job.channel == "EMAIL":
+            result = _send_email(job)
+        else:
+            result = _send_sms(job)
+    except Exception as exc:
+        max_attempts = int(getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 5))
+        gave_up = job.attempts >= max_attempts or _is_permanent_failure(exc)
+        backoff = min(2 ** job.attempts, 300)
+        NotificationJob.objects.filter(pk=job.pk).update(
+            status="FAILED" if gave_up else "QUEUED",
+            available_at=timezone.now() + timedelta(seconds=backoff),
+            error_code=str(getattr(exc, "code", "") or ""),
+            error_message=str(exc),
+            updated_at=timezone.now(),
+            **(_scrubbed(job) if gave_up else {}),
+        )
+        logger.warning("%s job #%s to %s failed (attempt %s): %s", job.channel, job.pk, job.recipients, job.attempts, exc)
+        return False
+
+    now = timezone.now()
+    provider_status = result.pop("provider_status", "")
+    NotificationJob.objects.filter(pk=job.pk).update(
+        status="SENT",
+        sent_at=now,
+        error_code="",
+        error_message="",
+        updated_at=now,
+        **result,
+        **_scrubbed(job),
+    )
+    if provider_status:
+        # A status callback may already have landed once provider_id was
+        # stored; the provider's initial "queued" must not overwrite it.
+        NotificationJob.objects.filter(pk=job.pk, provider_status="").update(provider_status=provider_status)
+    if result.get("provider_id"):
+        # Callbacks that arrived before provider_id was stored.
+        replay_provider_statuses([result["provider_id"]])
+    logger.info("%s job #%s delivered to %s", job.channel, job.pk, job.recipients)
+    return True
+
+
+def _deliver_in_thread(job: NotificationJob) -> bool:
+    try:
+        return deliver_job(job)
+    finally:
+        close_old_connections()
+
+
+def release_jobs(job_ids) -> int:
+    """
+    Put claimed jobs that never started back in the queue without
+    counting the claim as a delivery attempt.
+    """
+    if not job_ids:
+        return 0
+    return NotificationJob.objects.filter(pk__in=job_ids, status="SENDING").update(
+        status="QUEUED",
+        attempts=F("attempts") - 1,
+        updated_at=timezone.now(),
+    )
+
+
+def drain(batch_size: int = 50, concurrency: int = 8, deadline: float = None) -> int:
+    """
+    Claim one batch of due jobs and deliver them on a bounded thread pool.
+
+    All SMS for one alert are queued together, so with enough workers an
+    SOS to N contacts costs about one provider round trip instead of N.
+    Each send is capped by SMS_SEND_TIMEOUT_SECONDS; jobs still waiting for
+    a worker when the batch deadline passes are released for the next poll.
+    Parked status callbacks (see record_provider_status) are replayed
+    first. Returns the number of jobs claimed.
+    """
+    replay_provider_statuses()
+    jobs = claim_jobs(batch_size)
+    if not jobs:
+        return 0
+    if concurrency <= 1:
+        for job in jobs:
+            deliver_job(job)
+        return len(jobs)
+
+    if deadline is None:
+        deadline = float(getattr(settings, "NOTIFICATION_BATCH_DEADLINE_SECONDS", 30))
+
+    pool = ThreadPoolExecutor(max_workers=min(concurrency, len(jobs)), thread_name_prefix="safetrip-notify")
+    futures = {pool.submit(_deliver_in_thread, job): job for job in jobs}
+    _, not_done = wait(futures, timeout=deadline)
+    # Started sends finish on their own (bounded by the per-send timeout).
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    skipped = [futures[f].pk for f in not_done if f.cancelled()]
+    if skipped:
+        release_jobs(skipped)
+        logger.warning("Batch deadline of %ss hit; released %s job(s) back to the queue", deadline, len(skipped))
+    return len(jobs)
@@ -0,0 +1,137 @@
+"""
+Cache-backed OTP state.
+
+send_otp and verify_otp go through issue_otp / redeem_otp, which keep all
+OTP state in the default cache:
+
+    safetrip:otp:code:<email>      HMAC of the active code        OTP_TTL_SECONDS
+    safetrip:otp:tries:<email>     failed verify attempts         OTP_TTL_SECONDS
+    safetrip:otp:sends:<email>     codes sent in the window       OTP_SEND_WINDOW_SECONDS
+    safetrip:otp:cooldown:<email>  present until a resend is OK   OTP_RESEND_SECONDS
+
+Counters use cache.add + cache.incr, so concurrent requests cannot both
+slip under a limit, and a code can be redeemed only once (whichever request
+deletes the key wins). Only the HMAC is cached, never the code itself.
+
+OTPStorage is kept as an audit trail only: when OTP_AUDIT_ENABLED is set,
+one row per issued code is written (and marked expired once redeemed) by a
+background thread, so the request path makes no OTP writes of its own.
+Use a shared cache (Redis / memcached) when running several processes.
+"""
+import hashlib
+import hmac
+import logging
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .models import OTPStorage
+
+logger = logging.getLogger(__name__)
+
+_audit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="safetrip-otp-audit")
+
+
+class OTPError(Exception):
+    """
+    Raised when an OTP cannot be sent or verified. str(exc) is user-facing.
+    """
+
+
+def _key(kind, email):
+    return f"safetrip:otp:{kind}:{email}"
+
+
+def _digest(email, otp):
+    return hmac.new(settings.SECRET_KEY.encode(), f"{email}|{otp}".encode(), hashlib.sha256).hexdigest()
+
+
+def _incr(key, timeout):
+    """
+    Increment a counter that expires `timeout` seconds after its first use.
+    """
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add and incr: start a new window.
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def otp_ttl_seconds():
+    return int(getattr(settings, "OTP_TTL_SECONDS", 300))
+
+
+def issue_otp(email):
+    """
+    Generate and store a new code for email and return it.
+    """
+    resend_seconds = int(getattr(settings, "OTP_RESEND_SECONDS", 60))
+    window_seconds = int(getattr(settings, "OTP_SEND_WINDOW_SECONDS", 600))
+    max_sends = int(getattr(settings, "OTP_MAX_SENDS_PER_WINDOW", 3))
+    length = int(getattr(settings, "OTP_LENGTH", 6))
+
+    if not cache.add(_key("cooldown", email), 1, resend_seconds):
+        raise OTPError(f"Please wait {resend_seconds} seconds before requesting another OTP")
+
+    sends = _incr(_key("sends", email), window_seconds)
+    if sends > max_sends:
+        raise OTPError("Too many attempts. Try again in sometime.")
+
+    otp = str(secrets.randbelow(9 * 10 ** (length - 1)) + 10 ** (length - 1))
+    # Storing the new code replaces any earlier one.
+    cache.set_many({_key("code", email): _digest(email, otp), _key("tries", email): 0}, otp_ttl_seconds())
+    _audit(_audit_issued, email, otp, sends)
+    return otp
+
+
+def redeem_otp(email, otp):
+    """
+    Redeem otp for email. Raises OTPError if it is wrong, expired or used.
+    """
+    max_attempts = int(getattr(settings, "OTP_MAX_VERIFY_ATTEMPTS", 5))
+    code_key = _key("code", email)
+
+    expected = cache.get(code_key)
+    if expected is None:
+        raise OTPError("Invalid or expired OTP")
+
+    if _incr(_key("tries", email), otp_ttl_seconds()) > max_attempts:
+        cache.delete(code_key)
+        raise OTPError("Too many attempts. Please request a new OTP.")
+
+    if not hmac.compare_digest(expected, _digest(email, otp)):
+        raise OTPError("Invalid OTP")
+
+    # Single use: only the request that actually removes the code succeeds.
+    if not cache.delete(code_key):
+        raise OTPError("OTP already used")
+    cache.delete(_key("tries", email))
+    _audit(_audit_redeemed, email, otp)
+
+
+def _audit(func, *args):
+    if getattr(settings, "OTP_AUDIT_ENABLED", True):
+        _audit_executor.submit(_run_audit, func, *args)
+
+
+def _run_audit(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("OTP audit write failed")
+    finally:
+        close_old_connections()
+
+
+def _audit_issued(email, otp, counter):
+    OTPStorage.objects.filter(email=email, is_expired=False).update(is_expired=True)
+    OTPStorage.objects.create(email=email, otp=otp, counter=counter, is_expired=False)
+
+
+def _audit_redeemed(email, otp):
+    OTPStorage.objects.filter(email=email, otp=otp, is_expired=False).update(is_expired=True)
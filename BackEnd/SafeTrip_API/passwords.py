@@ -0,0 +1,86 @@
+"""
+Bounded pool for password hashing.
+
+PBKDF2 costs hundreds of milliseconds of CPU per call. login_user and
+register_user hand that work to a small dedicated thread pool
+(PASSWORD_HASHER_WORKERS threads; hashlib releases the GIL while it runs)
+instead of running it inline on whatever request worker they landed on.
+At most PASSWORD_HASHER_WORKERS + PASSWORD_HASHER_QUEUE_DEPTH requests can
+be hashing or waiting at once; beyond that PasswordHasherBusy is raised
+immediately and the view answers 503, so a login storm can never hold
+more request workers than that and SOS requests keep theirs.
+
+Keep WORKERS + QUEUE_DEPTH below the number of request threads the app
+server runs.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+_state_lock = threading.Lock()
+_state = None  # (workers, queue_depth, executor, semaphore)
+
+
+def _default_workers():
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _pool():
+    global _state
+    workers = int(getattr(settings, "PASSWORD_HASHER_WORKERS", 0) or _default_workers())
+    queue_depth = int(getattr(settings, "PASSWORD_HASHER_QUEUE_DEPTH", 4))
+    with _state_lock:
+        if _state is None or _state[:2] != (workers, queue_depth):
+            if _state is not None:
+                _state[2].shutdown(wait=False)
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="safetrip-hasher")
+            _state = (workers, queue_depth, executor, threading.BoundedSemaphore(workers + queue_depth))
+        return _state[2], _state[3]
+
+
+def _run(func, *args):
+    executor, slots = _pool()
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hasher is saturated")
+    try:
+        return executor.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def hash_password(raw_password):
+    """
+    make_password() on the hasher pool.
+    """
+    return _run(hashers.make_password, raw_password)
+
+
+def _check(raw_password, encoded):
+    needs_rehash = []
+    valid = hashers.check_password(raw_password, encoded, setter=lambda _: needs_rehash.append(True))
+    return valid, bool(needs_rehash)
+
+
+def verify_password(user, raw_password):
+    """
+    user.check_password() on the hasher pool.
+
+    Like Django, a correct password stored with outdated hasher parameters
+    (e.g. fewer PBKDF2 iterations) is rehashed and saved.
+    """
+    valid, needs_rehash = _run(_check, raw_password, user.password)
+    if valid and needs_rehash:
+        try:
+            user.password = hash_password(raw_password)
+        except PasswordHasherBusy:
+            return valid  # try again on a later login
+        user.save(update_fields=["password"])
+    return valid
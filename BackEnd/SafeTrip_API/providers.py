@@ -0,0 +1,103 @@
+"""
+Shared provider clients.
+
+get_twilio_client() returns one twilio.rest.Client per process whose HTTP
+session keeps connections alive, so only the first SMS after start-up (or
+after a credentials change) pays for TLS and connection setup.
+"""
+import threading
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+TWILIO_API_HOST = "https://api.twilio.com"
+
+_twilio_lock = threading.Lock()
+# (settings key, client); swapped as one tuple so readers never see a mixed pair
+_twilio_state = (None, None)
+
+
+def twilio_settings():
+    """
+    Return (sid, token, from_phone, missing_setting_names).
+    """
+    sid = getattr(settings, "TWILIO_ACCOUNT_SID", None)
+    token = getattr(settings, "TWILIO_AUTH_TOKEN", None)
+    phone = getattr(settings, "TWILIO_PHONE_NUMBER", None)
+    missing = [
+        name
+        for name, value in (
+            ("TWILIO_ACCOUNT_SID", sid),
+            ("TWILIO_AUTH_TOKEN", token),
+            ("TWILIO_PHONE_NUMBER", phone),
+        )
+        if not value
+    ]
+    return sid, token, phone, missing
+
+
+class PooledTwilioHttpClient(TwilioHttpClient):
+    """
+    TwilioHttpClient with a connection pool sized for the notification
+    worker's threads. requests.Session is safe to share for sending; the
+    pool hands each concurrent request its own kept-alive connection.
+
+    base_url replaces https://api.twilio.com, e.g. to point at a local
+    stand-in during development or benchmarks.
+    """
+
+    def __init__(self, timeout=None, pool_size=8, base_url=None):
+        super().__init__(pool_connections=True, timeout=timeout)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.base_url = (base_url or "").rstrip("/")
+
+    def request(self, method, url, *args, **kwargs):
+        if self.base_url and url.startswith(TWILIO_API_HOST):
+            url = self.base_url + url[len(TWILIO_API_HOST):]
+        return super().request(method, url, *args, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def _twilio_client_key():
+    sid, token, _, _ = twilio_settings()
+    return (
+        sid,
+        token,
+        float(getattr(settings, "SMS_SEND_TIMEOUT_SECONDS", 10)),
+        int(getattr(settings, "NOTIFICATION_WORKER_CONCURRENCY", 8)),
+        getattr(settings, "TWILIO_API_BASE_URL", None) or "",
+    )
+
+
+def build_twilio_client(sid, token, timeout=None, pool_size=8, base_url=None) -> Client:
+    http_client = PooledTwilioHttpClient(timeout=timeout, pool_size=pool_size, base_url=base_url)
+    return Client(sid, token, http_client=http_client)
+
+
+def get_twilio_client() -> Client:
+    """
+    Lazily build the process-wide Twilio client, rebuilding it when the
+    credentials, timeout, pool size or API base URL in settings change.
+    """
+    global _twilio_state
+
+    key = _twilio_client_key()
+    current_key, client = _twilio_state
+    if client is not None and current_key == key:
+        return client
+
+    with _twilio_lock:
+        current_key, old = _twilio_state
+        if old is not None and current_key == key:
+            return old
+        sid, token, timeout, pool_size, base_url = key
+        client = build_twilio_client(sid, token, timeout=timeout, pool_size=pool_size, base_url=base_url)
+        # The old client is left for GC rather than closed: other threads may still be mid-send on it.
+        _twilio_state = (key, client)
+        return client
@@ -0,0 +1,210 @@
+"""
+Alert counts for authority dashboards, kept in AlertStatBucket.
+
+Every alert is counted, under its current status, in these rows:
+
+    ("all",  epoch,         "",     status)   all-time totals
+    ("all",  epoch,         prefix, status)   per region (located alerts)
+    ("day",  day start,     "",     status)   by creation day (UTC)
+    ("hour", hour start,    "",     status)   by creation hour (UTC)
+
+where prefix is the first STATS_REGION_PRECISION characters of the alert's
+geohash. Writers apply the changes in the same transaction as the alert:
+alerts_created() from the SOS views, status_changed() from
+update_alert_status, moved() when a trail moves an alert into another
+region; deletes are handled by a post_delete receiver. Reading stats then
+costs one row per bucket, however many alerts there are.
+
+Anything that changes alerts another way (the admin, a shell, a changed
+STATS_REGION_PRECISION) leaves the table stale; `manage.py
+rebuild_alert_stats` recomputes it from EmergencyAlert.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Substr, TruncHour
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import geo
+from .models import AlertStatBucket, EmergencyAlert
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+PERIODS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def _region_precision():
+    return int(getattr(settings, "STATS_REGION_PRECISION", 4))
+
+
+def period_start(moment, period):
+    moment = moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if period == "day" else moment
+
+
+def _keys(created_at, geohash, status):
+    keys = [
+        ("all", EPOCH, "", status),
+        ("day", period_start(created_at, "day"), "", status),
+        ("hour", period_start(created_at, "hour"), "", status),
+    ]
+    if geohash:
+        keys.append(("all", EPOCH, geohash[: _region_precision()], status))
+    return keys
+
+
+def apply(deltas):
+    """
+    Add {(period, period_start, region, status): delta} to the summary rows.
+    Rows are touched in key order so concurrent writers lock them in the
+    same order.
+    """
+    for key in sorted(k for k, delta in deltas.items() if delta):
+        period, start, region, status = key
+        rows = AlertStatBucket.objects.filter(period=period, period_start=start, region=region, status=status)
+        if rows.update(count=F("count") + deltas[key]):
+            continue
+        try:
+            with transaction.atomic():
+                AlertStatBucket.objects.create(
+                    period=period, period_start=start, region=region, status=status, count=deltas[key]
+                )
+        except IntegrityError:
+            # Another writer created the row first.
+            rows.update(count=F("count") + deltas[key])
+
+
+def alerts_created(alerts):
+    deltas = Counter()
+    for alert in alerts:
+        for key in _keys(alert.created_at, alert.geohash, alert.status):
+            deltas[key] += 1
+    apply(deltas)
+
+
+def status_changed(alert, old_status):
+    if old_status == alert.status:
+        return
+    deltas = Counter()
+    for key in _keys(alert.created_at, alert.geohash, old_status):
+        deltas[key] -= 1
+    for key in _keys(alert.created_at, alert.geohash, alert.status):
+        deltas[key] += 1
+    apply(deltas)
+
+
+def moved(status, old_geohash, new_geohash):
+    precision = _region_precision()
+    old_region, new_region = old_geohash[:precision], new_geohash[:precision]
+    if old_region == new_region:
+        return
+    deltas = Counter()
+    if old_region:
+        deltas[("all", EPOCH, old_region, status)] -= 1
+    if new_region:
+        deltas[("all", EPOCH, new_region, status)] += 1
+    apply(deltas)
+
+
+@receiver(post_delete, sender=EmergencyAlert)
+def _alert_deleted(sender, instance, **kwargs):
+    deltas = Counter()
+    for key in _keys(instance.created_at, instance.geohash, instance.status):
+        deltas[key] -= 1
+    apply(deltas)
+
+
+def rebuild() -> int:
+    """
+    Recompute every summary row from EmergencyAlert. Returns the row count.
+    Alerts written while it runs may be miscounted; run it when quiet.
+    """
+    precision = _region_precision()
+    deltas = Counter()
+    grouped = (
+        EmergencyAlert.objects.order_by()
+        .annotate(hour=TruncHour("created_at", tzinfo=dt_timezone.utc), region=Substr("geohash", 1, precision))
+        .values("hour", "region", "status")
+        .annotate(n=Count("id"))
+    )
+    for row in grouped.iterator():
+        hour, region, status, n = row["hour"], row["region"], row["status"], row["n"]
+        deltas[("all", EPOCH, "", status)] += n
+        deltas[("day", period_start(hour, "day"), "", status)] += n
+        deltas[("hour", hour, "", status)] += n
+        if region:
+            deltas[("all", EPOCH, region, status)] += n
+
+    rows = [
+        AlertStatBucket(period=period, period_start=start, region=region, status=status, count=n)
+        for (period, start, region, status), n in sorted(deltas.items())
+    ]
+    with transaction.atomic():
+        AlertStatBucket.objects.all().delete()
+        AlertStatBucket.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _by_status(rows):
+    counts = {status: 0 for status, _ in EmergencyAlert.STATUS_CHOICES}
+    for status, n in rows:
+        counts[status] = counts.get(status, 0) + n
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def status_totals():
+    """
+    All-time alert counts by status (and "total"); a handful of rows.
+    """
+    return _by_status(
+        AlertStatBucket.objects.filter(period="all", region="").order_by().values_list("status", "count")
+    )
+
+
+def summary(period, since, until):
+    """
+    Totals, per-region totals and per-period buckets in [since, until),
+    with empty buckets included.
+    """
+    totals = status_totals()
+
+    regions = {}
+    for region, status, n in AlertStatBucket.objects.filter(period="all").exclude(region="").order_by().values_list(
+        "region", "status", "count"
+    ):
+        regions.setdefault(region, []).append((status, n))
+
+    buckets = {}
+    for start, status, n in AlertStatBucket.objects.filter(
+        period=period, region="", period_start__gte=since, period_start__lt=until
+    ).order_by().values_list("period_start", "status", "count"):
+        buckets.setdefault(start, []).append((status, n))
+
+    step = PERIODS[period]
+    series = []
+    start = since
+    while start < until:
+        series.append({"start": start.isoformat(), **_by_status(buckets.get(start, []))})
+        start += step
+
+    region_counts = []
+    for region, rows in sorted(regions.items()):
+        counts = _by_status(rows)
+        if counts["total"]:
+            south, west, north, east = geo.bounds(region)
+            region_counts.append({
+                "region": region,
+                "latitude": round((south + north) / 2, 6),
+                "longitude": round((west + east) / 2, 6),
+                **counts,
+            })
+
+    return {
+        "totals": totals,
+        "regions": region_counts,
+        "buckets": series,
+    }
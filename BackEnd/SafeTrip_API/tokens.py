@@ -0,0 +1,132 @@
+"""
+Signed access and refresh tokens.
+
+An access token is a compact django.core.signing payload:
+
+    {"uid": 7, "role": "AUTHORITY", "usr": "priya", "ver": <version>, "iat": ..., "exp": ...}
+
+"ver" is the user's auth_cache version at issue time. While it still
+matches the shared cache, role and username can be read from the token
+without touching the database; once the user or profile is saved the
+version moves on and callers fall back to a lookup.
+
+Access tokens live AUTH_ACCESS_TOKEN_TTL_SECONDS. The refresh token carries
+only the user id, lives AUTH_TOKEN_MAX_AGE_SECONDS and is exchanged at
+auth/refresh/ for a new pair. Tokens issued before this format (plain
+TimestampSigner user ids) are still accepted as access tokens until they
+expire.
+
+EventSource cannot send an Authorization header, so the alert stream is
+opened with a stream token in the query string instead: {"uid", "role",
+"exp"} under its own salt, living ALERT_STREAM_TOKEN_TTL_SECONDS, only
+good for opening the stream.
+"""
+import time
+
+from django.conf import settings
+from django.core import signing
+
+from . import auth_cache
+
+ACCESS_SALT = "safetrip-access"
+REFRESH_SALT = "safetrip-refresh"
+LEGACY_SALT = "safetrip-email-otp"
+STREAM_SALT = "safetrip-alert-stream"
+
+
+def _access_ttl() -> int:
+    return int(getattr(settings, "AUTH_ACCESS_TOKEN_TTL_SECONDS", 15 * 60))
+
+
+def _refresh_ttl() -> int:
+    return int(getattr(settings, "AUTH_TOKEN_MAX_AGE_SECONDS", 60 * 60 * 24 * 30))
+
+
+def _stream_ttl() -> int:
+    return int(getattr(settings, "ALERT_STREAM_TOKEN_TTL_SECONDS", 60))
+
+
+def claims_for_user(user) -> dict:
+    return {
+        "uid": user.pk,
+        "role": getattr(user, "role", "USER"),
+        "usr": user.username,
+        "ver": auth_cache.user_version(user.pk),
+    }
+
+
+def issue_tokens(user) -> dict:
+    """
+    Return {"token", "refresh_token", "expires_in"} for user.
+    """
+    now = int(time.time())
+    ttl = _access_ttl()
+    access = signing.dumps({**claims_for_user(user), "iat": now, "exp": now + ttl}, salt=ACCESS_SALT, compress=True)
+    refresh = signing.dumps({"uid": user.pk}, salt=REFRESH_SALT, compress=True)
+    return {"token": access, "refresh_token": refresh, "expires_in": ttl}
+
+
+def read_access_token(token: str) -> dict:
+    """
+    Return the token's claims. Legacy tokens yield {"uid": ...} only.
+
+    Raises signing.SignatureExpired or signing.BadSignature.
+    """
+    try:
+        claims = signing.loads(token, salt=ACCESS_SALT)
+    except signing.BadSignature:
+        user_id = signing.TimestampSigner(salt=LEGACY_SALT).unsign(token, max_age=_refresh_ttl())
+        try:
+            return {"uid": int(user_id)}
+        except ValueError:
+            raise signing.BadSignature("Malformed token")
+
+    if not isinstance(claims, dict) or "uid" not in claims:
+        raise signing.BadSignature("Malformed token")
+    if claims.get("exp", 0) < time.time():
+        raise signing.SignatureExpired("Token expired")
+    return claims
+
+
+def read_refresh_token(token: str) -> int:
+    """
+    Return the user id in a refresh token.
+
+    Raises signing.SignatureExpired or signing.BadSignature.
+    """
+    payload = signing.loads(token, salt=REFRESH_SALT, max_age=_refresh_ttl())
+    if not isinstance(payload, dict) or "uid" not in payload:
+        raise signing.BadSignature("Malformed token")
+    return payload["uid"]
+
+
+def is_current(claims: dict) -> bool:
+    """
+    True if the embedded role / username are still valid for the user.
+    """
+    return "ver" in claims and claims["ver"] == auth_cache.user_version(claims["uid"])
+
+
+def issue_stream_token(claims: dict) -> dict:
+    """
+    Return {"stream_token", "expires_in"} for the user in access-token claims.
+    """
+    ttl = _stream_ttl()
+    token = signing.dumps(
+        {"uid": claims["uid"], "role": claims.get("role", "USER"), "exp": int(time.time()) + ttl}, salt=STREAM_SALT
+    )
+    return {"stream_token": token, "expires_in": ttl}
+
+
+def read_stream_token(token: str) -> dict:
+    """
+    Return a stream token's claims.
+
+    Raises signing.SignatureExpired or signing.BadSignature.
+    """
+    claims = signing.loads(token, salt=STREAM_SALT)
+    if not isinstance(claims, dict) or "uid" not in claims:
+        raise signing.BadSignature("Malformed token")
+    if claims.get("exp", 0) < time.time():
+        raise signing.SignatureExpired("Token expired")
+    return claims
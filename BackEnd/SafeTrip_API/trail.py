@@ -0,0 +1,241 @@
+"""
+Location trails for active alerts.
+
+A trail is stored as AlertLocationChunk rows of up to TRAIL_CHUNK_POINTS
+fixes each, not one row per fix. A chunk's data is a run of varint-encoded
+deltas, one group per fix:
+
+    dt_ms      unsigned   milliseconds since the previous fix
+    dlat, dlng zigzag     change in micro-degrees (1e-6 deg, about 0.1 m)
+    accuracy   unsigned   reported accuracy in metres (0 = unknown)
+
+The first fix of a chunk is a delta from (0, 0, 0), so every chunk decodes
+on its own. A walking person pinging every 5 s costs about 5 bytes per fix.
+The chunk row also keeps its last fix (last_t / last_lat / last_lng), so
+appending only encodes the new fixes and concatenates; nothing is decoded
+on the write path.
+
+Reads decode the chunks in a time range and downsample: simplify() runs
+Douglas-Peucker with a tolerance in metres, bucket() keeps the last fix of
+each of N equal time buckets.
+"""
+import math
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import stats
+from .events import publish_alert_event
+from .geo import EARTH_RADIUS_KM
+from .models import AlertLocationChunk, EmergencyAlert
+
+Fix = namedtuple("Fix", "t lat lng accuracy")  # epoch ms, micro-degrees, micro-degrees, metres
+
+_M_PER_MICRODEGREE = math.pi * EARTH_RADIUS_KM * 1000 / 180 / 1_000_000
+
+
+def _put_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def encode(fixes, previous=None) -> bytes:
+    """
+    Delta-encode fixes (sorted by t) following previous, or a chunk start.
+    """
+    out = bytearray()
+    t0, lat0, lng0 = (previous.t, previous.lat, previous.lng) if previous else (0, 0, 0)
+    for fix in fixes:
+        _put_varint(out, fix.t - t0)
+        _put_varint(out, _zigzag(fix.lat - lat0))
+        _put_varint(out, _zigzag(fix.lng - lng0))
+        _put_varint(out, fix.accuracy)
+        t0, lat0, lng0 = fix.t, fix.lat, fix.lng
+    return bytes(out)
+
+
+def decode(data) -> list:
+    fixes = []
+    values = []
+    value = shift = 0
+    t = lat = lng = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+        if len(values) == 4:
+            dt, dlat, dlng, accuracy = values
+            t += dt
+            lat += (dlat >> 1) ^ -(dlat & 1)
+            lng += (dlng >> 1) ^ -(dlng & 1)
+            fixes.append(Fix(t, lat, lng, accuracy))
+            values = []
+    return fixes
+
+
+class TrailError(Exception):
+    """
+    Raised when fixes cannot be appended. str(exc) is user-facing and
+    status is the HTTP status to answer with.
+    """
+
+    def __init__(self, message, status=409):
+        super().__init__(message)
+        self.status = status
+
+
+def append_fixes(alert_id, fixes):
+    """
+    Append fixes (any order) to an alert's trail. Fixes not newer than the
+    trail's last fix are dropped as duplicates / late retransmits.
+    Returns (accepted, dropped, last_fix).
+    """
+    chunk_points = int(getattr(settings, "TRAIL_CHUNK_POINTS", 512))
+    fixes = sorted(fixes)
+    with transaction.atomic():
+        # Locking the alert row serialises appends to one trail.
+        row = EmergencyAlert.objects.select_for_update().filter(id=alert_id).values_list("status", "geohash").first()
+        if row is None:
+            raise TrailError("Alert not found", status=404)
+        status, old_geohash = row
+        if status == "RESOLVED":
+            raise TrailError("Alert is resolved")
+
+        chunk = AlertLocationChunk.objects.filter(alert_id=alert_id).order_by("-seq").first()
+        last = Fix(chunk.last_t, chunk.last_lat, chunk.last_lng, 0) if chunk else None
+
+        fresh = []
+        for fix in fixes:
+            if (fresh[-1].t if fresh else last.t if last else -1) < fix.t:
+                fresh.append(fix)
+        if not fresh:
+            return 0, len(fixes), last
+
+        position = 0
+        while position < len(fresh):
+            if chunk is not None and chunk.point_count < chunk_points:
+                take = fresh[position : position + chunk_points - chunk.point_count]
+                chunk.data = bytes(chunk.data) + encode(take, last)
+                chunk.point_count += len(take)
+                _set_last(chunk, take[-1])
+                chunk.save(update_fields=["data", "point_count", "last_t", "last_lat", "last_lng"])
+            else:
+                take = fresh[position : position + chunk_points]
+                chunk = AlertLocationChunk(
+                    alert_id=alert_id,
+                    seq=chunk.seq + 1 if chunk else 0,
+                    first_t=take[0].t,
+                    point_count=len(take),
+                    data=encode(take),
+                )
+                _set_last(chunk, take[-1])
+                chunk.save(force_insert=True)
+            last = take[-1]
+            position += len(take)
+
+        # The alert row shows the newest position (and feeds the nearby index).
+        alert = EmergencyAlert(
+            id=alert_id, latitude=_degrees(last.lat), longitude=_degrees(last.lng), updated_at=timezone.now()
+        )
+        alert.set_geohash()
+        EmergencyAlert.objects.filter(id=alert_id).update(
+            latitude=alert.latitude, longitude=alert.longitude, geohash=alert.geohash, updated_at=alert.updated_at
+        )
+        stats.moved(status, old_geohash, alert.geohash)
+        # Dashboards get it once the append commits.
+        publish_alert_event(alert, "alert.moved", {
+            "id": alert_id,
+            "latitude": float(alert.latitude),
+            "longitude": float(alert.longitude),
+            "updated_at": alert.updated_at.isoformat(),
+        })
+    return len(fresh), len(fixes) - len(fresh), last
+
+
+def _set_last(chunk, fix):
+    chunk.last_t, chunk.last_lat, chunk.last_lng = fix.t, fix.lat, fix.lng
+
+
+def _degrees(microdegrees):
+    return f"{microdegrees / 1_000_000:.6f}"
+
+
+def read_fixes(alert_id, since_ms=None, until_ms=None) -> list:
+    chunks = AlertLocationChunk.objects.filter(alert_id=alert_id).order_by("seq")
+    if since_ms is not None:
+        chunks = chunks.filter(last_t__gte=since_ms)
+    if until_ms is not None:
+        chunks = chunks.filter(first_t__lte=until_ms)
+    fixes = []
+    for data in chunks.values_list("data", flat=True):
+        fixes.extend(decode(data))
+    return [
+        fix for fix in fixes
+        if (since_ms is None or fix.t >= since_ms) and (until_ms is None or fix.t <= until_ms)
+    ]
+
+
+def simplify(fixes, tolerance_m):
+    """
+    Douglas-Peucker: drop fixes within tolerance_m of the simplified line.
+    """
+    if len(fixes) < 3 or tolerance_m <= 0:
+        return list(fixes)
+    # Local flat projection in metres; trails span kilometres, not continents.
+    cos_lat = math.cos(math.radians(fixes[0].lat / 1_000_000))
+    xs = [fix.lng * cos_lat * _M_PER_MICRODEGREE for fix in fixes]
+    ys = [fix.lat * _M_PER_MICRODEGREE for fix in fixes]
+
+    keep = [False] * len(fixes)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(fixes) - 1)]
+    while stack:
+        first, last = stack.pop()
+        dx, dy = xs[last] - xs[first], ys[last] - ys[first]
+        length = math.hypot(dx, dy)
+        worst, worst_index = -1.0, None
+        for i in range(first + 1, last):
+            if length == 0:
+                distance = math.hypot(xs[i] - xs[first], ys[i] - ys[first])
+            else:
+                distance = abs(dy * (xs[i] - xs[first]) - dx * (ys[i] - ys[first])) / length
+            if distance > worst:
+                worst, worst_index = distance, i
+        if worst_index is not None and worst > tolerance_m:
+            keep[worst_index] = True
+            stack.append((first, worst_index))
+            stack.append((worst_index, last))
+    return [fix for fix, kept in zip(fixes, keep) if kept]
+
+
+def bucket(fixes, max_points):
+    """
+    At most max_points fixes: the last fix of each equal-length time bucket.
+    """
+    if len(fixes) <= max_points:
+        return list(fixes)
+    start, span = fixes[0].t, fixes[-1].t - fixes[0].t + 1
+    picked = {}
+    for fix in fixes:
+        picked[(fix.t - start) * max_points // span] = fix
+    return [picked[key] for key in sorted(picked)]
+
+
+def fix_to_dict(fix):
+    return {
+        "t": fix.t,
+        "latitude": _degrees(fix.lat),
+        "longitude": _degrees(fix.lng),
+        "accuracy_m": fix.accuracy or None,
+    }
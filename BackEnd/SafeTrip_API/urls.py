@@ -1,15 +1,32 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the SOS / OTP / stream endpoints use their async twins.
+if settings.ASYNC_VIEWS:
+    from . import async_views as io_views
+else:
+    io_views = views
+
 urlpatterns = [
     path('register/', views.register_user, name='register_user'),
     path('auth/login/', views.login_user, name='login_user'),
-    path('auth/request-otp/', views.request_otp, name='request_otp'),
-    path('auth/send-otp/', views.send_otp, name='send_otp'),
-    path('auth/verify-otp/', views.verify_otp, name='verify_otp'),
+    path('auth/request-otp/', io_views.request_otp, name='request_otp'),
+    path('auth/send-otp/', io_views.send_otp, name='send_otp'),
+    path('auth/verify-otp/', io_views.verify_otp, name='verify_otp'),
+    path('auth/refresh/', views.refresh_token, name='refresh_token'),
     path('auth/me/', views.current_user_from_token, name='current_user_from_token'),
-    path('emergency/alert/', views.send_emergency_alert, name='send_emergency_alert'),
+    path('emergency/alert/', io_views.send_emergency_alert, name='send_emergency_alert'),
+    path('emergency/alerts/batch/', io_views.send_emergency_alert_batch, name='send_emergency_alert_batch'),
     path('emergency/alerts/', views.list_emergency_alerts, name='list_emergency_alerts'),
+    path('emergency/alerts/nearby/', views.nearby_emergency_alerts, name='nearby_emergency_alerts'),
+    path('emergency/alerts/stats/', views.alert_stats, name='alert_stats'),
+    path('emergency/alerts/stream/token/', views.alert_stream_token, name='alert_stream_token'),
+    path('emergency/alerts/stream/', io_views.alert_event_stream, name='alert_event_stream'),
     path('emergency/alerts/<int:alert_id>/status/', views.update_alert_status, name='update_alert_status'),
+    path('emergency/alerts/<int:alert_id>/trail/', io_views.alert_trail, name='alert_trail'),
+    path('emergency/alerts/<int:alert_id>/notifications/', views.alert_notifications, name='alert_notifications'),
+    path('webhooks/twilio/sms-status/', views.twilio_status_callback, name='twilio_status_callback'),
     path('profile/me/', views.me_profile, name='me_profile'),
+    path('responders/me/status/', views.responder_status, name='responder_status'),
 ]
\ No newline at end of file
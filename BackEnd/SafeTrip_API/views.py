@@ -1,19 +1,44 @@
 
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+import base64
+import binascii
+import hashlib
 import json
+from functools import partial
 from django.contrib.auth import get_user_model
 from django.conf import settings
-from django.core.mail import EmailMessage
-from django.core.signing import BadSignature, SignatureExpired, TimestampSigner
-import secrets
+from django.core.files.storage import default_storage
+from django.core.signing import BadSignature, SignatureExpired
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
-from django.utils.html import format_html
-from datetime import timedelta
-from twilio.rest import Client
-
-from .models import OTPStorage, UserProfile
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from twilio.request_validator import RequestValidator
+
+from . import auth_cache, dispatch, geo, geocoder, images, stats, trail
+from .emails import otp_email, sos_email
+from .events import latest_event_id, open_sync_stream, publish_alert_event, publish_alert_events
+from .models import AlertAssignment, EmergencyAlert, NotificationJob, ResponderStatus, UserProfile
+from .notifications import enqueue_email, enqueue_sms, record_provider_status
+from .otp import OTPError, issue_otp, otp_ttl_seconds, redeem_otp
+from .passwords import PasswordHasherBusy, hash_password, verify_password
+from .providers import twilio_settings
+from .tokens import (
+    claims_for_user,
+    is_current,
+    issue_stream_token,
+    issue_tokens,
+    read_access_token,
+    read_refresh_token,
+    read_stream_token,
+)
 User = get_user_model()
 # Create your views here.
 
@@ -29,6 +54,15 @@ def _normalize_email(email: str) -> str:
     return (email or "").strip().lower()
 
 
+def _users_with_email(email, users=None):
+    """
+    Users whose email matches case-insensitively; Lower("email") is what
+    the user_email_ci_unique index covers.
+    """
+    users = User.objects.all() if users is None else users
+    return users.alias(email_lower=Lower("email")).filter(email_lower=_normalize_email(email))
+
+
 def _format_phone_e164(phone: str, default_country_code: str = "91") -> str:
     """
     Format phone number to E.164 format.
@@ -63,12 +97,6 @@ def _format_phone_e164(phone: str, default_country_code: str = "91") -> str:
     return f"+{phone}" if phone else ""
 
 
-def _auth_token_for_user(user_id: int) -> str:
-    # Lightweight signed token (not JWT). You can validate later with TimestampSigner.unsign(...).
-    signer = TimestampSigner(salt="safetrip-email-otp")
-    return signer.sign(str(user_id))
-
-
 def _get_bearer_token(request):
     auth = request.META.get("HTTP_AUTHORIZATION") or ""
     if not auth and getattr(request, "headers", None):
@@ -86,28 +114,44 @@ def _get_bearer_token(request):
     return ""
 
 
-def _auth_user_from_request(request):
+def _auth_claims_from_request(request, fresh=False):
     """
-    Auth via signed token returned from verify_otp.
-    Header: Authorization: Bearer <token>
+    Decode the access token. Header: Authorization: Bearer <token>
+
+    With fresh=True the role / username claims are guaranteed current: they
+    come from the token while its embedded version matches, otherwise from
+    the user record.
     """
     token = _get_bearer_token(request)
     if not token:
         return None, JsonResponse({"success": False, "message": "Missing Authorization token"}, status=401)
 
-    signer = TimestampSigner(salt="safetrip-email-otp")
-    max_age = int(getattr(settings, "AUTH_TOKEN_MAX_AGE_SECONDS", 60 * 60 * 24 * 30))  # 30 days default
-
     try:
-        user_id_str = signer.unsign(token, max_age=max_age)
+        claims = read_access_token(token)
     except SignatureExpired:
         return None, JsonResponse({"success": False, "message": "Token expired"}, status=401)
     except BadSignature:
         return None, JsonResponse({"success": False, "message": "Invalid token"}, status=401)
 
-    try:
-        user = User.objects.get(id=int(user_id_str))
-    except Exception:
+    if fresh and not is_current(claims):
+        user = auth_cache.get_user(claims["uid"])
+        if user is None:
+            return None, JsonResponse({"success": False, "message": "User not found"}, status=401)
+        claims = {**claims, **claims_for_user(user)}
+    return claims, None
+
+
+def _auth_user_from_request(request):
+    """
+    Auth via signed token returned from login / verify_otp.
+    Header: Authorization: Bearer <token>
+    """
+    claims, err = _auth_claims_from_request(request)
+    if err:
+        return None, err
+
+    user = auth_cache.get_user(claims["uid"])
+    if user is None:
         return None, JsonResponse({"success": False, "message": "User not found"}, status=401)
     return user, None
 
@@ -148,14 +192,16 @@ def _as_phone_list(value):
     return []
 
 
-def _profile_to_dict(request, profile: UserProfile):
-    image_url = ""
+def _media_url(request, file) -> str:
     try:
-        if profile.image and getattr(profile.image, "url", None):
-            image_url = request.build_absolute_uri(profile.image.url)
+        if file and getattr(file, "url", None):
+            return request.build_absolute_uri(file.url)
     except Exception:
-        image_url = ""
+        pass
+    return ""
+
 
+def _profile_to_dict(request, profile: UserProfile):
     return {
         "user": {
             "id": profile.user.id,
@@ -167,7 +213,10 @@ def _profile_to_dict(request, profile: UserProfile):
             "role": getattr(profile.user, "role", "USER"),
         },
         "profile": {
-            "image_url": image_url,
+            "image_url": _media_url(request, profile.image),
+            # Resized JPEGs; "" until processed (fall back to image_url)
+            "image_thumb_url": _media_url(request, profile.image_thumb),
+            "image_medium_url": _media_url(request, profile.image_medium),
             "relative_mobile_no": profile.relative_mobile_no,
             "emergency_email": profile.emergency_email,
             "relatives_mobile_numbers": profile.relatives_mobile_numbers or [],
@@ -179,6 +228,49 @@ def _profile_to_dict(request, profile: UserProfile):
     }
 
 
+def _strong_etag(*parts) -> str:
+    return '"%s"' % hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _not_modified(request, etag, last_modified=None):
+    """
+    Return a 304 response if the client's If-None-Match / If-Modified-Since
+    still match, else None. Call before building the body.
+    """
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def _with_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Per-user data: browsers may keep it but must revalidate on every poll.
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ("Authorization",))
+    return response
+
+
+def _profile_etag(request, profile: UserProfile) -> str:
+    user = profile.user
+    # The body also carries user columns and an absolute image URL.
+    return _strong_etag(
+        "profile",
+        user.id,
+        profile.updated_at.isoformat() if profile.updated_at else "",
+        user.username,
+        user.email,
+        getattr(user, "contact_no", ""),
+        user.first_name,
+        user.last_name,
+        getattr(user, "role", ""),
+        request.get_host(),
+    )
+
+
 def _as_email_list(value):
     if not value:
         return []
@@ -189,6 +281,164 @@ def _as_email_list(value):
     return []
 
 
+def _sms_phone_numbers(profile, request_phones):
+    """
+    E.164 numbers to text for an SOS: the profile's emergency contact, every
+    additional relative, then any phone sent with the request (deduplicated).
+    """
+    phone_numbers = []
+
+    if profile and profile.relative_mobile_no:
+        formatted = _format_phone_e164(profile.relative_mobile_no)
+        if formatted:
+            phone_numbers.append(formatted)
+
+    if profile and profile.relatives_mobile_numbers:
+        for num in profile.relatives_mobile_numbers:
+            if num and str(num).strip():
+                formatted = _format_phone_e164(str(num).strip())
+                if formatted:
+                    phone_numbers.append(formatted)
+
+    # Frontend sends the emergency contact so SMS is sent even if profile was empty
+    for req_phone in request_phones:
+        formatted = _format_phone_e164(req_phone)
+        if formatted and formatted not in phone_numbers:
+            phone_numbers.append(formatted)
+
+    return [p for p in phone_numbers if p.startswith("+")]
+
+
+def _sms_body(full_name, maps_link, address, latitude, longitude) -> str:
+    # Keep under 160 chars for Twilio Trial (error 30044 = Trial Message Length Exceeded)
+    sms_max_len = 160
+    short_name = (full_name[:24] + "..") if len(full_name) > 26 else full_name
+    if maps_link:
+        sms_body = f"SafeTrip EMERGENCY: {short_name} needs help! {maps_link}"
+    else:
+        loc = (address or (f"{latitude},{longitude}" if latitude is not None and longitude is not None else "?"))[:50]
+        sms_body = f"SafeTrip EMERGENCY: {short_name} needs help! Loc: {loc}"
+    if len(sms_body) > sms_max_len:
+        sms_body = sms_body[: sms_max_len - 3] + "..."
+    return sms_body
+
+
+def _notification_to_dict(job: NotificationJob):
+    return {
+        "id": job.id,
+        "channel": job.channel,
+        "recipients": job.recipients,
+        "status": job.status,
+        "attempts": job.attempts,
+        "provider_id": job.provider_id,
+        "provider_status": job.provider_status,
+        "error_code": job.error_code,
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat(),
+        "sent_at": job.sent_at.isoformat() if job.sent_at else None,
+    }
+
+
+# Columns the authority dashboard renders; "fields=all" adds the rest.
+ALERT_LIST_FIELDS = (
+    "id",
+    "name",
+    "phone",
+    "latitude",
+    "longitude",
+    "address",
+    "message",
+    "status",
+    "created_at",
+    "updated_at",
+)
+ALERT_ALL_FIELDS = ALERT_LIST_FIELDS + (
+    "email",
+    "blood_group",
+    "height_cm",
+    "weight_kg",
+    "emergency_contact_phone",
+    "emergency_email",
+)
+
+
+# Joined into list pages so dashboards can show the reporter's thumbnail.
+ALERT_USER_IMAGE_FIELD = "user__profile__image_thumb"
+
+
+def _alert_row_to_dict(row, request=None):
+    data = dict(row)
+    if ALERT_USER_IMAGE_FIELD in data:
+        name = data.pop(ALERT_USER_IMAGE_FIELD)
+        data["user_image_thumb_url"] = request.build_absolute_uri(default_storage.url(name)) if name else ""
+    data["latitude"] = str(row["latitude"]) if row["latitude"] else None
+    data["longitude"] = str(row["longitude"]) if row["longitude"] else None
+    data["timestamp"] = data.pop("created_at").isoformat()
+    data["updated_at"] = row["updated_at"].isoformat()
+    return data
+
+
+def _alert_event_payload(alert: EmergencyAlert):
+    return _alert_row_to_dict({field: getattr(alert, field) for field in ALERT_LIST_FIELDS})
+
+
+def _encode_alert_cursor(created_at, alert_id) -> str:
+    raw = f"{created_at.isoformat()}|{alert_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_alert_cursor(cursor):
+    """
+    Return (created_at, id) from a list cursor, or None if it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_raw, id_raw = raw.rsplit("|", 1)
+        created_at = parse_datetime(created_raw)
+        if created_at is None:
+            return None
+        return created_at, int(id_raw)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+def _encode_nearby_cursor(distance, alert_id) -> str:
+    return base64.urlsafe_b64encode(f"{distance!r}|{alert_id}".encode()).decode().rstrip("=")
+
+
+def _decode_nearby_cursor(cursor):
+    """
+    Return (distance_km, id) from a nearby-alerts cursor, or None if it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        distance_raw, id_raw = raw.rsplit("|", 1)
+        return float(distance_raw), int(id_raw)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+def _parse_query_datetime(value):
+    """
+    Parse an ISO date / datetime query param.
+    Returns None when absent and False when it cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return False
+            parsed = datetime.combine(day, datetime.min.time())
+    except ValueError:
+        return False
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def request_otp(request):
@@ -214,12 +464,16 @@ def login_user(request):
     except User.DoesNotExist:
          return JsonResponse({"error": "Invalid credentials"}, status=401)
             
-    if user.check_password(password):
-        token = _auth_token_for_user(user.id)
+    try:
+        valid = verify_password(user, password)
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
+
+    if valid:
         return JsonResponse({
             "success": True,
             "message": "Login successful",
-            "token": token,
+            **issue_tokens(user),
             "user": {
                 "id": user.id,
                 "username": user.username,
@@ -234,6 +488,33 @@ def login_user(request):
         return JsonResponse({"error": "Invalid credentials"}, status=401)
 
 
+def _hasher_busy_response():
+    response = JsonResponse({"success": False, "message": "Server busy, please try again"}, status=503)
+    response["Retry-After"] = "1"
+    return response
+
+
+def _registration_conflicts(username, email, contact_no):
+    """
+    One indexed query for every field a new account would collide on.
+    The email branch repeats the partial-index condition so the
+    case-insensitive unique index can serve it.
+    """
+    taken = list(
+        User.objects.alias(email_lower=Lower("email"))
+        .filter(Q(username=username) | (Q(email_lower=email.lower()) & ~Q(email="")) | Q(contact_no=contact_no))
+        .values_list("username", "email", "contact_no")[:3]
+    )
+    errors = []
+    if any(row[0] == username for row in taken):
+        errors.append(f" {username} is already taken , use a different username.")
+    if any(row[2] == contact_no for row in taken):
+        errors.append(f" {contact_no} Mobile number already registered, use a different one.")
+    if any((row[1] or "").lower() == email.lower() for row in taken):
+        errors.append(f" {email} already registered  , use a different E-mail.")
+    return errors
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def register_user(request):
@@ -259,8 +540,6 @@ def register_user(request):
         if role not in ['USER', 'AUTHORITY']:
             return JsonResponse({"error": "Invalid role. Must be USER or AUTHORITY"}, status=400)
         
-        users_qs = User.objects.all()
-
         if  not contact_no.isdigit():
             return JsonResponse("contact number should be number only",safe=False)
         
@@ -268,23 +547,19 @@ def register_user(request):
         if len(contact_no) != 10:
             return JsonResponse("Contact number must be exactly 10 digits.",safe=False)
         
-        errors=[]
-
-        if users_qs.filter(username=username).exists():
-            errors.append(f" {username} is already taken , use a different username.")
-        
-        if  users_qs.filter(contact_no = contact_no).exists():
-            errors.append( f" {contact_no} Mobile number already registered, use a different one.")
-        
-        if users_qs.filter(email=email).exists():
-            errors.append(f" {email} already registered  , use a different E-mail.")
+        errors = _registration_conflicts(username, email, contact_no)
         if errors:
             return JsonResponse({"errors":errors},status=400)
         
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password,
+        try:
+            password_hash = hash_password(password)
+        except PasswordHasherBusy:
+            return _hasher_busy_response()
+
+        # Same as create_user(), with the password hashed on the hasher pool.
+        user = User(
+            username=User.normalize_username(username),
+            email=User.objects.normalize_email(email),
             first_name=first_name,
             last_name=last_name,
             contact_no = contact_no,
@@ -292,6 +567,14 @@ def register_user(request):
             is_admin = is_admin,
             role=role
         )
+        user.password = password_hash
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Lost a race with a concurrent sign-up; the unique constraints decided.
+            errors = _registration_conflicts(username, email, contact_no)
+            return JsonResponse({"errors": errors or [" Account already registered."]}, status=400)
 
         return JsonResponse({
             "message": f"The user '{user.username}' has successfully registered",
@@ -314,111 +597,21 @@ def send_otp(request):
         return JsonResponse({"error": "email is required"}, status=400)
 
     try:
-        user = User.objects.get(email=email_lower)
+        user = _users_with_email(email_lower).get()
     except User.DoesNotExist:
         return JsonResponse({"error": "No user found with this email"}, status=404)
 
-    now = timezone.now()
-
-    otp_length = int(getattr(settings, "OTP_LENGTH", 6))
-    otp_resend_seconds = int(getattr(settings, "OTP_RESEND_SECONDS", 60))
-    block_user_minutes = int(getattr(settings, "BLOCK_USER_MINUTES", 10))
-    max_send_attempts = int(getattr(settings, "OTP_MAX_SENDS_PER_WINDOW", 3))
-
-    last_otp = OTPStorage.objects.filter(email=email_lower).order_by("-created_at").first()
-    previous_counter = 0
-
-    if last_otp:
-        time_diff = now - last_otp.created_at
-
-        # too soon to resend
-        if time_diff < timedelta(seconds=otp_resend_seconds):
-            return JsonResponse(
-                {"success": False, "message": f"Please wait {otp_resend_seconds} seconds before requesting another OTP"},
-                status=400,
-            )
-
-        # reset counter after block window
-        if time_diff <= timedelta(minutes=block_user_minutes):
-            previous_counter = int(last_otp.counter or 0)
-
-        # block if too many attempts
-        if previous_counter >= max_send_attempts:
-            return JsonResponse(
-                {"success": False, "message": "Too many attempts. Try again in sometime."},
-                status=400,
-            )
-
-    # expire all valid old OTPs before sending a new one
-    OTPStorage.objects.filter(email=email_lower, is_expired=False).update(is_expired=True)
-
-    # Generate OTP (secure random)
-    min_n = 10 ** (otp_length - 1)
-    max_n = (10 ** otp_length) - 1
-    otp = str(secrets.randbelow(max_n - min_n + 1) + min_n)
-
-    OTPStorage.objects.create(
-        email=email_lower,
-        otp=otp,
-        counter=previous_counter + 1,
-        is_expired=False,
-    )
-
-    lock_expiry_minutes = int(getattr(settings, "LOCK_EXPIRY_MINUTES", 5))
-
-    subject = "SafeTrip - Your OTP Code"
-    body = format_html(
-        f"""
-    <div style="
-        font-family: 'Helvetica Neue', Arial, sans-serif;
-        color: #333;
-        text-align: center;
-        border: 2px solid #0057ff;
-        padding: 25px;
-        margin: 20px auto;
-        border-radius: 12px;
-        max-width: 600px;
-        box-shadow: 0px 4px 12px rgba(0,0,0,0.2);
-    ">
-        <p style="font-size: 20px; font-weight: bold; color: #0057ff;">Secure Verification</p>
-        <p style="font-size: 16px;">Dear User,</p>
-        <p style="font-size: 16px;">Your One-Time Password (OTP) for verification is:</p>
-        <div style="
-            background-color: #0057ff;
-            color: white;
-            font-size: 32px;
-            padding: 18px 30px;
-            display: inline-block;
-            border-radius: 10px;
-            margin: 15px 0;
-            font-weight: bold;
-            letter-spacing: 4px;
-            text-align: center;
-            box-shadow: 0px 5px 10px rgba(0,0,0,0.3);
-        ">{otp}</div>
-        <p style="font-size: 16px; font-weight: bold; color: #d32f2f;">This OTP is valid for {lock_expiry_minutes} minutes. Do not share it with anyone.</p>
-        <p style="font-size: 14px; color: #555;">If you did not request this, please ignore this email.</p>
-        <div style="border-top: 2px solid #0057ff; margin: 20px auto; width: 60%;"></div>
-        <p style="font-size: 16px;">Best regards,</p>
-        <p style="font-size: 18px; font-weight: bold; color: #0057ff;">Team SafeTrip</p>
-    </div>
-        """
-    )
+    try:
+        otp = issue_otp(email_lower)
+    except OTPError as exc:
+        return JsonResponse({"success": False, "message": str(exc)}, status=400)
 
-    from_email = getattr(settings, "EMAIL_HOST_USER", None) or getattr(settings, "DEFAULT_FROM_EMAIL", None)
-    if not from_email:
-        from_email = "no-reply@safetrip.local"
+    subject, template, context = otp_email(otp, otp_ttl_seconds() // 60)
+    job = enqueue_email(subject, [email_lower], template=template, context=context)
 
-    email_message = EmailMessage(
-        subject=subject,
-        body=body,
-        from_email=from_email,
-        to=[email_lower],
+    return JsonResponse(
+        {"success": True, "message": "OTP sent successfully", "email": email_lower, "user_id": user.id, "job_id": job.id}
     )
-    email_message.content_subtype = "html"
-    email_message.send(fail_silently=False)
-
-    return JsonResponse({"success": True, "message": "OTP sent successfully", "email": email_lower, "user_id": user.id})
 
 
 @csrf_exempt
@@ -434,36 +627,25 @@ def verify_otp(request):
     if not email_lower or not otp:
         return JsonResponse({"success": False, "message": "Email and OTP are required"}, status=400)
 
-    now = timezone.now()
-    lock_expiry_minutes = int(getattr(settings, "LOCK_EXPIRY_MINUTES", 5))
-
-    otp_entry = OTPStorage.objects.filter(email=email_lower, otp=otp).order_by("-created_at").first()
-    if not otp_entry:
-        return JsonResponse({"success": False, "message": "Invalid OTP"}, status=400)
-
-    # expired by time
-    if (now - otp_entry.created_at) > timedelta(minutes=lock_expiry_minutes):
-        otp_entry.is_expired = True
-        otp_entry.save(update_fields=["is_expired"])
-        return JsonResponse({"success": False, "message": "OTP expired"}, status=400)
-
-    if otp_entry.is_expired:
-        return JsonResponse({"success": False, "message": "OTP already expired"}, status=400)
-
-    otp_entry.is_expired = True
-    otp_entry.save(update_fields=["is_expired"])
+    try:
+        redeem_otp(email_lower, otp)
+    except OTPError as exc:
+        return JsonResponse({"success": False, "message": str(exc)}, status=400)
 
     try:
-        user = User.objects.get(email=email_lower)
+        user = _users_with_email(email_lower).get()
     except User.DoesNotExist:
         return JsonResponse({"success": False, "message": "No user found with this email"}, status=404)
 
-    token = _auth_token_for_user(user.id)
+    return _otp_verified_response(user, issue_tokens(user))
+
+
+def _otp_verified_response(user, tokens):
     return JsonResponse(
         {
             "success": True,
             "message": "OTP verified successfully",
-            "token": token,
+            **tokens,
             "user": {
                 "id": user.id,
                 "username": user.username,
@@ -478,61 +660,49 @@ def verify_otp(request):
     )
 
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def send_emergency_alert(request):
+def _plan_emergency_alert(data, user):
     """
-    Frontend "Alert" button calls this API.
-
-    Expected JSON:
-      {
-        "user_id": 2,               # optional (preferred) OR "email"
-        "email": "user@mail.com",   # optional if user_id provided
-        "message": "I feel unsafe",
-        "latitude": 18.5204,        # optional but recommended
-        "longitude": 73.8567,       # optional but recommended
-        "address": "Pune, India",   # optional
-        "phone": "+919876543210",   # optional; SMS is sent to this number (and profile contacts)
-        "emergency_contact_phone": "+919876543210",  # optional, same as phone
-        "extra_recipients": ["friend@mail.com"]  # optional, adds to authority list
-      }
+    Work out everything send_emergency_alert writes: recipients, email
+    context, SMS numbers, responder assignments and alert columns. No
+    queries, but the first reverse-geocode in a process maps (or builds) the
+    geocoder index from disk, so async callers run it off the event loop.
+    user.profile must already be loaded and dispatch.refresh() already run.
+    Returns (plan, error_response).
     """
-    data, err = _json_body(request)
-    if err:
-        return err
-
-    user_id = data.get("user_id")
-    email = _normalize_email(data.get("email"))
     message = (data.get("message") or "Emergency SOS Alert").strip()
-    latitude = data.get("latitude")
-    longitude = data.get("longitude")
+    try:
+        latitude = _coordinate(data.get("latitude"), 90)
+        longitude = _coordinate(data.get("longitude"), 180)
+    except ValueError as exc:
+        return None, JsonResponse({"success": False, "message": f"Invalid location: {exc}"}, status=400)
+    if (latitude is None) != (longitude is None):
+        return None, JsonResponse(
+            {"success": False, "message": "latitude and longitude must be sent together"}, status=400
+        )
+    located = latitude is not None
     address = (data.get("address") or "").strip()
+    if not address and located:
+        address = geocoder.describe(float(latitude), float(longitude))
     extra_recipients = _as_email_list(data.get("extra_recipients"))
     # Phone number(s) from request - used for SMS when profile has none or as additional recipient
     request_phones = _as_phone_list(data.get("phone") or data.get("emergency_contact_phone"))
 
-    user = None
-    if user_id:
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return JsonResponse({"success": False, "message": "User not found"}, status=404)
-    elif email:
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return JsonResponse({"success": False, "message": "User not found"}, status=404)
-    else:
-        return JsonResponse({"success": False, "message": "user_id or email is required"}, status=400)
-
     # Get user profile for emergency contact and medical info
     try:
         profile = user.profile
-    except:
+    except UserProfile.DoesNotExist:
         profile = None
 
-    recipients = []
-    recipients.extend(_as_email_list(getattr(settings, "AUTHORITY_ALERT_EMAILS", [])))
+    # The nearest available responders; the static authority list is the
+    # fallback when the alert has no location or no responder in range has
+    # an email address.
+    responders = []
+    if located:
+        responders = dispatch.nearest_responders(float(latitude), float(longitude), exclude={user.id})
+
+    recipients = [match.responder.email for match in responders if match.responder.email]
+    if not recipients:
+        recipients.extend(_as_email_list(getattr(settings, "AUTHORITY_ALERT_EMAILS", [])))
     recipients.extend(extra_recipients)
     
     # Add emergency email from profile
@@ -542,7 +712,7 @@ def send_emergency_alert(request):
     recipients = sorted(set([r for r in recipients if r]))
 
     if not recipients:
-        return JsonResponse(
+        return None, JsonResponse(
             {
                 "success": False,
                 "message": "No authority recipients configured. Set AUTHORITY_ALERT_EMAILS in .env",
@@ -564,251 +734,550 @@ def send_emergency_alert(request):
     weight_kg = profile.weight_kg if profile and profile.weight_kg else "-"
     emergency_contact = profile.relative_mobile_no if profile and profile.relative_mobile_no else "-"
 
-    subject = f"🚨 SafeTrip EMERGENCY ALERT - {full_name}"
-    body = format_html(
-        f"""
-    <div style="font-family: Arial, sans-serif; color: #222; max-width: 680px; margin: 0 auto;">
-      <div style="background:#b71c1c; color:#fff; padding:16px 18px; border-radius:10px;">
-        <h2 style="margin:0;">🚨 EMERGENCY ALERT</h2>
-        <p style="margin:6px 0 0;">A SafeTrip user triggered an emergency SOS alert and needs immediate assistance!</p>
-      </div>
-
-      <div style="padding:16px 6px;">
-        <h3 style="margin:14px 0 8px; color:#b71c1c;">👤 Person Details</h3>
-        <ul style="margin:0; padding-left:18px; line-height:1.8;">
-          <li><b>Name:</b> {full_name}</li>
-          <li><b>Username:</b> {user.username}</li>
-          <li><b>Email:</b> {user.email}</li>
-          <li><b>Contact:</b> {getattr(user, "contact_no", "") or "-"}</li>
-          <li><b>Emergency Contact:</b> {emergency_contact}</li>
-        </ul>
-
-        <h3 style="margin:16px 0 8px; color:#b71c1c;">🩺 Medical Information</h3>
-        <ul style="margin:0; padding-left:18px; line-height:1.8;">
-          <li><b>Blood Group:</b> <span style="color:#c62828; font-weight:bold;">{blood_group}</span></li>
-          <li><b>Height:</b> {height_cm} cm</li>
-          <li><b>Weight:</b> {weight_kg} kg</li>
-        </ul>
-
-        <h3 style="margin:16px 0 8px; color:#b71c1c;">💬 Alert Message</h3>
-        <div style="border:1px solid #ddd; border-radius:10px; padding:12px; background:#fff3e0;">
-          {message}
-        </div>
-
-        <h3 style="margin:16px 0 8px; color:#b71c1c;">📍 Current Location</h3>
-        <ul style="margin:0; padding-left:18px; line-height:1.8;">
-          <li><b>Latitude:</b> {latitude if latitude is not None else "-"}</li>
-          <li><b>Longitude:</b> {longitude if longitude is not None else "-"}</li>
-          <li><b>Address:</b> {address or "-"}</li>
-        </ul>
-
-        {format_html(f'<p style="margin-top:12px;"><a href="{maps_link}" target="_blank" rel="noreferrer" style="display:inline-block;background:#b71c1c;color:#fff;padding:12px 20px;border-radius:10px;text-decoration:none;font-weight:bold;">🗺️ Open Location in Google Maps</a></p>') if maps_link else ""}
-
-        <div style="margin-top:20px; padding:12px; background:#ffebee; border-left:4px solid #b71c1c; border-radius:4px;">
-          <p style="margin:0; font-weight:bold; color:#b71c1c;">⚠️ URGENT ACTION REQUIRED</p>
-          <p style="margin:4px 0 0; font-size:14px;">This person needs immediate assistance. Please respond as soon as possible.</p>
-        </div>
-
-        <p style="margin-top:18px; font-size:12px; color:#666;">
-          This email was generated by SafeTrip Emergency Alert System.<br>
-          Time: {timezone.now().strftime("%Y-%m-%d %H:%M:%S %Z")}
-        </p>
-      </div>
-    </div>
-        """
+    subject, template, context = sos_email(
+        full_name=full_name,
+        username=user.username,
+        email=user.email,
+        contact_no=getattr(user, "contact_no", "") or "",
+        emergency_contact=emergency_contact,
+        blood_group=blood_group,
+        height_cm=height_cm,
+        weight_kg=weight_kg,
+        message=message,
+        latitude=latitude,
+        longitude=longitude,
+        address=address,
+        maps_link=maps_link,
     )
 
-    from_email = getattr(settings, "EMAIL_HOST_USER", None) or getattr(settings, "DEFAULT_FROM_EMAIL", None) or "no-reply@safetrip.local"
-    email_message = EmailMessage(subject=subject, body=body, from_email=from_email, to=recipients)
-    email_message.content_subtype = "html"
-    email_message.send(fail_silently=False)
+    # Collect phone numbers for SMS (profile contacts first, then request phones, then responders)
+    phone_numbers = _sms_phone_numbers(profile, request_phones)
+    for match in responders:
+        formatted = _format_phone_e164(match.responder.phone) if match.responder.phone else ""
+        if formatted.startswith("+") and formatted not in phone_numbers:
+            phone_numbers.append(formatted)
 
-    # Send SMS using Twilio
-    sms_sent = False
-    sms_recipients = []
     sms_error = None
-    sms_debug_info = {}
-    
-    print("\n" + "="*60)
-    print("🚨 EMERGENCY ALERT - SMS SENDING STARTED")
-    print("="*60)
-    
+    _, _, _, twilio_missing = twilio_settings()
+    if twilio_missing:
+        sms_error = f"Twilio credentials not configured. Missing: {', '.join(twilio_missing)}"
+    elif not phone_numbers:
+        sms_error = "No phone numbers found in user profile"
+
+    plan = {
+        "alert": dict(
+            user=user,
+            name=full_name,
+            email=user.email,
+            phone=getattr(user, "contact_no", "") or "",
+            blood_group=blood_group if blood_group != "-" else "",
+            height_cm=str(height_cm) if height_cm != "-" else "",
+            weight_kg=str(weight_kg) if weight_kg != "-" else "",
+            latitude=latitude,
+            longitude=longitude,
+            address=address,
+            message=message,
+            emergency_contact_phone=emergency_contact if emergency_contact != "-" else "",
+            emergency_email=profile.emergency_email if profile and profile.emergency_email else "",
+            status="PENDING"
+        ),
+        "email": (subject, recipients, template, context),
+        "sms_numbers": [] if sms_error else phone_numbers,
+        "sms_body": None if sms_error else _sms_body(full_name, maps_link, address, latitude, longitude),
+        "sms_error": sms_error,
+        "assignments": [
+            (match.responder.user_id, rank, round(match.distance_km, 3))
+            for rank, match in enumerate(responders, start=1)
+        ],
+    }
+    return plan, None
+
+
+def _queue_emergency_alert(user, plan):
+    """
+    Persist the alert and its outbox jobs together; the notification worker
+    delivers them. Returns the response body.
+    """
+    subject, recipients, template, context = plan["email"]
+    with transaction.atomic():
+        alert = EmergencyAlert.objects.create(**plan["alert"])
+        email_job = enqueue_email(subject, recipients, template=template, context=context, alert=alert)
+        sms_jobs = [enqueue_sms(phone, plan["sms_body"], alert=alert) for phone in plan["sms_numbers"]]
+        _assign_responders(alert, plan)
+        publish_alert_event(alert, "alert.created", _alert_event_payload(alert))
+        stats.alerts_created([alert])
+
+    return {
+        "success": True,
+        "message": "Emergency alert queued",
+        "alert_id": alert.id,
+        "email_recipients": recipients,
+        "email_job_id": email_job.id,
+        "sms_recipients": [job.recipients[0] for job in sms_jobs],
+        "sms_job_ids": [job.id for job in sms_jobs],
+        "sms_error": plan["sms_error"],
+        "assigned_responders": _assigned_responders(plan),
+        "user": {"id": user.id, "username": user.username, "email": user.email},
+    }
+
+
+def _assign_responders(alert, plan):
+    if not plan["assignments"]:
+        return
+    # Another process's grid may still offer a responder deleted moments ago.
+    existing = set(User.objects.filter(id__in=[a[0] for a in plan["assignments"]]).values_list("id", flat=True))
+    AlertAssignment.objects.bulk_create([
+        AlertAssignment(alert=alert, responder_id=user_id, rank=rank, distance_km=distance_km)
+        for user_id, rank, distance_km in plan["assignments"]
+        if user_id in existing
+    ])
+
+
+def _assigned_responders(plan):
+    return [{"id": user_id, "rank": rank, "distance_km": distance_km} for user_id, rank, distance_km in plan["assignments"]]
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def send_emergency_alert(request):
+    """
+    Frontend "Alert" button calls this API.
+
+    Expected JSON:
+      {
+        "user_id": 2,               # optional (preferred) OR "email"
+        "email": "user@mail.com",   # optional if user_id provided
+        "message": "I feel unsafe",
+        "latitude": 18.5204,        # optional but recommended
+        "longitude": 73.8567,       # optional but recommended
+        "address": "Pune, India",   # optional
+        "phone": "+919876543210",   # optional; SMS is sent to this number (and profile contacts)
+        "emergency_contact_phone": "+919876543210",  # optional, same as phone
+        "extra_recipients": ["friend@mail.com"]  # optional, adds to authority list
+      }
+    """
+    data, err = _json_body(request)
+    if err:
+        return err
+
+    user, err = _alert_user(data)
+    if err:
+        return err
+
+    dispatch.refresh()
+    plan, err = _plan_emergency_alert(data, user)
+    if err:
+        return err
+    return JsonResponse(_queue_emergency_alert(user, plan))
+
+
+def _alert_user(data):
+    """
+    The user an SOS request is for (by user_id, else email), with its profile.
+    Returns (user, error_response).
+    """
+    user_id = data.get("user_id")
+    email = _normalize_email(data.get("email"))
+    users = User.objects.select_related("profile")
     try:
-        twilio_sid = getattr(settings, "TWILIO_ACCOUNT_SID", None)
-        twilio_token = getattr(settings, "TWILIO_AUTH_TOKEN", None)
-        twilio_phone = getattr(settings, "TWILIO_PHONE_NUMBER", None)
-        
-        print(f"📋 Twilio Config Check:")
-        print(f"   SID: {'✓' if twilio_sid else '✗'} {twilio_sid[:10] if twilio_sid else 'None'}...")
-        print(f"   Token: {'✓' if twilio_token else '✗'} {'*' * 10 if twilio_token else 'None'}")
-        print(f"   Phone: {'✓' if twilio_phone else '✗'} {twilio_phone}")
-        
-        sms_debug_info["twilio_configured"] = bool(twilio_sid and twilio_token and twilio_phone)
-        sms_debug_info["twilio_phone"] = twilio_phone
-        
-        if twilio_sid and twilio_token and twilio_phone:
-            client = Client(twilio_sid, twilio_token)
-            
-            # Prepare SMS message - keep under 160 chars for Twilio Trial (error 30044 = Trial Message Length Exceeded)
-            sms_max_len = 160
-            short_name = (full_name[:24] + "..") if len(full_name) > 26 else full_name
-            if maps_link:
-                sms_body = f"SafeTrip EMERGENCY: {short_name} needs help! {maps_link}"
-            else:
-                loc = (address or (f"{latitude},{longitude}" if latitude is not None and longitude is not None else "?"))[:50]
-                sms_body = f"SafeTrip EMERGENCY: {short_name} needs help! Loc: {loc}"
-            if len(sms_body) > sms_max_len:
-                sms_body = sms_body[: sms_max_len - 3] + "..."
-            
-            # Collect phone numbers to send SMS
-            phone_numbers = []
-            skipped_numbers = []
-            
-            # Add emergency contact from profile (format to E.164)
-            if profile and profile.relative_mobile_no:
-                formatted = _format_phone_e164(profile.relative_mobile_no)
-                if formatted:
-                    phone_numbers.append(formatted)
-            
-            # Add additional relative numbers if any (format to E.164)
-            if profile and profile.relatives_mobile_numbers:
-                for num in profile.relatives_mobile_numbers:
-                    if num and num.strip():
-                        formatted = _format_phone_e164(num.strip())
-                        if formatted:
-                            phone_numbers.append(formatted)
-            
-            # Add phone number(s) from the request (frontend sends emergency contact so SMS is sent even if profile was empty)
-            for req_phone in request_phones:
-                formatted = _format_phone_e164(req_phone)
-                if formatted and formatted not in phone_numbers:
-                    phone_numbers.append(formatted)
-            
-            sms_debug_info["phone_numbers_found"] = phone_numbers
-            sms_debug_info["request_phones"] = request_phones
-            sms_debug_info["profile_exists"] = profile is not None
-            if profile:
-                sms_debug_info["relative_mobile_no"] = profile.relative_mobile_no
-                sms_debug_info["relatives_mobile_numbers"] = profile.relatives_mobile_numbers
-            
-            print(f"\n📞 Phone Numbers Found: {phone_numbers}")
-            print(f"👤 Profile exists: {profile is not None}")
-            
-            # Send SMS to all phone numbers
-            sms_errors = []
-            message_sids = []  # track SIDs to check delivery status
-            for phone in phone_numbers:
-                try:
-                    # Ensure phone number is in E.164 format
-                    if not phone.startswith('+'):
-                        skipped_numbers.append(f"{phone} (missing + prefix)")
-                        continue
-                    
-                    message_obj = client.messages.create(
-                        body=sms_body,
-                        from_=twilio_phone,
-                        to=phone
-                    )
-                    sms_recipients.append(phone)
-                    message_sids.append((phone, message_obj.sid))
-                    sms_sent = True
-                    print(f"✅ SMS accepted by Twilio to {phone}: SID={message_obj.sid} (status={message_obj.status})")
-                except Exception as e:
-                    error_msg = f"{phone}: {str(e)}"
-                    sms_errors.append(error_msg)
-                    print(f"❌ Failed to send SMS to {error_msg}")
-                    continue
-            
-            # Check delivery status after a short delay (Twilio updates status asynchronously)
-            if message_sids:
-                import time
-                time.sleep(2)
-                for phone, sid in message_sids:
-                    try:
-                        msg = client.messages(sid).fetch()
-                        status = getattr(msg, "status", "unknown")
-                        err_code = getattr(msg, "error_code", None)
-                        err_msg = getattr(msg, "error_message", None)
-                        print(f"   📱 Delivery status for {phone}: {status}" + (f" (error {err_code}: {err_msg})" if err_code else ""))
-                        if status in ("failed", "undelivered") and err_code:
-                            sms_debug_info[f"twilio_error_{phone}"] = f"{status} - {err_code}: {err_msg}"
-                    except Exception as e:
-                        print(f"   ⚠ Could not fetch status for {sid}: {e}")
-            
-            # Hint when SMS not received (common: trial account, India DLT/DNC, unverified number)
-            if sms_sent and any(p.startswith("+91") for p in sms_recipients):
-                print("\n📌 If SMS was not received (India +91):")
-                print("   1. Trial: Add +91 as Verified Caller ID: https://console.twilio.com/us1/develop/phone-numbers/manage/verified")
-                print("   2. Check status: https://console.twilio.com/us1/monitor/logs/sms (30044=message too long, 30004=blocked)")
-            
-            sms_debug_info["skipped_numbers"] = skipped_numbers
-            sms_debug_info["sms_errors"] = sms_errors
-            
-            if not phone_numbers:
-                sms_error = "No phone numbers found in user profile"
-            elif skipped_numbers and not sms_sent:
-                sms_error = f"All phone numbers skipped (must start with +): {skipped_numbers}"
-            elif sms_errors and not sms_sent:
-                sms_error = f"Failed to send to all numbers: {'; '.join(sms_errors)}"
+        if user_id:
+            return users.get(id=user_id), None
+        if email:
+            return _users_with_email(email, users).get(), None
+    except User.DoesNotExist:
+        return None, JsonResponse({"success": False, "message": "User not found"}, status=404)
+    return None, JsonResponse({"success": False, "message": "user_id or email is required"}, status=400)
+
+
+def _coordinate(value, limit):
+    """
+    A latitude / longitude as a Decimal within +-limit; None when absent.
+    Raises ValueError for anything else.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError("not a number")
+    if not number.is_finite() or abs(number) > limit:
+        raise ValueError(f"must be between -{limit} and {limit}")
+    return number.quantize(Decimal("0.000001"))
+
+
+def _batch_alert_items(events):
+    """
+    Validate the events of a batch SOS request, keeping their order.
+    Returns [(index, item, error)]; item is None when error is set.
+    """
+    items = []
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            items.append((index, None, "event must be an object"))
+            continue
+        try:
+            latitude = _coordinate(event.get("latitude"), 90)
+            longitude = _coordinate(event.get("longitude"), 180)
+        except ValueError as exc:
+            items.append((index, None, f"invalid location: {exc}"))
+            continue
+        if (latitude is None) != (longitude is None):
+            items.append((index, None, "latitude and longitude must be sent together"))
+            continue
+        address = (event.get("address") or "").strip()
+        if not address and latitude is not None:
+            address = geocoder.describe(latitude, longitude)
+        items.append((index, {
+            "message": (event.get("message") or "Emergency SOS Alert").strip(),
+            "latitude": latitude,
+            "longitude": longitude,
+            "address": address,
+            "client_id": event.get("client_id"),
+        }, None))
+    return items
+
+
+def _plan_emergency_alert_batch(data, user):
+    """
+    _plan_emergency_alert for a batch: validate the events and plan one
+    notification fan-out carrying the newest message and the newest location
+    in the batch. No queries, but reverse-geocodes like _plan_emergency_alert.
+    Returns (plan, error_response); plan["items"]
+    holds every event's (index, item, error) in request order.
+    """
+    events = data.get("events")
+    max_events = int(getattr(settings, "ALERT_BATCH_MAX_EVENTS", 100))
+    if not isinstance(events, list) or not events:
+        return None, JsonResponse({"success": False, "message": "events must be a non-empty list"}, status=400)
+    if len(events) > max_events:
+        return None, JsonResponse({"success": False, "message": f"At most {max_events} events per batch"}, status=400)
+
+    items = _batch_alert_items(events)
+    accepted = [item for _, item, error in items if not error]
+    if not accepted:
+        return None, JsonResponse({
+            "success": False,
+            "message": "No valid events in batch",
+            "results": [{"index": index, "success": False, "message": error} for index, _, error in items],
+        }, status=400)
+
+    newest = dict(accepted[-1])
+    located = [item for item in accepted if item["latitude"] is not None]
+    if located and newest["latitude"] is None:
+        newest.update(latitude=located[-1]["latitude"], longitude=located[-1]["longitude"])
+        newest["address"] = newest["address"] or located[-1]["address"]
+
+    for field in ("latitude", "longitude"):
+        # The email context is stored as JSON.
+        newest[field] = str(newest[field]) if newest[field] is not None else None
+
+    plan, err = _plan_emergency_alert({**data, **newest}, user)
+    if err:
+        return None, err
+    if len(accepted) > 1:
+        plan["email"][3]["message"] = f"{newest['message']} ({len(accepted)} SOS alerts sent while offline)"
+    plan["items"] = items
+    return plan, None
+
+
+def _queue_emergency_alert_batch(user, plan):
+    """
+    Persist one alert per accepted batch event with a single INSERT, plus
+    one email job and the SMS jobs for the whole batch, attached to the
+    newest alert. Returns the response body.
+    """
+    base = plan["alert"]
+    alerts = [
+        EmergencyAlert(**{**base, **{field: item[field] for field in ("message", "latitude", "longitude", "address")}})
+        for _, item, error in plan["items"]
+        if not error
+    ]
+    for alert in alerts:
+        alert.set_geohash()
+    subject, recipients, template, context = plan["email"]
+    with transaction.atomic():
+        alerts = EmergencyAlert.objects.bulk_create(alerts)
+        latest = alerts[-1]
+        email_job = enqueue_email(subject, recipients, template=template, context=context, alert=latest)
+        sms_jobs = [enqueue_sms(phone, plan["sms_body"], alert=latest) for phone in plan["sms_numbers"]]
+        _assign_responders(latest, plan)
+        publish_alert_events([(alert, "alert.created", _alert_event_payload(alert)) for alert in alerts])
+        stats.alerts_created(alerts)
+
+    alert_ids = iter(alert.id for alert in alerts)
+    results = []
+    for index, item, error in plan["items"]:
+        if error:
+            results.append({"index": index, "success": False, "message": error})
         else:
-            missing = []
-            if not twilio_sid:
-                missing.append("TWILIO_ACCOUNT_SID")
-            if not twilio_token:
-                missing.append("TWILIO_AUTH_TOKEN")
-            if not twilio_phone:
-                missing.append("TWILIO_PHONE_NUMBER")
-            sms_error = f"Twilio credentials not configured. Missing: {', '.join(missing)}"
-    except Exception as e:
-        sms_error = f"SMS sending failed: {str(e)}"
-        print(f"🚨 Twilio SMS Error: {str(e)}")
-        import traceback
-        print("🔍 Full traceback:")
-        traceback.print_exc()
-        sms_debug_info["exception_trace"] = traceback.format_exc()
-    
-    # Ensure all SMS variables are initialized
-    if 'sms_debug_info' not in locals():
-        sms_debug_info = {"error": "SMS variables not initialized"}
-    
-    print(f"\n📊 SMS FINAL RESULT:")
-    print(f"   SMS Sent: {sms_sent}")
-    print(f"   SMS Recipients: {sms_recipients}")
-    print(f"   SMS Error: {sms_error}")
-    print("=" * 60 + "\n")
-
-    # Save alert to database
-    from .models import EmergencyAlert
-    alert = EmergencyAlert.objects.create(
-        user=user,
-        name=full_name,
-        email=user.email,
-        phone=getattr(user, "contact_no", "") or "",
-        blood_group=blood_group if blood_group != "-" else "",
-        height_cm=str(height_cm) if height_cm != "-" else "",
-        weight_kg=str(weight_kg) if weight_kg != "-" else "",
-        latitude=latitude,
-        longitude=longitude,
-        address=address,
-        message=message,
-        emergency_contact_phone=emergency_contact if emergency_contact != "-" else "",
-        emergency_email=profile.emergency_email if profile and profile.emergency_email else "",
-        status="PENDING"
+            results.append({"index": index, "client_id": item["client_id"], "success": True, "alert_id": next(alert_ids)})
+
+    return {
+        "success": True,
+        "message": f"{len(alerts)} emergency alert(s) queued",
+        "alert_ids": [alert.id for alert in alerts],
+        "latest_alert_id": latest.id,
+        "results": results,
+        "email_recipients": recipients,
+        "email_job_id": email_job.id,
+        "sms_recipients": [job.recipients[0] for job in sms_jobs],
+        "sms_job_ids": [job.id for job in sms_jobs],
+        "sms_error": plan["sms_error"],
+        "assigned_responders": _assigned_responders(plan),
+        "user": {"id": user.id, "username": user.username, "email": user.email},
+    }
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def send_emergency_alert_batch(request):
+    """
+    SOS presses a device queued while offline, sent together once it is back.
+
+    Expected JSON:
+      {
+        "user_id": 2,               # OR "email"
+        "phone": "+919876543210",   # optional, as for /emergency/alert/
+        "extra_recipients": [...],  # optional, as for /emergency/alert/
+        "events": [                 # oldest first
+          {"client_id": "a1", "message": "...", "latitude": 18.52, "longitude": 73.85, "address": "..."},
+          ...
+        ]
+      }
+
+    Every valid event is stored as an alert, but authorities and contacts
+    are notified once, with the newest event's message and the newest
+    location in the batch. "results" reports each event in request order.
+    """
+    data, err = _json_body(request)
+    if err:
+        return err
+
+    user, err = _alert_user(data)
+    if err:
+        return err
+
+    dispatch.refresh()
+    plan, err = _plan_emergency_alert_batch(data, user)
+    if err:
+        return err
+    return JsonResponse(_queue_emergency_alert_batch(user, plan))
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def alert_notifications(request, alert_id):
+    """
+    Delivery outcome of every email / SMS queued for an alert.
+    """
+    if not EmergencyAlert.objects.filter(id=alert_id).exists():
+        return JsonResponse({"success": False, "message": "Alert not found"}, status=404)
+
+    jobs = NotificationJob.objects.filter(alert_id=alert_id).order_by("id")
+    notifications = [_notification_to_dict(job) for job in jobs]
+    sms_jobs = [n for n in notifications if n["channel"] == "SMS"]
+
+    return JsonResponse({
+        "success": True,
+        "alert_id": alert_id,
+        "notifications": notifications,
+        "email_sent": any(n["channel"] == "EMAIL" and n["status"] == "SENT" for n in notifications),
+        "sms_recipients": [n["recipients"][0] for n in sms_jobs if n["status"] == "SENT"],
+        "sms_errors": [f"{n['recipients'][0]}: {n['error_message']}" for n in sms_jobs if n["status"] == "FAILED"],
+        "sms_delivered": [n["recipients"][0] for n in sms_jobs if n["provider_status"] == "delivered"],
+        "sms_undelivered": [
+            f"{n['recipients'][0]}: {n['provider_status']}" + (f" ({n['error_code']})" if n["error_code"] else "")
+            for n in sms_jobs
+            if n["provider_status"] in ("undelivered", "failed")
+        ],
+        "pending": sum(1 for n in notifications if n["status"] in ("QUEUED", "SENDING")),
+    })
+
+
+def _trail_fixes(data):
+    """
+    Fixes from a trail append body: {"points": [{"t": <epoch ms> or "timestamp": <ISO>,
+    "latitude", "longitude", "accuracy"}]} or a single point object.
+    Returns (fixes, error_response).
+    """
+    points = data.get("points") if "points" in data else [data]
+    max_points = int(getattr(settings, "TRAIL_MAX_POINTS_PER_REQUEST", 500))
+    if not isinstance(points, list) or not points:
+        return None, JsonResponse({"success": False, "message": "points must be a non-empty list"}, status=400)
+    if len(points) > max_points:
+        return None, JsonResponse({"success": False, "message": f"At most {max_points} points per request"}, status=400)
+
+    fixes = []
+    for index, point in enumerate(points):
+        if not isinstance(point, dict):
+            return None, JsonResponse({"success": False, "message": f"points[{index}] must be an object"}, status=400)
+        try:
+            latitude = _coordinate(point.get("latitude"), 90)
+            longitude = _coordinate(point.get("longitude"), 180)
+            if latitude is None or longitude is None:
+                raise ValueError("latitude and longitude are required")
+            if point.get("t") is not None:
+                t = int(point["t"])
+            else:
+                when = _parse_query_datetime(point.get("timestamp"))
+                if not when:
+                    raise ValueError("t (epoch milliseconds) or timestamp is required")
+                t = int(when.timestamp() * 1000)
+            if t <= 0:
+                raise ValueError("t must be positive")
+            accuracy = min(max(int(point.get("accuracy") or 0), 0), 65535)
+        except (TypeError, ValueError) as exc:
+            return None, JsonResponse({"success": False, "message": f"points[{index}]: {exc}"}, status=400)
+        fixes.append(trail.Fix(t, int(latitude * 1_000_000), int(longitude * 1_000_000), accuracy))
+    return fixes, None
+
+
+def _trail_appended_response(alert_id, result):
+    accepted, dropped, last = result
+    return JsonResponse({
+        "success": True,
+        "alert_id": alert_id,
+        "accepted": accepted,
+        "dropped": dropped,
+        "last_point": trail.fix_to_dict(last) if last else None,
+    })
+
+
+def _trail_bound_ms(value):
+    """
+    A since / until trail bound: epoch milliseconds or an ISO date / datetime.
+    Returns None when absent and False when it cannot be parsed.
+    """
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    parsed = _parse_query_datetime(value)
+    return int(parsed.timestamp() * 1000) if parsed else False
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def alert_trail(request, alert_id):
+    """
+    Location trail of an alert.
+
+    POST appends fixes while the alert is not RESOLVED (see _trail_fixes for
+    the body); send several per request when the device has them queued.
+    Fixes not newer than the last stored one are dropped. The alert's own
+    latitude / longitude follow the newest fix.
+
+    GET query params:
+      since, until   epoch milliseconds or ISO date / datetime
+      tolerance_m    Douglas-Peucker simplification tolerance in metres
+      max_points     at most this many fixes, bucketed by time
+                     (default / max TRAIL_MAX_READ_POINTS)
+    """
+    if request.method == "POST":
+        data, err = _json_body(request)
+        if err:
+            return err
+        fixes, err = _trail_fixes(data)
+        if err:
+            return err
+        try:
+            result = trail.append_fixes(alert_id, fixes)
+        except trail.TrailError as exc:
+            return JsonResponse({"success": False, "message": str(exc)}, status=exc.status)
+        return _trail_appended_response(alert_id, result)
+
+    if not EmergencyAlert.objects.filter(id=alert_id).exists():
+        return JsonResponse({"success": False, "message": "Alert not found"}, status=404)
+
+    since = _trail_bound_ms(request.GET.get("since"))
+    until = _trail_bound_ms(request.GET.get("until"))
+    if since is False or until is False:
+        return JsonResponse({"success": False, "message": "since/until must be epoch milliseconds or ISO datetimes"}, status=400)
+
+    max_read = int(getattr(settings, "TRAIL_MAX_READ_POINTS", 2000))
+    try:
+        tolerance_m = float(request.GET.get("tolerance_m") or 0)
+        max_points = int(request.GET.get("max_points") or max_read)
+    except ValueError:
+        return JsonResponse({"success": False, "message": "tolerance_m and max_points must be numbers"}, status=400)
+    max_points = max(2, min(max_points, max_read))
+
+    fixes = trail.read_fixes(alert_id, since, until)
+    points = trail.bucket(trail.simplify(fixes, tolerance_m), max_points)
+    return JsonResponse({
+        "success": True,
+        "alert_id": alert_id,
+        "total_points": len(fixes),
+        "count": len(points),
+        "points": [trail.fix_to_dict(fix) for fix in points],
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def twilio_status_callback(request):
+    """
+    Twilio SMS status callback (set TWILIO_STATUS_CALLBACK_URL to this route).
+
+    Twilio posts form data: MessageSid, MessageStatus, ErrorCode, ErrorMessage.
+    Requests are checked against X-Twilio-Signature unless
+    TWILIO_VALIDATE_WEBHOOKS is off (e.g. for a local stand-in).
+    """
+    if getattr(settings, "TWILIO_VALIDATE_WEBHOOKS", True):
+        token = getattr(settings, "TWILIO_AUTH_TOKEN", None) or ""
+        url = getattr(settings, "TWILIO_STATUS_CALLBACK_URL", None) or request.build_absolute_uri()
+        signature = request.META.get("HTTP_X_TWILIO_SIGNATURE", "")
+        if not token or not RequestValidator(token).validate(url, request.POST.dict(), signature):
+            return JsonResponse({"success": False, "message": "Invalid Twilio signature"}, status=403)
+
+    message_sid = (request.POST.get("MessageSid") or request.POST.get("SmsSid") or "").strip()
+    message_status = (request.POST.get("MessageStatus") or request.POST.get("SmsStatus") or "").strip().lower()
+    if not message_sid or not message_status:
+        return JsonResponse({"success": False, "message": "MessageSid and MessageStatus are required"}, status=400)
+
+    record_provider_status(
+        message_sid,
+        message_status,
+        error_code=(request.POST.get("ErrorCode") or "").strip(),
+        error_message=(request.POST.get("ErrorMessage") or "").strip(),
     )
+    # Unknown SIDs are acknowledged too, otherwise Twilio keeps retrying.
+    return HttpResponse(status=204)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def refresh_token(request):
+    """
+    Exchange a refresh token for a new access / refresh token pair.
+    Body: {"refresh_token": "..."}
+    """
+    data, err = _json_body(request)
+    if err:
+        return err
+
+    token = (data.get("refresh_token") or data.get("refresh") or "").strip()
+    if not token:
+        return JsonResponse({"success": False, "message": "refresh_token is required"}, status=400)
+
+    try:
+        user_id = read_refresh_token(token)
+    except SignatureExpired:
+        return JsonResponse({"success": False, "message": "Refresh token expired"}, status=401)
+    except BadSignature:
+        return JsonResponse({"success": False, "message": "Invalid refresh token"}, status=401)
+
+    user = auth_cache.get_user(user_id)
+    if user is None or not user.is_active:
+        return JsonResponse({"success": False, "message": "User not found"}, status=401)
 
     return JsonResponse(
         {
             "success": True,
-            "message": "Emergency alert sent successfully",
-            "email_sent": True,
-            "email_recipients": recipients,
-            "sms_sent": sms_sent,
-            "sms_recipients": sms_recipients,
-            "sms_error": sms_error,
-            "sms_debug": sms_debug_info,
-            "alert_id": alert.id,
-            "user": {"id": user.id, "username": user.username, "email": user.email},
-        }
+            **issue_tokens(user),
+            "user": {"id": user.id, "username": user.username, "role": getattr(user, "role", "USER")},
+        },
+        status=200,
     )
 
 
@@ -818,12 +1287,50 @@ def current_user_from_token(request):
     """
     Return the current user and profile from the Authorization token only.
     No fallback - use this for "who am I" so refresh shows the correct panel (USER vs AUTHORITY).
+
+    ?fields=identity returns just id / username / role, read from the token
+    itself unless the user changed since it was issued.
     """
-    user, err = _auth_user_from_request(request)
+    if request.GET.get("fields") == "identity":
+        claims, err = _auth_claims_from_request(request, fresh=True)
+        if err:
+            return err
+        return JsonResponse(
+            {"success": True, "user": {"id": claims["uid"], "username": claims["usr"], "role": claims["role"]}},
+            status=200,
+        )
+
+    claims, err = _auth_claims_from_request(request)
     if err:
         return err
-    profile, _ = UserProfile.objects.get_or_create(user=user)
-    return JsonResponse({"success": True, **_profile_to_dict(request, profile)}, status=200)
+    return _profile_response(request, claims["uid"])
+
+
+def _profile_response(request, user_id):
+    """
+    The GET body shared by current_user_from_token and me_profile.
+
+    The serialized body, its ETag and Last-Modified are cached per user in
+    auth_cache, keyed by scheme + host (the image URLs are absolute), and
+    dropped when the user or profile is saved. A repeat request is answered
+    from those bytes: no queries, no serialization.
+    """
+    key = ("profile", request.build_absolute_uri("/"))
+    version, cached = auth_cache.get_response(user_id, key)
+    if cached is None:
+        user = auth_cache.get_user(user_id)
+        if user is None:
+            return JsonResponse({"success": False, "message": "User not found"}, status=401)
+        profile = auth_cache.get_profile(user)
+        body = JsonResponse({"success": True, **_profile_to_dict(request, profile)}).content
+        cached = (_profile_etag(request, profile), profile.updated_at, body)
+        auth_cache.store_response(user_id, version, key, cached)
+
+    etag, last_modified, body = cached
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified:
+        return _with_validators(not_modified, etag, last_modified)
+    return _with_validators(HttpResponse(body, content_type="application/json"), etag, last_modified)
 
 
 @csrf_exempt
@@ -834,8 +1341,26 @@ def me_profile(request):
     When Authorization token is present, use the token to identify the user (correct role/panel).
     Without token (e.g. testing), fall back to user_id from query/body or first user.
     """
+    content_type = (request.content_type or "").lower()
+    upload_limit = None
+    if request.method != "GET" and "application/json" not in content_type:
+        max_bytes = images._max_bytes()
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0
+        # Room for the other form fields; anything bigger can't hold an allowed image.
+        if content_length > max_bytes + 64 * 1024:
+            return _image_too_large_response(max_bytes)
+        upload_limit = images.limit_uploads(request)
+
     user = None
     if _get_bearer_token(request):
+        if request.method == "GET":
+            claims, err = _auth_claims_from_request(request)
+            if err:
+                return err
+            return _profile_response(request, claims["uid"])
         user, err = _auth_user_from_request(request)
         if err:
             return err
@@ -843,12 +1368,15 @@ def me_profile(request):
         user_id = None
         if request.method == "GET":
             user_id = request.GET.get("user_id")
-        else:
+        elif "application/json" in content_type:
             try:
                 body_data = json.loads(request.body or "{}")
                 user_id = body_data.get("user_id")
             except Exception:
-                user_id = request.POST.get("user_id") if request.POST else None
+                user_id = None
+        else:
+            # Form data: parsed (and uploads streamed) by the handlers, never read whole.
+            user_id = request.POST.get("user_id")
         if not user_id:
             user = User.objects.first()
             if not user:
@@ -859,15 +1387,17 @@ def me_profile(request):
             except User.DoesNotExist:
                 return JsonResponse({"success": False, "message": "User not found"}, status=404)
 
-    # --- GET/CREATE PROFILE ---
-    profile, _ = UserProfile.objects.get_or_create(user=user)
+    if upload_limit is not None and upload_limit.too_large:
+        return _image_too_large_response(upload_limit.max_bytes)
 
     if request.method == "GET":
-        return JsonResponse({"success": True, **_profile_to_dict(request, profile)}, status=200)
+        return _profile_response(request, user.pk)
+
+    # --- GET/CREATE PROFILE ---
+    profile = auth_cache.get_profile(user)
 
     # --- 4. PREPARE DATA ---
     data = {}
-    content_type = (request.content_type or "").lower()
     uploaded_image = None
     
     if "application/json" in content_type:
@@ -879,6 +1409,8 @@ def me_profile(request):
         # Form Data
         data = request.POST.dict()
         uploaded_image = request.FILES.get("image")
+        if upload_limit is not None and upload_limit.too_large:
+            return _image_too_large_response(upload_limit.max_bytes)
         
         # Handle list of numbers
         if "relatives_mobile_numbers" in request.POST and hasattr(request.POST, "getlist"):
@@ -889,6 +1421,9 @@ def me_profile(request):
     # --- 5. UPDATE FIELDS ---
     if uploaded_image is not None:
         profile.image = uploaded_image
+        # The old variants show the old photo; new ones follow from the image pool.
+        profile.image_thumb = None
+        profile.image_medium = None
 
     if "relative_mobile_no" in data:
         # Convert to string to avoid errors
@@ -925,64 +1460,385 @@ def me_profile(request):
         return JsonResponse({"success": False, "message": "Validation error", "error": str(e)}, status=400)
 
     profile.save()
+    if uploaded_image is not None:
+        transaction.on_commit(partial(images.schedule_variants, profile.pk, profile.image.name))
     return JsonResponse({"success": True, "message": "Profile updated", **_profile_to_dict(request, profile)}, status=200)
 
 
+def _image_too_large_response(max_bytes):
+    return JsonResponse(
+        {"success": False, "message": f"Image must be at most {max_bytes / (1024 * 1024):.3g} MB"},
+        status=413,
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def responder_status(request):
+    """
+    AUTHORITY users report where they are and whether they can take alerts.
+
+    POST JSON: {"latitude": 18.52, "longitude": 73.85, "available": true}
+    GET returns the last report. SOS alerts are assigned to the nearest
+    available responders (SafeTrip_API.dispatch).
+    """
+    user, err = _auth_user_from_request(request)
+    if err:
+        return err
+    if getattr(user, "role", "USER") != "AUTHORITY":
+        return JsonResponse({"success": False, "message": "Only AUTHORITY users can report responder status"}, status=403)
+
+    if request.method == "GET":
+        try:
+            status = ResponderStatus.objects.get(user=user)
+        except ResponderStatus.DoesNotExist:
+            return JsonResponse({"success": True, "status": None})
+        return JsonResponse({"success": True, "status": _responder_status_to_dict(status)})
+
+    data, err = _json_body(request)
+    if err:
+        return err
+    try:
+        latitude = _coordinate(data.get("latitude"), 90)
+        longitude = _coordinate(data.get("longitude"), 180)
+    except ValueError as exc:
+        return JsonResponse({"success": False, "message": f"Invalid location: {exc}"}, status=400)
+    if latitude is None or longitude is None:
+        return JsonResponse({"success": False, "message": "latitude and longitude are required"}, status=400)
+    available = data.get("available", True)
+    if not isinstance(available, bool):
+        return JsonResponse({"success": False, "message": "available must be true or false"}, status=400)
+
+    with transaction.atomic():
+        status = dispatch.report_position(user, latitude, longitude, available)
+    return JsonResponse({"success": True, "status": _responder_status_to_dict(status)})
+
+
+def _responder_status_to_dict(status: ResponderStatus):
+    return {
+        "latitude": str(status.latitude),
+        "longitude": str(status.longitude),
+        "available": status.available,
+        "updated_at": status.updated_at.isoformat(),
+    }
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def list_emergency_alerts(request):
     """
-    List all emergency alerts with optional filtering by status
+    List emergency alerts, newest first, one page at a time.
+
+    Query params:
+      status         PENDING / IN_PROGRESS / RESOLVED
+      since, until   ISO date or datetime bounds on created_at
+      limit          page size (default ALERTS_PAGE_SIZE, max ALERTS_MAX_PAGE_SIZE)
+      cursor         next_cursor from the previous page
+      fields=all     include medical / contact columns, not just the dashboard ones
+      count=exact    add "total" (a full count over the filtered set)
+      count=estimate add "total" capped at ALERTS_COUNT_CAP
+
+    Responses carry a strong ETag derived from the filtered set's latest
+    updated_at (an index lookup), the all-time status counts kept by
+    SafeTrip_API.stats (which move on deletes) and the page's user thumbnail
+    names, plus a Last-Modified from that updated_at; a matching
+    If-None-Match or If-Modified-Since gets an empty 304 once the page (one
+    LIMIT query) is read. Counting the filtered set only happens for
+    count=exact / estimate.
     """
-    from .models import EmergencyAlert
-    
-    status_filter = request.GET.get("status", None)
-    
     alerts = EmergencyAlert.objects.all()
+
+    status_filter = request.GET.get("status")
     if status_filter:
         alerts = alerts.filter(status=status_filter)
-    
-    alerts_data = []
-    for alert in alerts:
-        alerts_data.append({
-            "id": alert.id,
-            "name": alert.name,
-            "email": alert.email,
-            "phone": alert.phone,
-            "blood_group": alert.blood_group,
-            "height_cm": alert.height_cm,
-            "weight_kg": alert.weight_kg,
-            "latitude": str(alert.latitude) if alert.latitude else None,
-            "longitude": str(alert.longitude) if alert.longitude else None,
-            "address": alert.address,
-            "message": alert.message,
-            "status": alert.status,
-            "emergency_contact_phone": alert.emergency_contact_phone,
-            "emergency_email": alert.emergency_email,
-            "timestamp": alert.created_at.isoformat(),
-            "updated_at": alert.updated_at.isoformat(),
-        })
-    
+
+    since = _parse_query_datetime(request.GET.get("since"))
+    until = _parse_query_datetime(request.GET.get("until"))
+    if since is False or until is False:
+        return JsonResponse({"success": False, "message": "since/until must be ISO dates or datetimes"}, status=400)
+    if since:
+        alerts = alerts.filter(created_at__gte=since)
+    if until:
+        alerts = alerts.filter(created_at__lt=until)
+    filtered = alerts
+
+    default_limit = int(getattr(settings, "ALERTS_PAGE_SIZE", 100))
+    max_limit = int(getattr(settings, "ALERTS_MAX_PAGE_SIZE", 500))
+    try:
+        limit = int(request.GET.get("limit") or default_limit)
+    except ValueError:
+        return JsonResponse({"success": False, "message": "limit must be an integer"}, status=400)
+    limit = max(1, min(limit, max_limit))
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        position = _decode_alert_cursor(cursor)
+        if position is None:
+            return JsonResponse({"success": False, "message": "Invalid cursor"}, status=400)
+        created_at, alert_id = position
+        alerts = alerts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=alert_id))
+
+    fields = ALERT_ALL_FIELDS if request.GET.get("fields") == "all" else ALERT_LIST_FIELDS
+    rows = list(alerts.order_by("-created_at", "-id").values(*fields, ALERT_USER_IMAGE_FIELD)[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Version stamp for the filtered set: a create, status change or move
+    # advances the latest updated_at; a delete changes the stats totals.
+    latest = filtered.order_by("-updated_at").values_list("updated_at", flat=True).first()
+    totals = stats.status_totals()
+    # Each upload gets new variant file names, so the page's thumbnail names
+    # track exactly the profile changes this body shows.
+    # The host is in the body's absolute image URLs.
+    etag = _strong_etag(
+        "alerts",
+        latest.isoformat() if latest else "",
+        *(totals[status] for status, _ in EmergencyAlert.STATUS_CHOICES),
+        *(row[ALERT_USER_IMAGE_FIELD] or "" for row in rows),
+        request.get_full_path(),
+        request.get_host(),
+    )
+    not_modified = _not_modified(request, etag, latest)
+    if not_modified:
+        return _with_validators(not_modified, etag, latest)
+
+    response = {
+        "success": True,
+        "alerts": [_alert_row_to_dict(row, request) for row in rows],
+        "count": len(rows),
+        "has_more": has_more,
+        "next_cursor": _encode_alert_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None,
+    }
+
+    count_mode = request.GET.get("count")
+    if count_mode == "exact":
+        response["total"] = filtered.order_by().count()
+        response["total_exact"] = True
+    elif count_mode == "estimate":
+        # Stops counting after cap + 1 rows.
+        cap = int(getattr(settings, "ALERTS_COUNT_CAP", 10000))
+        total = filtered.order_by()[: cap + 1].count()
+        response["total"] = min(total, cap)
+        response["total_exact"] = total <= cap
+
+    return _with_validators(JsonResponse(response), etag, latest)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def nearby_emergency_alerts(request):
+    """
+    Alerts within a radius of a point, nearest first, one page at a time.
+
+    Query params:
+      lat, lng       center (required)
+      radius_km      default 5, max ALERTS_NEARBY_MAX_RADIUS_KM
+      status         PENDING / IN_PROGRESS / RESOLVED (default: PENDING and IN_PROGRESS)
+      limit          page size (default ALERTS_PAGE_SIZE, max ALERTS_MAX_PAGE_SIZE)
+      cursor         next_cursor from the previous page
+      fields=all     include medical / contact columns, not just the dashboard ones
+
+    Candidates come from (status, geohash) index ranges covering the circle
+    (see SafeTrip_API.geo); only their coordinates are read, exact distances
+    are computed here, and full rows are loaded for the returned page only.
+    """
+    try:
+        latitude = _coordinate(request.GET.get("lat"), 90)
+        longitude = _coordinate(request.GET.get("lng"), 180)
+    except ValueError as exc:
+        return JsonResponse({"success": False, "message": f"Invalid lat/lng: {exc}"}, status=400)
+    if latitude is None or longitude is None:
+        return JsonResponse({"success": False, "message": "lat and lng are required"}, status=400)
+
+    max_radius = float(getattr(settings, "ALERTS_NEARBY_MAX_RADIUS_KM", 100))
+    try:
+        radius_km = float(request.GET.get("radius_km") or 5)
+    except ValueError:
+        return JsonResponse({"success": False, "message": "radius_km must be a number"}, status=400)
+    if not 0 < radius_km <= max_radius:
+        return JsonResponse({"success": False, "message": f"radius_km must be between 0 and {max_radius:g}"}, status=400)
+
+    status_filter = request.GET.get("status")
+    statuses = [status_filter] if status_filter else ["PENDING", "IN_PROGRESS"]
+
+    default_limit = int(getattr(settings, "ALERTS_PAGE_SIZE", 100))
+    max_limit = int(getattr(settings, "ALERTS_MAX_PAGE_SIZE", 500))
+    try:
+        limit = int(request.GET.get("limit") or default_limit)
+    except ValueError:
+        return JsonResponse({"success": False, "message": "limit must be an integer"}, status=400)
+    limit = max(1, min(limit, max_limit))
+
+    after = None
+    cursor = request.GET.get("cursor")
+    if cursor:
+        after = _decode_nearby_cursor(cursor)
+        if after is None:
+            return JsonResponse({"success": False, "message": "Invalid cursor"}, status=400)
+
+    candidates = EmergencyAlert.objects.filter(geo.nearby_filter(latitude, longitude, radius_km, statuses)).order_by()
+    matches = []
+    for alert_id, alert_lat, alert_lng in candidates.values_list("id", "latitude", "longitude"):
+        distance = round(geo.haversine_km(latitude, longitude, alert_lat, alert_lng), 6)
+        if distance <= radius_km and (after is None or (distance, alert_id) > after):
+            matches.append((distance, alert_id))
+    matches.sort()
+    has_more = len(matches) > limit
+    page = matches[:limit]
+
+    fields = ALERT_ALL_FIELDS if request.GET.get("fields") == "all" else ALERT_LIST_FIELDS
+    rows = {
+        row["id"]: row
+        for row in EmergencyAlert.objects.filter(id__in=[i for _, i in page]).values(*fields, ALERT_USER_IMAGE_FIELD)
+    }
+    alerts = []
+    for distance, alert_id in page:
+        if alert_id in rows:  # deleted in between
+            alerts.append({**_alert_row_to_dict(rows[alert_id], request), "distance_km": round(distance, 3)})
+
     return JsonResponse({
         "success": True,
-        "alerts": alerts_data,
-        "count": len(alerts_data)
+        "alerts": alerts,
+        "count": len(alerts),
+        "has_more": has_more,
+        "next_cursor": _encode_nearby_cursor(*page[-1]) if has_more else None,
     })
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def alert_stats(request):
+    """
+    Alert counts for the dashboard, read from the AlertStatBucket summary.
+
+    Query params:
+      period         hour or day (default day); buckets are UTC
+      since, until   ISO date or datetime window for "buckets" (default: the
+                     last STATS_DEFAULT_HOURS hours / STATS_DEFAULT_DAYS days);
+                     since is rounded down to a bucket start
+
+    "totals" and "regions" count every alert by its current status; regions
+    are STATS_REGION_PRECISION-character geohash cells. "buckets" counts the
+    alerts created in each period, zero-filled, by current status.
+    """
+    period = request.GET.get("period") or "day"
+    if period not in stats.PERIODS:
+        return JsonResponse({"success": False, "message": "period must be hour or day"}, status=400)
+
+    since = _parse_query_datetime(request.GET.get("since"))
+    until = _parse_query_datetime(request.GET.get("until"))
+    if since is False or until is False:
+        return JsonResponse({"success": False, "message": "since/until must be ISO dates or datetimes"}, status=400)
+    step = stats.PERIODS[period]
+    if until is None:
+        until = stats.period_start(timezone.now(), period) + step
+    if since is None:
+        default_span = (
+            timedelta(hours=int(getattr(settings, "STATS_DEFAULT_HOURS", 24)))
+            if period == "hour"
+            else timedelta(days=int(getattr(settings, "STATS_DEFAULT_DAYS", 30)))
+        )
+        since = until - default_span
+    since = stats.period_start(since, period)
+    if since >= until:
+        return JsonResponse({"success": False, "message": "since must be before until"}, status=400)
+    max_buckets = int(getattr(settings, "STATS_MAX_BUCKETS", 1000))
+    if (until - since) / step > max_buckets:
+        return JsonResponse({"success": False, "message": f"At most {max_buckets} buckets per request"}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "period": period,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        **stats.summary(period, since, until),
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def alert_stream_token(request):
+    """
+    Short-lived token for opening the alert stream (AUTHORITY users only).
+    EventSource cannot send the Authorization header, so the dashboard
+    passes it as ?token= instead.
+    """
+    claims, err = _auth_claims_from_request(request, fresh=True)
+    if err:
+        return err
+    if claims.get("role") != "AUTHORITY":
+        return JsonResponse({"success": False, "message": "Only AUTHORITY users can follow the alert stream"}, status=403)
+    return JsonResponse({"success": True, **issue_stream_token(claims)})
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def alert_event_stream(request):
+    """
+    Server-Sent Events stream of alert.created / alert.status_changed /
+    alert.moved events.
+
+    Needs ?token= from alert_stream_token. Resumes after the Last-Event-ID
+    header (sent automatically by EventSource on reconnect) or
+    ?last_event_id=; without either, only new events are sent. Each sync
+    stream pins a worker thread, so past ALERT_STREAM_MAX_SYNC_STREAMS per
+    process the answer is a 503 with Retry-After.
+    """
+    err = _stream_auth_error(request)
+    if err:
+        return err
+    last_id, err = _requested_event_id(request)
+    if err:
+        return err
+    if last_id is None:
+        last_id = latest_event_id()
+    frames = open_sync_stream(last_id)
+    if frames is None:
+        response = JsonResponse({"success": False, "message": "Too many open alert streams; retry shortly"}, status=503)
+        response["Retry-After"] = str(int(getattr(settings, "ALERT_STREAM_POLL_SECONDS", 2)) * 5)
+        return response
+    return _event_stream_response(frames)
+
+
+def _stream_auth_error(request):
+    token = request.GET.get("token") or ""
+    if not token:
+        return JsonResponse({"success": False, "message": "Missing stream token"}, status=401)
+    try:
+        claims = read_stream_token(token)
+    except SignatureExpired:
+        return JsonResponse({"success": False, "message": "Stream token expired"}, status=401)
+    except BadSignature:
+        return JsonResponse({"success": False, "message": "Invalid stream token"}, status=401)
+    if claims.get("role") != "AUTHORITY":
+        return JsonResponse({"success": False, "message": "Only AUTHORITY users can follow the alert stream"}, status=403)
+    return None
+
+
+def _requested_event_id(request):
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    if not last_id:
+        return None, None
+    try:
+        return int(last_id), None
+    except ValueError:
+        return None, JsonResponse({"success": False, "message": "Invalid Last-Event-ID"}, status=400)
+
+
+def _event_stream_response(frames):
+    response = StreamingHttpResponse(frames, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @csrf_exempt
 @require_http_methods(["POST", "PATCH"])
 def update_alert_status(request, alert_id):
     """
     Update the status of an emergency alert
     """
-    from .models import EmergencyAlert
-    
-    try:
-        alert = EmergencyAlert.objects.get(id=alert_id)
-    except EmergencyAlert.DoesNotExist:
-        return JsonResponse({"success": False, "message": "Alert not found"}, status=404)
-    
     data, err = _json_body(request)
     if err:
         return err
@@ -991,8 +1847,16 @@ def update_alert_status(request, alert_id):
     if new_status not in ["PENDING", "IN_PROGRESS", "RESOLVED"]:
         return JsonResponse({"success": False, "message": "Invalid status"}, status=400)
     
-    alert.status = new_status
-    alert.save()
+    with transaction.atomic():
+        # Locked so concurrent updates move the stats counts from the right status.
+        alert = EmergencyAlert.objects.select_for_update().filter(id=alert_id).first()
+        if alert is None:
+            return JsonResponse({"success": False, "message": "Alert not found"}, status=404)
+        old_status = alert.status
+        alert.status = new_status
+        alert.save()
+        publish_alert_event(alert, "alert.status_changed", _alert_event_payload(alert))
+        stats.status_changed(alert, old_status)
     
     return JsonResponse({
         "success": True,
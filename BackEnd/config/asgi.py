@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Route the SOS / OTP / alert-stream URLs to their async views (settings.ASYNC_VIEWS).
+os.environ.setdefault('SAFETRIP_ASGI', '1')
 
 application = get_asgi_application()
@@ -70,8 +70,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compile each template (incl. OTP / SOS emails) once per process
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -110,6 +116,13 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing runs on a bounded pool (SafeTrip_API.passwords); requests beyond
+# WORKERS + QUEUE_DEPTH get a 503 instead of tying up a request worker.
+# Keep the sum below the app server's request thread count. 0 = half the CPUs.
+PASSWORD_HASHER_WORKERS = 0
+PASSWORD_HASHER_QUEUE_DEPTH = 4
+
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -123,6 +136,16 @@ STATIC_URL = 'static/'
 # Media uploads (profile images)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Profile images (SafeTrip_API.images): uploads over MAX_BYTES stop being
+# stored mid-stream and get a 413; variants are rendered on a small thread pool.
+PROFILE_IMAGE_MAX_BYTES = 5 * 1024 * 1024
+PROFILE_IMAGE_MAX_PIXELS = 40_000_000  # refuse to decode anything larger
+PROFILE_IMAGE_THUMB_PX = 128  # dashboards, alert lists
+PROFILE_IMAGE_MEDIUM_PX = 512  # profile page
+PROFILE_IMAGE_QUALITY = 80  # JPEG
+PROFILE_IMAGE_WORKERS = 2
+PROFILE_IMAGE_QUEUE_DEPTH = 16  # beyond this, left for `manage.py process_profile_images`
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Use the custom user model defined in SafeTrip_API.models
@@ -147,10 +170,17 @@ CORS_ALLOW_HEADERS = [
 # -------------------------
 # EMAIL CONFIGURATION (Gmail)
 # -------------------------
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Same as Django's SMTP backend, but keeps a few authenticated connections warm per process
+EMAIL_BACKEND = 'SafeTrip_API.mail.PooledSMTPEmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
+EMAIL_TIMEOUT = 10
+
+EMAIL_POOL_SIZE = 4  # idle connections kept per process
+EMAIL_POOL_MAX_MESSAGES_PER_CONNECTION = 50  # then reconnect (Gmail limits messages per session)
+EMAIL_POOL_HEALTHCHECK_SECONDS = 15  # NOOP before reusing a connection idle this long
+EMAIL_POOL_IDLE_SECONDS = 120  # drop connections idle longer than this
 
 # Load these directly from environment variables (populated by _load_dotenv above)
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
@@ -179,6 +209,30 @@ TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.environ.get("TWILIO_PHONE_NUMBER")
 
+# Public URL of /webhooks/twilio/sms-status/ so Twilio can report delivered / undelivered.
+# Example in .env:
+#   TWILIO_STATUS_CALLBACK_URL=https://safetrip.example.com/webhooks/twilio/sms-status/
+TWILIO_STATUS_CALLBACK_URL = os.environ.get("TWILIO_STATUS_CALLBACK_URL")
+# Point the Twilio client at a local stand-in instead of https://api.twilio.com (dev / benchmarks only).
+TWILIO_API_BASE_URL = os.environ.get("TWILIO_API_BASE_URL")
+# Turn off only for a local stand-in that cannot sign requests.
+TWILIO_VALIDATE_WEBHOOKS = os.environ.get("TWILIO_VALIDATE_WEBHOOKS", "true").lower() != "false"
+
+
+# -------------------------
+# NOTIFICATION OUTBOX
+# -------------------------
+# SOS / OTP views only queue emails and SMS; run the worker to deliver them:
+#   python manage.py run_notification_worker
+NOTIFICATION_WORKER_CONCURRENCY = int(os.environ.get("NOTIFICATION_WORKER_CONCURRENCY", "8"))
+NOTIFICATION_WORKER_BATCH_SIZE = 50
+NOTIFICATION_WORKER_POLL_SECONDS = 1.0
+NOTIFICATION_BATCH_DEADLINE_SECONDS = 30  # jobs not started by then go back to the queue
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_CLAIM_TIMEOUT_SECONDS = 300  # re-deliver jobs a crashed worker left in SENDING
+NOTIFICATION_STATUS_PARK_HOURS = 24  # keep SMS status callbacks for not-yet-stored message ids this long
+SMS_SEND_TIMEOUT_SECONDS = 10  # per Twilio request
+
 
 # -------------------------
 # OTP & CACHE SETTINGS
@@ -195,4 +249,103 @@ OTP_LENGTH = 6
 OTP_TTL_SECONDS = 300  # 5 minutes
 OTP_MAX_VERIFY_ATTEMPTS = 5
 OTP_MAX_SENDS_PER_WINDOW = 3
-OTP_SEND_WINDOW_SECONDS = 600  # 10 minutes
\ No newline at end of file
+OTP_SEND_WINDOW_SECONDS = 600  # 10 minutes
+OTP_RESEND_SECONDS = 60
+# Also record issued codes in OTPStorage (written off the request path)
+OTP_AUDIT_ENABLED = True
+# OTPStorage rows older than this are removed by `python manage.py purge_otps`
+OTP_RETENTION_HOURS = 24
+
+
+# -------------------------
+# ALERT LIST PAGINATION
+# -------------------------
+ALERTS_PAGE_SIZE = 100
+ALERTS_MAX_PAGE_SIZE = 500
+ALERTS_COUNT_CAP = 10000  # ?count=estimate reports at most this
+ALERT_BATCH_MAX_EVENTS = 100  # per POST /emergency/alerts/batch/
+ALERTS_NEARBY_MAX_RADIUS_KM = 100
+GEOHASH_MAX_COVER_CELLS = 32  # geohash cells (index ranges before merging) per nearby query
+
+
+# -------------------------
+# ALERT STATS
+# -------------------------
+# GET /emergency/alerts/stats/ reads the AlertStatBucket summary (SafeTrip_API.stats).
+# Run `python manage.py rebuild_alert_stats` after changing STATS_REGION_PRECISION.
+STATS_REGION_PRECISION = 4  # geohash characters per region; 4 is about 39 x 20 km
+STATS_DEFAULT_HOURS = 24  # default window for period=hour
+STATS_DEFAULT_DAYS = 30  # default window for period=day
+STATS_MAX_BUCKETS = 1000
+
+
+# -------------------------
+# LOCATION TRAILS
+# -------------------------
+TRAIL_CHUNK_POINTS = 512  # fixes per AlertLocationChunk row
+TRAIL_MAX_POINTS_PER_REQUEST = 500
+TRAIL_MAX_READ_POINTS = 2000  # GET .../trail/ returns at most this many (time-bucketed)
+
+
+# -------------------------
+# RESPONDER DISPATCH
+# -------------------------
+# SOS alerts go to the nearest available AUTHORITY responders (SafeTrip_API.dispatch);
+# AUTHORITY_ALERT_EMAILS is used when none is in range.
+DISPATCH_RESPONDERS_PER_ALERT = 3
+DISPATCH_MAX_DISTANCE_KM = 50
+DISPATCH_STALE_SECONDS = 900  # ignore responders whose last report is older
+DISPATCH_GRID_CELL_DEGREES = 0.01  # about 1.1 km north-south; smaller for denser fleets
+DISPATCH_SYNC_SECONDS = 2  # how often a process picks up other processes' reports
+
+
+# -------------------------
+# REVERSE GEOCODER
+# -------------------------
+# SOS alerts sent without an address get "Near <place>" from the nearest
+# gazetteer entry (SafeTrip_API.geocoder). Point GEOCODER_GAZETTEER at a
+# GeoNames dump (e.g. cities500.txt) for finer coverage, then run
+# `python manage.py build_geocoder`. Empty disables it.
+GEOCODER_GAZETTEER = os.environ.get("GEOCODER_GAZETTEER", str(BASE_DIR / "SafeTrip_API" / "data" / "gazetteer.tsv"))
+# Where the built index goes; default: <system temp dir>/safetrip-geocoder
+GEOCODER_CACHE_DIR = os.environ.get("GEOCODER_CACHE_DIR", "")
+GEOCODER_INDEX_PATH = os.environ.get("GEOCODER_INDEX_PATH", "")  # overrides the file name in GEOCODER_CACHE_DIR
+# Build a missing / stale index on first lookup. Turn off on read-only
+# images that run build_geocoder at build time.
+GEOCODER_BUILD_ON_DEMAND = os.environ.get("GEOCODER_BUILD_ON_DEMAND", "true").lower() != "false"
+GEOCODER_MAX_DISTANCE_KM = 50  # farther than this from every place: leave the address blank
+GEOCODER_CACHE_SIZE = 4096  # lookups cached per process, keyed on ~11 m rounded coordinates
+
+
+# -------------------------
+# ASYNC VIEWS (ASGI)
+# -------------------------
+# Set by config/asgi.py: serve SOS, OTP and the alert stream from SafeTrip_API.async_views.
+ASYNC_VIEWS = os.environ.get("SAFETRIP_ASGI") == "1"
+
+
+# -------------------------
+# ALERT EVENT STREAM (SSE)
+# -------------------------
+ALERT_STREAM_POLL_SECONDS = 2  # cross-process pickup latency; same-process publishes wake streams at once
+ALERT_STREAM_HEARTBEAT_SECONDS = 15
+ALERT_STREAM_MAX_SECONDS = 300  # clients reconnect with Last-Event-ID after this
+ALERT_STREAM_TOKEN_TTL_SECONDS = 60  # ?token= for opening the stream, from emergency/alerts/stream/token/
+ALERT_STREAM_MAX_SYNC_STREAMS = 8  # per WSGI process (each pins a thread); more get a 503. ASGI is not capped.
+# AlertEvent rows older than this are removed by `python manage.py purge_alert_events`
+ALERT_EVENT_RETENTION_HOURS = 24
+
+
+# -------------------------
+# AUTH TOKENS & USER CACHE
+# -------------------------
+# Per-process snapshots of token users and profiles (SafeTrip_API.auth_cache).
+# Invalidation versions live in CACHES["default"]; use a shared cache (Redis /
+# memcached) when running several worker processes.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL_SECONDS = 60
+
+# Access tokens are short-lived; clients renew them at auth/refresh/ with the
+# refresh token, which lasts AUTH_TOKEN_MAX_AGE_SECONDS.
+AUTH_ACCESS_TOKEN_TTL_SECONDS = 15 * 60
+AUTH_TOKEN_MAX_AGE_SECONDS = 60 * 60 * 24 * 30
@@ -0,0 +1,6 @@
+@echo off
+echo ======================================
+echo Starting Notification Worker
+echo ======================================
+cd /d C:\Users\Kartik\Downloads\SafeTrip\BackEnd
+python manage.py run_notification_worker
@@ -1,4 +1,5 @@
 import axios from "axios";
+import ENDPOINTS from "./endpoints";
 
 const api = axios.create({
   baseURL: process.env.REACT_APP_API_BASE_URL || "http://localhost:8000",
@@ -28,6 +29,28 @@ api.interceptors.request.use(
   }
 );
 
+// Access tokens are short-lived: renew once with the refresh token and retry.
+let refreshing = null;
+const refreshAccessToken = () => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem("refreshToken");
+    refreshing = (
+      refreshToken
+        ? api.post(ENDPOINTS.AUTH.REFRESH, { refresh_token: refreshToken }, { _retried: true })
+        : Promise.reject(new Error("No refresh token"))
+    )
+      .then(({ data }) => {
+        localStorage.setItem("authToken", data.token);
+        localStorage.setItem("refreshToken", data.refresh_token);
+        return data.token;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
 api.interceptors.response.use(
   (response) => {
     if (process.env.NODE_ENV === "development") {
@@ -35,7 +58,20 @@ api.interceptors.response.use(
     }
     return response;
   },
-  (error) => {
+  async (error) => {
+    const config = error.config || {};
+    if (
+      error.response?.status === 401 &&
+      error.response.data?.message === "Token expired" &&
+      !config._retried
+    ) {
+      try {
+        await refreshAccessToken();
+        return api({ ...config, _retried: true });
+      } catch (refreshError) {
+        // fall through to the normal 401 handling
+      }
+    }
     if (error.response) {
       const { status, data } = error.response;
       switch (status) {
@@ -50,6 +86,7 @@ api.interceptors.response.use(
             !window.location.pathname.includes("/signup")
           ) {
             localStorage.removeItem("authToken");
+            localStorage.removeItem("refreshToken");
             window.location.href = "/login";
           }
           break;
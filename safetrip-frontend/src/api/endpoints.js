@@ -2,8 +2,13 @@ const ENDPOINTS = {
   ALERTS: {
     LIST: "/emergency/alerts/",
     CREATE: "/emergency/alert/",
+    CREATE_BATCH: "/emergency/alerts/batch/",
+    NEARBY: "/emergency/alerts/nearby/",
+    STATS: "/emergency/alerts/stats/",
     DETAIL: (id) => `/emergency/alerts/${id}/`,
     UPDATE_STATUS: (id) => `/emergency/alerts/${id}/status/`,
+    STREAM: "/emergency/alerts/stream/",
+    STREAM_TOKEN: "/emergency/alerts/stream/token/",
     DELETE: (id) => `/api/alerts/${id}/`,
     PENDING: "/api/alerts/pending/",
   },
@@ -14,10 +19,11 @@ const ENDPOINTS = {
     REQUEST_OTP: "/auth/request-otp/",
     SEND_OTP: "/auth/send-otp/",
     VERIFY_OTP: "/auth/verify-otp/",
-    REFRESH: "/api/auth/refresh/",
+    REFRESH: "/auth/refresh/",
     USER: "/api/auth/user/",
   },
   PROFILE: "/profile/me/",
+  RESPONDER_STATUS: "/responders/me/status/",
   USERS: {
     LIST: "/api/users/",
   },
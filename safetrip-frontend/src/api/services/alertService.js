@@ -2,15 +2,33 @@ import api from "../axios";
 import ENDPOINTS from "../endpoints";
 
 class AlertService {
+  // One page of the cursor-paged list; pass nextCursor back for the next one.
+  async getAlertsPage(cursor = null, limit = 100) {
+    try {
+      const response = await api.get(ENDPOINTS.ALERTS.LIST, {
+        params: { limit, ...(cursor ? { cursor } : {}) },
+      });
+      return {
+        alerts: response.data.alerts || [],
+        nextCursor: response.data.next_cursor || null,
+        hasMore: Boolean(response.data.has_more),
+      };
+    } catch (error) {
+      throw this.handleError(error);
+    }
+  }
+
+  // Newest page only; use getAlertsPage to walk further.
   async getAllAlerts() {
+    const { alerts } = await this.getAlertsPage();
+    return alerts;
+  }
+
+  // All-time counts by status from the server-side summary.
+  async getAlertStats() {
     try {
-      const response = await api.get(ENDPOINTS.ALERTS.LIST);
-      return (
-        response.data.alerts ||
-        response.data.data ||
-        response.data.results ||
-        response.data
-      );
+      const response = await api.get(ENDPOINTS.ALERTS.STATS);
+      return response.data.totals;
     } catch (error) {
       throw this.handleError(error);
     }
@@ -98,6 +116,16 @@ class AlertService {
     }
   }
 
+  // Short-lived token for opening the alert stream (EventSource can't send headers).
+  async getStreamToken() {
+    try {
+      const response = await api.post(ENDPOINTS.ALERTS.STREAM_TOKEN);
+      return response.data.stream_token;
+    } catch (error) {
+      throw this.handleError(error);
+    }
+  }
+
   async getPendingAlerts() {
     try {
       const response = await api.get(ENDPOINTS.ALERTS.PENDING);
@@ -2,6 +2,12 @@ import api from "../axios";
 import ENDPOINTS from "../endpoints";
 
 const TOKEN_KEY = "authToken";
+const REFRESH_TOKEN_KEY = "refreshToken";
+
+const storeTokens = ({ token, refresh_token }) => {
+  if (token) localStorage.setItem(TOKEN_KEY, token);
+  if (refresh_token) localStorage.setItem(REFRESH_TOKEN_KEY, refresh_token);
+};
 
 class AuthService {
   async login(username, password) {
@@ -12,7 +18,7 @@ class AuthService {
     });
     console.log("Login response:", response.data);
     const { token, user, profile } = response.data;
-    if (token) localStorage.setItem(TOKEN_KEY, token);
+    storeTokens(response.data);
     return { token, user, profile };
   }
 
@@ -38,7 +44,7 @@ class AuthService {
   async verifyOTP(email, otp) {
     const response = await api.post(ENDPOINTS.AUTH.VERIFY_OTP, { email, otp });
     const { token, user } = response.data;
-    if (token) localStorage.setItem(TOKEN_KEY, token);
+    storeTokens(response.data);
     return { token, user, profile: null };
   }
 
@@ -49,6 +55,7 @@ class AuthService {
       // ignore
     } finally {
       localStorage.removeItem(TOKEN_KEY);
+      localStorage.removeItem(REFRESH_TOKEN_KEY);
     }
   }
 
@@ -1,24 +1,128 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
+import api from '../api/axios';
 import alertService from '../api/services/alertService';
+import ENDPOINTS from '../api/endpoints';
 
 const useAlerts = (autoFetch = true) => {
   const [alerts, setAlerts] = useState([]);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totals, setTotals] = useState(null);
+  const statsTimer = useRef(null);
 
+  // Counts come from the stats endpoint, since only some pages are loaded.
+  const fetchStats = useCallback(async () => {
+    try {
+      setTotals(await alertService.getAlertStats());
+    } catch (err) {
+      console.error('Error fetching alert stats:', err);
+    }
+  }, []);
+
+  // Coalesce bursts of live events into one stats request.
+  const scheduleStats = useCallback(() => {
+    if (statsTimer.current) return;
+    statsTimer.current = setTimeout(() => {
+      statsTimer.current = null;
+      fetchStats();
+    }, 1000);
+  }, [fetchStats]);
+
+  useEffect(() => () => clearTimeout(statsTimer.current), []);
+
+  // Newest page only; loadMore() follows next_cursor on request.
   const fetchAlerts = useCallback(async () => {
     setLoading(true);
     setError(null);
     try {
-      const data = await alertService.getAllAlerts();
-      setAlerts(Array.isArray(data) ? data : []);
+      const page = await alertService.getAlertsPage();
+      setAlerts(page.alerts);
+      setNextCursor(page.hasMore ? page.nextCursor : null);
+      fetchStats();
     } catch (err) {
       setError(err.message || 'Failed to fetch alerts');
       console.error('Error fetching alerts:', err);
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [fetchStats]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await alertService.getAlertsPage(nextCursor);
+      setAlerts((prev) => {
+        const seen = new Set(prev.map((alert) => alert.id));
+        return [...prev, ...page.alerts.filter((alert) => !seen.has(alert.id))];
+      });
+      setNextCursor(page.hasMore ? page.nextCursor : null);
+    } catch (err) {
+      setError(err.message || 'Failed to fetch alerts');
+      console.error('Error fetching more alerts:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextCursor]);
+
+  // Live updates: merge alert.created / alert.status_changed / alert.moved events into the list.
+  // The stream is opened with a short-lived token; EventSource reconnects on its
+  // own, and once that token is rejected we fetch a new one and resume from the
+  // last event id.
+  const subscribeToAlerts = useCallback(() => {
+    let source = null;
+    let lastEventId = null;
+    let closed = false;
+    let retryTimer = null;
+
+    const upsert = (event) => {
+      lastEventId = event.lastEventId || lastEventId;
+      scheduleStats();
+      const changed = JSON.parse(event.data);
+      setAlerts((prev) =>
+        prev.some((alert) => alert.id === changed.id)
+          ? prev.map((alert) => (alert.id === changed.id ? { ...alert, ...changed } : alert))
+          : [changed, ...prev]
+      );
+    };
+
+    // alert.moved carries only the new position; it never adds a row.
+    const move = (event) => {
+      lastEventId = event.lastEventId || lastEventId;
+      const moved = JSON.parse(event.data);
+      setAlerts((prev) => prev.map((alert) => (alert.id === moved.id ? { ...alert, ...moved } : alert)));
+    };
+
+    const open = async () => {
+      try {
+        const token = await alertService.getStreamToken();
+        if (closed) return;
+        const params = new URLSearchParams({ token });
+        if (lastEventId) params.set('last_event_id', lastEventId);
+        source = new EventSource(`${api.defaults.baseURL}${ENDPOINTS.ALERTS.STREAM}?${params}`);
+        source.addEventListener('alert.created', upsert);
+        source.addEventListener('alert.status_changed', upsert);
+        source.addEventListener('alert.moved', move);
+        source.onerror = () => {
+          if (source.readyState === EventSource.CLOSED && !closed) {
+            retryTimer = setTimeout(open, 2000);
+          }
+        };
+      } catch (err) {
+        console.error('Error opening alert stream:', err);
+        if (!closed) retryTimer = setTimeout(open, 5000);
+      }
+    };
+
+    open();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (source) source.close();
+    };
+  }, [scheduleStats]);
 
   const createAlert = async (alertData) => {
     try {
@@ -48,6 +152,7 @@ const useAlerts = (autoFetch = true) => {
     try {
       await alertService.deleteAlert(id);
       setAlerts((prev) => prev.filter((alert) => alert.id !== id));
+      fetchStats();
       return { success: true };
     } catch (err) {
       console.error('Error deleting alert:', err);
@@ -60,15 +165,22 @@ const useAlerts = (autoFetch = true) => {
     [alerts]
   );
 
-  const getStats = useCallback(
-    () => ({
+  const getStats = useCallback(() => {
+    if (totals) {
+      return {
+        total: totals.total,
+        pending: totals.PENDING,
+        inProgress: totals.IN_PROGRESS,
+        resolved: totals.RESOLVED,
+      };
+    }
+    return {
       total: alerts.length,
       pending: alerts.filter((a) => a.status === 'PENDING').length,
       inProgress: alerts.filter((a) => a.status === 'IN_PROGRESS').length,
       resolved: alerts.filter((a) => a.status === 'RESOLVED').length,
-    }),
-    [alerts]
-  );
+    };
+  }, [alerts, totals]);
 
   useEffect(() => {
     if (autoFetch) fetchAlerts();
@@ -77,8 +189,12 @@ const useAlerts = (autoFetch = true) => {
   return {
     alerts,
     loading,
+    loadingMore,
     error,
+    hasMore: Boolean(nextCursor),
     fetchAlerts,
+    loadMore,
+    subscribeToAlerts,
     createAlert,
     updateAlertStatus,
     deleteAlert,
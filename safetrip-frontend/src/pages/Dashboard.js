@@ -10,8 +10,18 @@ import "./Dashboard.css";
 
 const Dashboard = () => {
   const { user } = useAuth();
-  const { alerts, loading, error, fetchAlerts, updateAlertStatus, getStats } =
-    useAlerts(false);
+  const {
+    alerts,
+    loading,
+    loadingMore,
+    error,
+    hasMore,
+    fetchAlerts,
+    loadMore,
+    subscribeToAlerts,
+    updateAlertStatus,
+    getStats,
+  } = useAlerts(false);
 
   const [filter, setFilter] = useState("ALL");
   const [refreshing, setRefreshing] = useState(false);
@@ -24,11 +34,8 @@ const Dashboard = () => {
     fetchAlerts();
   }, [fetchAlerts]);
 
-  // Auto-refresh every 30 seconds
-  useEffect(() => {
-    const interval = setInterval(() => fetchAlerts(), 30000);
-    return () => clearInterval(interval);
-  }, [fetchAlerts]);
+  // Live updates instead of re-downloading the list every 30 seconds
+  useEffect(() => subscribeToAlerts(), [subscribeToAlerts]);
 
   // Refresh when component becomes visible again
   useEffect(() => {
@@ -227,6 +234,19 @@ const Dashboard = () => {
             ))}
           </div>
         )}
+
+        {hasMore && (
+          <div className="load-more">
+            <button
+              type="button"
+              className="refresh-btn"
+              onClick={loadMore}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Loading..." : "Load older alerts"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );